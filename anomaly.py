@@ -0,0 +1,425 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: anomaly.py                                                                             #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides a streaming detection of surge days (storm, flood) on the daily       #
+#          operation counts. The statistics are updated with the new rows only and saved.           #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+from collections import deque
+from datetime import date, timedelta
+import json
+import logging
+import math
+import os
+
+from instrumentation import timer, count
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+STATE_PATH = "./Dataset/anomalie_status.json"
+GESAMT = "Gesamt"
+
+
+class RollingMean():
+    """This class computes the mean of the last window values. Adding a value is O(1), the sum is kept.
+    """
+
+    def __init__(self, window, values = ()):
+        """Initialisation of the class (constructor).
+
+        Args:
+            window (integer): Number of values
+            values (iterable, optional): Initial values, oldest first. Defaults to ().
+        """
+
+        self.values = deque(maxlen = window)
+        self.total = 0.0
+
+        for value in values:
+            self.add(value)
+
+    def add(self, value):
+        """This method adds a value, the oldest value is removed if the window is full.
+
+        Args:
+            value (float): New value
+        """
+
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+    @property
+    def mean(self):
+        """This method returns the mean of the window.
+
+        Returns:
+            mean (float): Mean, None if the window is empty
+        """
+
+        return self.total / len(self.values) if len(self.values) > 0 else None
+
+
+class SeriesStatistics():
+    """This class holds the statistics of one daily count series (all operations, one Einsatztyp or one Einsatzort):
+       EWMA mean and variance, rolling means and the seasonal baselines per weekday (mean and variance with the
+       Welford algorithm) and per day of year (mean). Every update is O(1).
+    """
+
+    def __init__(self, alpha = 0.1, windows = (3, 12)):
+        """Initialisation of the class (constructor).
+
+        Args:
+            alpha (float, optional): Weight of the newest day in the EWMA. Defaults to 0.1.
+            windows (tuple, optional): Window sizes in days of the rolling means. Defaults to (3, 12).
+        """
+
+        self.alpha = alpha
+        self.days = 0
+        self.ewma_mean = 0.0
+        self.ewma_var = 0.0
+        self.rolling = {window: RollingMean(window) for window in windows}
+        self.weekday = [[0, 0.0, 0.0] for _ in range(7)]    # count, mean, M2
+        self.day_of_year = [[0, 0.0] for _ in range(366)]   # count, sum
+
+    def score(self, day, value):
+        """This method compares a daily count with the statistics, without changing them.
+
+        Args:
+            day (datetime date): Day of the count
+            value (float): Number of operations on the day
+
+        Returns:
+            dict_score (dictionary): Expected values and z-scores
+        """
+
+        n, mean, m2 = self.weekday[day.weekday()]
+        weekday_std = math.sqrt(m2 / (n - 1)) if n > 1 else 0.0
+        doy_n, doy_sum = self.day_of_year[day.timetuple().tm_yday - 1]
+        ewma_std = math.sqrt(self.ewma_var)
+
+        dict_score = {"Erwartet": round(self.ewma_mean, 3),
+                      "Z_EWMA": round((value - self.ewma_mean) / ewma_std, 3) if ewma_std > 0 else 0.0,
+                      "Mittel_Wochentag": round(mean, 3),
+                      "Z_Wochentag": round((value - mean) / weekday_std, 3) if weekday_std > 0 else 0.0,
+                      "Mittel_Jahrestag": round(doy_sum / doy_n, 3) if doy_n > 0 else None,
+                      **{"Mittel_" + str(window): (round(rolling.mean, 3) if rolling.mean is not None else None)
+                         for window, rolling in self.rolling.items()}}
+
+        return dict_score
+
+    def update(self, day, value):
+        """This method adds the count of a completed day.
+
+        Args:
+            day (datetime date): Day of the count
+            value (float): Number of operations on the day
+        """
+
+        # EWMA of mean and variance
+        if self.days == 0:
+            self.ewma_mean = float(value)
+        else:
+            diff = value - self.ewma_mean
+            increment = self.alpha * diff
+            self.ewma_mean += increment
+            self.ewma_var = (1 - self.alpha) * (self.ewma_var + diff * increment)
+
+        for rolling in self.rolling.values():
+            rolling.add(value)
+
+        # Welford per weekday
+        baseline = self.weekday[day.weekday()]
+        baseline[0] += 1
+        delta = value - baseline[1]
+        baseline[1] += delta / baseline[0]
+        baseline[2] += delta * (value - baseline[1])
+
+        baseline = self.day_of_year[day.timetuple().tm_yday - 1]
+        baseline[0] += 1
+        baseline[1] += value
+
+        self.days += 1
+
+    def to_dict(self):
+        """This method converts the statistics into a dictionary for JSON.
+
+        Returns:
+            dict_statistics (dictionary): Statistics
+        """
+
+        return {"alpha": self.alpha, "days": self.days, "ewma_mean": self.ewma_mean, "ewma_var": self.ewma_var,
+                "rolling": {str(window): list(rolling.values) for window, rolling in self.rolling.items()},
+                "weekday": self.weekday, "day_of_year": self.day_of_year}
+
+    @classmethod
+    def from_dict(cls, dict_statistics):
+        """This method creates the statistics from a dictionary.
+
+        Args:
+            dict_statistics (dictionary): Statistics from to_dict
+
+        Returns:
+            statistics (SeriesStatistics): Statistics
+        """
+
+        statistics = cls(dict_statistics["alpha"], ())
+        statistics.days = dict_statistics["days"]
+        statistics.ewma_mean = dict_statistics["ewma_mean"]
+        statistics.ewma_var = dict_statistics["ewma_var"]
+        statistics.rolling = {int(window): RollingMean(int(window), values)
+                              for window, values in dict_statistics["rolling"].items()}
+        statistics.weekday = dict_statistics["weekday"]
+        statistics.day_of_year = dict_statistics["day_of_year"]
+
+        return statistics
+
+
+class AnomalyDetector():
+    """This class detects surge days per series (all operations, per Einsatztyp and per Einsatzort). Completed days
+       update the statistics, the newest day is still open and only scored, so a surge is flagged as soon as the
+       rows arrive. Rows of days which are already completed are ignored, so the whole data set can be passed.
+    """
+
+    def __init__(self, alpha = 0.1, threshold = 3.0, min_count = 3, min_days = 28, surge_count = 50, windows = (3, 12)):
+        """Initialisation of the class (constructor).
+
+        Args:
+            alpha (float, optional): Weight of the newest day in the EWMA. Defaults to 0.1.
+            threshold (float, optional): z-score from which a day is a surge. Defaults to 3.0.
+            min_count (integer, optional): Minimum number of operations of a surge day. Defaults to 3.
+            min_days (integer, optional): Days of history before a series is scored. Defaults to 28.
+            surge_count (integer, optional): Number of all operations from which a day is always a surge, like the
+                                             days with more than 50 operations in the notebook. Defaults to 50.
+            windows (tuple, optional): Window sizes in days of the rolling means. Defaults to (3, 12).
+        """
+
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_count = min_count
+        self.min_days = min_days
+        self.surge_count = surge_count
+        self.windows = windows
+        self.series = {}
+        self.open_day = None        # newest day, not completed yet
+        self.open_counts = {}       # series -> count of the open day
+        self.open_keys = set()      # Nr and Alarmierungszeit of the rows of the open day
+        self.events = {}            # (Datum, Serie) -> event
+
+    def get_series(self, name):
+        """This method returns the statistics of a series, a new series starts with its first operation.
+
+        Args:
+            name (string): Name of the series, e.g. "Einsatztyp=Brand"
+
+        Returns:
+            statistics (SeriesStatistics): Statistics of the series
+        """
+
+        if name not in self.series:
+            self.series[name] = SeriesStatistics(self.alpha, self.windows)
+
+        return self.series[name]
+
+    def close_day(self, day, counts):
+        """This method completes a day, all series get their count, also series without operations (0).
+
+        Args:
+            day (datetime date): Completed day
+            counts (dictionary): Series -> number of operations
+        """
+
+        for name in set(self.series) | set(counts):
+            self.get_series(name).update(day, counts.get(name, 0))
+
+    def check(self, day, counts):
+        """This method scores the counts of a day and saves the surges as events.
+
+        Args:
+            day (datetime date): Day of the counts
+            counts (dictionary): Series -> number of operations
+
+        Returns:
+            events (list): Events of the day
+        """
+
+        events = []
+
+        for name, value in counts.items():
+            statistics = self.series.get(name)
+            if statistics is None or statistics.days < self.min_days or value < self.min_count:
+                continue
+
+            dict_score = statistics.score(day, value)
+            surge = (dict_score["Z_EWMA"] >= self.threshold or dict_score["Z_Wochentag"] >= self.threshold or
+                     (name == GESAMT and value > self.surge_count))
+
+            if surge:
+                event = {"Datum": day.isoformat(), "Serie": name, "Anzahl": int(value), **dict_score}
+                self.events[(event["Datum"], name)] = event
+                events.append(event)
+
+        return events
+
+    def update(self, df):
+        """This method adds new rows. Days before the open day are already completed and ignored.
+
+        Args:
+            df (pandas DataFrame): Rows with Nr, Alarmierungszeit, Einsatztyp and Einsatzort
+
+        Returns:
+            df_events (pandas DataFrame): Surges of the days in the new rows
+        """
+
+        with timer("anomaly_update"):
+            df = df[["Nr", "Alarmierungszeit", "Einsatztyp", "Einsatzort"]].copy()
+            df["Alarmierungszeit"] = pd.to_datetime(df["Alarmierungszeit"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+            df["Tag"] = df["Alarmierungszeit"].str[:10]
+
+            # Only rows which are not counted yet
+            if self.open_day is not None:
+                df = df[df["Tag"] >= self.open_day.isoformat()]
+                neu = [key not in self.open_keys for key in zip(df["Nr"].astype(int), df["Alarmierungszeit"])]
+                df = df[neu]
+            count("anomaly_rows", len(df))
+
+            if df.empty:
+                return pd.DataFrame()
+
+            # Daily counts of all series, vectorized
+            list_counts = [df.groupby("Tag").size().rename(GESAMT).to_frame()]
+            for column in ["Einsatztyp", "Einsatzort"]:
+                list_counts.append(df.groupby(["Tag", column]).size().unstack(fill_value = 0).add_prefix(column + "="))
+            df_counts = pd.concat(list_counts, axis = 1).fillna(0).astype(int)
+
+            events = []
+            last_day = date.fromisoformat(df_counts.index.max())
+            day = self.open_day if self.open_day is not None else date.fromisoformat(df_counts.index.min())
+            counts = dict(self.open_counts)
+
+            while True:
+                if day.isoformat() in df_counts.index:
+                    row = df_counts.loc[day.isoformat()]
+                    for name, value in row[row > 0].items():
+                        counts[name] = counts.get(name, 0) + int(value)
+
+                events += self.check(day, counts)
+                if day == last_day:
+                    break
+
+                self.close_day(day, counts)
+                day, counts = day + timedelta(days = 1), {}
+
+            # The newest day stays open, further rows of the same day can follow
+            if self.open_day != last_day:
+                self.open_keys = set()
+            self.open_day, self.open_counts = last_day, counts
+            df_open = df[df["Tag"] == last_day.isoformat()]
+            self.open_keys |= set(zip(df_open["Nr"].astype(int), df_open["Alarmierungszeit"]))
+
+        count("anomaly_events", len(events))
+        df_events = pd.DataFrame(events)
+
+        return df_events
+
+    def get_events(self):
+        """This method returns all saved surges.
+
+        Returns:
+            df_events (pandas DataFrame): Surges, newest first
+        """
+
+        df_events = pd.DataFrame(list(self.events.values()))
+        if not df_events.empty:
+            df_events = df_events.sort_values(by = ["Datum", "Anzahl"], ascending = False).reset_index(drop = True)
+
+        return df_events
+
+    def save(self, path = STATE_PATH):
+        """This method saves the state as JSON, atomically.
+
+        Args:
+            path (string, optional): File of the state. Defaults to "./Dataset/anomalie_status.json".
+        """
+
+        state = {"parameters": {"alpha": self.alpha, "threshold": self.threshold, "min_count": self.min_count,
+                                "min_days": self.min_days, "surge_count": self.surge_count,
+                                "windows": list(self.windows)},
+                 "series": {name: statistics.to_dict() for name, statistics in self.series.items()},
+                 "open_day": self.open_day.isoformat() if self.open_day is not None else None,
+                 "open_counts": self.open_counts,
+                 "open_keys": sorted(self.open_keys),
+                 "events": list(self.events.values())}
+
+        with open(path + ".tmp", "w", encoding = "utf-8") as file:
+            json.dump(state, file, ensure_ascii = False)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path = STATE_PATH):
+        """This method loads the state, a new detector is created if there is no state yet.
+
+        Args:
+            path (string, optional): File of the state. Defaults to "./Dataset/anomalie_status.json".
+
+        Returns:
+            detector (AnomalyDetector): Detector
+        """
+
+        if not os.path.exists(path):
+            return cls()
+
+        with open(path, "r", encoding = "utf-8") as file:
+            state = json.load(file)
+
+        parameters = state["parameters"]
+        detector = cls(parameters["alpha"], parameters["threshold"], parameters["min_count"], parameters["min_days"],
+                       parameters["surge_count"], tuple(parameters["windows"]))
+        detector.series = {name: SeriesStatistics.from_dict(statistics) for name, statistics in state["series"].items()}
+        detector.open_day = date.fromisoformat(state["open_day"]) if state["open_day"] is not None else None
+        detector.open_counts = state["open_counts"]
+        detector.open_keys = {(int(nr), alarmierungszeit) for nr, alarmierungszeit in state["open_keys"]}
+        detector.events = {(event["Datum"], event["Serie"]): event for event in state["events"]}
+
+        return detector
+
+
+def update_anomalies(df, path = STATE_PATH, log_days = 7):
+    """This function feeds new rows into the saved detector and logs the surges. The first call processes the whole
+       history, later calls only the new days.
+
+    Args:
+        df (pandas DataFrame): Data set or new rows with Nr, Alarmierungszeit, Einsatztyp and Einsatzort
+        path (string, optional): File of the state. Defaults to "./Dataset/anomalie_status.json".
+        log_days (integer, optional): Only surges of the last log_days days are logged, not the whole history of
+                                      the first call. Defaults to 7.
+
+    Returns:
+        df_events (pandas DataFrame): Surges of the days in the new rows
+    """
+
+    detector = AnomalyDetector.load(path)
+    df_events = detector.update(df)
+    detector.save(path)
+
+    if df_events.empty:
+        return df_events
+
+    since = (detector.open_day - timedelta(days = log_days)).isoformat()
+    for event in df_events[df_events["Datum"] > since].to_dict("records"):
+        logging.warning("Surge on " + event["Datum"] + ": " + event["Serie"] + " with " + str(event["Anzahl"]) +
+                        " operations, expected " + str(event["Erwartet"]))
+
+    return df_events
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py anomalies"
+    update_anomalies(pd.read_csv("./Dataset/einsätze_erweitert.csv"))
+    print(AnomalyDetector.load().get_events().head(20))
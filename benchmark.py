@@ -0,0 +1,309 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: benchmark.py                                                                           #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides an offline benchmark suite for the hot paths of webscraping, dataset #
+#          and machine learning. Throughput and memory are appended to a history file.              #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+from bs4 import BeautifulSoup
+import logging
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import instrumentation
+from fixtures import generate_operations, create_archive_page, FakeSession, FakeGeocoder
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+BENCHMARK_PATH = "./Reports/benchmark.jsonl"
+URL = "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?start=0"
+URL_FEED = "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?format=feed&type=rss&start=0"
+CLASSES = ["Technische Hilfe", "Brand"]
+
+
+def setup_extract_data(scale, pages, directory):
+    """This function prepares the parsed rows for the extract_data benchmark.
+
+    Args:
+        scale (integer): Number of operations for the tabular benchmarks
+        pages (integer): Number of archive pages for the HTML benchmarks
+        directory (string): Temporary folder of the benchmark, it is removed afterwards
+
+    Returns:
+        function (function): Function to be measured
+        rows (integer): Number of processed rows
+    """
+
+    from webscraping import extract_data
+
+    df = generate_operations(pages * 10)
+    soup = BeautifulSoup(create_archive_page(df), "html.parser")
+    einsätze = soup.find(id = "einsatzberichtList").find_all("tr")[1:-2]
+
+    return lambda: [extract_data(einsatz) for einsatz in einsätze], len(einsätze)
+
+
+def setup_webscraper(scale, pages, directory):
+    """This function prepares the recorded session for the webscraper benchmark.
+
+    Args:
+        scale (integer): Number of operations for the tabular benchmarks
+        pages (integer): Number of archive pages for the HTML benchmarks
+        directory (string): Temporary folder of the benchmark, it is removed afterwards
+
+    Returns:
+        function (function): Function to be measured
+        rows (integer): Number of processed rows
+    """
+
+    from webscraping import webscraper, get_next_website
+
+    session = FakeSession(generate_operations(pages * 10))
+    urls = [(URL, URL_FEED)]
+    for _ in range(pages - 1):
+        urls.append((get_next_website(urls[-1][0])[0], get_next_website(urls[-1][1])[0]))
+
+    return lambda: [webscraper(url, url_feed, session) for url, url_feed in urls], pages * 10
+
+
+def setup_add_features(scale, pages, directory):
+    """This function prepares the synthetic data for the add_features benchmark.
+
+    Args:
+        scale (integer): Number of operations for the tabular benchmarks
+        pages (integer): Number of archive pages for the HTML benchmarks
+        directory (string): Temporary folder of the benchmark, it is removed afterwards
+
+    Returns:
+        function (function): Function to be measured
+        rows (integer): Number of processed rows
+    """
+
+    from dataset import add_features
+
+    df = generate_operations(scale)
+
+    return lambda: add_features(df.copy()), scale
+
+
+def setup_create_dataset(scale, pages, directory):
+    """This function prepares einsätze.csv for the create_dataset benchmark. Every run copies it into a fresh
+       subfolder, so that no run appends to the blob store of a previous one. The fake geocoder is used without delay.
+
+    Args:
+        scale (integer): Number of operations for the tabular benchmarks
+        pages (integer): Number of archive pages for the HTML benchmarks
+        directory (string): Temporary folder of the benchmark, it is removed afterwards
+
+    Returns:
+        function (function): Function to be measured
+        rows (integer): Number of processed rows
+    """
+
+    from dataset import create_dataset
+
+    path = os.path.join(directory, "einsätze.csv")
+    generate_operations(scale).to_csv(path, index = False)
+
+    def run():
+        run_directory = tempfile.mkdtemp(dir = directory)
+        shutil.copyfile(path, os.path.join(run_directory, "einsätze.csv"))
+        create_dataset(FakeGeocoder(), 0, run_directory)
+
+    return run, scale
+
+
+def setup_data_preprocessing(scale, pages, directory):
+    """This function prepares the synthetic data for the data_preprocessing benchmark.
+
+    Args:
+        scale (integer): Number of operations for the tabular benchmarks
+        pages (integer): Number of archive pages for the HTML benchmarks
+        directory (string): Temporary folder of the benchmark, it is removed afterwards
+
+    Returns:
+        function (function): Function to be measured
+        rows (integer): Number of processed rows
+    """
+
+    from text_classification_ml import data_preprocessing
+
+    df = generate_operations(scale)
+
+    return lambda: data_preprocessing(df.copy(), CLASSES), scale
+
+
+def setup_distribute_labels_equally(scale, pages, directory):
+    """This function prepares the preprocessed data for the distribute_labels_equally benchmark.
+
+    Args:
+        scale (integer): Number of operations for the tabular benchmarks
+        pages (integer): Number of archive pages for the HTML benchmarks
+        directory (string): Temporary folder of the benchmark, it is removed afterwards
+
+    Returns:
+        function (function): Function to be measured
+        rows (integer): Number of processed rows
+    """
+
+    from text_classification_ml import data_preprocessing, distribute_labels_equally
+
+    df = data_preprocessing(generate_operations(scale), CLASSES)
+
+    return lambda: distribute_labels_equally(df), len(df)
+
+
+def setup_model_training(scale, pages, directory):
+    """This function prepares the training data for the model training benchmark.
+
+    Args:
+        scale (integer): Number of operations for the tabular benchmarks
+        pages (integer): Number of archive pages for the HTML benchmarks
+        directory (string): Temporary folder of the benchmark, it is removed afterwards
+
+    Returns:
+        function (function): Function to be measured
+        rows (integer): Number of processed rows
+    """
+
+    from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+    from sklearn.linear_model import PassiveAggressiveClassifier
+    from sklearn.pipeline import Pipeline
+    from text_classification_ml import data_preprocessing
+
+    df = data_preprocessing(generate_operations(scale), CLASSES)
+    x, y = df["Kurzbericht"], np.array(df["Einsatztyp"])
+
+    def function():
+        text_clf = Pipeline([("vect", CountVectorizer()),
+                             ("tfidf", TfidfTransformer()),
+                             ("clf", PassiveAggressiveClassifier(random_state = 28))])
+        text_clf.fit(x, y)
+
+    return function, len(df)
+
+
+def setup_cluster_events(scale, pages, directory):
+    """This function prepares the synthetic data with coordinates of the fake geocoder for the event clustering
+       benchmark, the whole archive is clustered at once.
+
+    Args:
+        scale (integer): Number of operations for the tabular benchmarks
+        pages (integer): Number of archive pages for the HTML benchmarks
+        directory (string): Temporary folder of the benchmark, it is removed afterwards
+
+    Returns:
+        function (function): Function to be measured
+        rows (integer): Number of processed rows
+    """
+
+    from events import cluster_events
+
+    df = generate_operations(scale)
+    geocoder = FakeGeocoder()
+    orte = {einsatzort: geocoder.geocode(einsatzort) for einsatzort in df["Einsatzort"].unique()}
+    df["Breitengrad"] = df["Einsatzort"].map(lambda einsatzort: orte[einsatzort].latitude)
+    df["Längengrad"] = df["Einsatzort"].map(lambda einsatzort: orte[einsatzort].longitude)
+
+    return lambda: cluster_events(df), scale
+
+
+BENCHMARKS = {"extract_data": setup_extract_data,
+              "webscraper": setup_webscraper,
+              "add_features": setup_add_features,
+              "create_dataset": setup_create_dataset,
+              "data_preprocessing": setup_data_preprocessing,
+              "distribute_labels_equally": setup_distribute_labels_equally,
+              "model_training": setup_model_training,
+              "cluster_events": setup_cluster_events}
+
+
+def run_benchmark(name, scale = 10000, pages = 20, repeat = 3):
+    """This function runs one benchmark. The time is measured without tracing, the peak memory in an extra traced run.
+
+    Args:
+        name (string): Name of the benchmark, key of BENCHMARKS
+        scale (integer, optional): Number of operations for the tabular benchmarks. Defaults to 10000.
+        pages (integer, optional): Number of archive pages for the HTML benchmarks. Defaults to 20.
+        repeat (integer, optional): Number of timed runs. Defaults to 3.
+
+    Returns:
+        result (dictionary): Best time in seconds, rows, rows per second and peak memory in KB
+    """
+
+    times = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        function, rows = BENCHMARKS[name](scale, pages, directory)
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            function()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            function()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    best = min(times)
+    result = {"seconds": best, "rows": rows, "rows_per_second": rows / best if best > 0 else float("inf"),
+              "peak_kb": peak // 1024}
+
+    return result
+
+
+def run_benchmarks(names = None, scale = 10000, pages = 20, repeat = 3, path = BENCHMARK_PATH):
+    """This function runs the benchmarks and appends the results to the history. Benchmarks which are slower than in
+       the last run with the same parameters are logged as warnings.
+
+    Args:
+        names (list, optional): Names of the benchmarks. Defaults to None, then all are executed.
+        scale (integer, optional): Number of operations for the tabular benchmarks. Defaults to 10000.
+        pages (integer, optional): Number of archive pages for the HTML benchmarks. Defaults to 20.
+        repeat (integer, optional): Number of timed runs. Defaults to 3.
+        path (string, optional): History file. Defaults to "./Reports/benchmark.jsonl".
+
+    Returns:
+        df_results (pandas DataFrame): One row per benchmark
+    """
+
+    names = list(BENCHMARKS) if names is None else names
+    results = {}
+
+    for name in names:
+        logging.info("Benchmark: " + name)
+        results[name] = run_benchmark(name, scale, pages, repeat)
+
+    # The benchmarks itself are instrumented too, so the report is created from the results only and the global
+    # timings and counters of the caller are left untouched
+    if path:
+        run = "benchmark scale=" + str(scale) + " pages=" + str(pages)
+        stages = {name: {"calls": 1, "seconds": result["seconds"], "max_seconds": result["seconds"]}
+                  for name, result in results.items()}
+        counters = {name + "_rows": result["rows"] for name, result in results.items()}
+        gauges = {}
+        for name, result in results.items():
+            gauges[name + "_rows_per_second"] = result["rows_per_second"]
+            gauges[name + "_peak_kb"] = result["peak_kb"]
+        instrumentation.write_report(path, run, report = instrumentation.create_report(run, stages, counters, gauges))
+
+    df_results = pd.DataFrame.from_dict(results, orient = "index")
+
+    return df_results
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py bench"
+    print(run_benchmarks(scale = 10000, pages = 20, repeat = 3))
@@ -0,0 +1,248 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: blobstore.py                                                                           #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides a compressed, memory-mapped store for the large HTML columns Content  #
+#          and Text. The data set itself only keeps the small columns.                              #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+import logging
+import mmap
+import os
+import zlib
+
+from instrumentation import timer, count
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+STORE_PATH = "./Dataset/einsätze_html"
+COLUMNS = ["Content", "Text"]
+# Long text of the detail pages, it stays in einsätze_details.csv and is not part of the data set either
+TEXT_COLUMNS = ["Einsatzbericht"]
+
+
+class BlobStore():
+    """This class stores the columns Content and Text of every operation zlib-compressed in one data file (.blob).
+       The index file (.index.csv) contains the offset and length of every entry, keyed by Nr and Alarmierungszeit,
+       because the Nr alone is not unique over all years. The data file is read with mmap, so only the requested
+       entries are loaded.
+    """
+
+    def __init__(self, path = STORE_PATH):
+        """Initialisation of the class (constructor).
+
+        Args:
+            path (string, optional): Path of the store without extension. Defaults to "./Dataset/einsätze_html".
+        """
+
+        self.path_data = path + ".blob"
+        self.path_index = path + ".index.csv"
+        self.file = None
+        self.mmap = None
+
+        if os.path.exists(self.path_index):
+            # The file is in append order, lookup_nr needs the newest operation first
+            self.df_index = pd.read_csv(self.path_index, dtype = {"Alarmierungszeit": str})
+            self.df_index = self.df_index.sort_values(by = ["Alarmierungszeit", "Nr"], ascending = False,
+                                                      kind = "stable").reset_index(drop = True)
+        else:
+            self.df_index = pd.DataFrame({"Nr": pd.Series(dtype = np.int64), "Alarmierungszeit": pd.Series(dtype = str),
+                                          **{column + suffix: pd.Series(dtype = np.int64) for column in COLUMNS
+                                             for suffix in ["_Offset", "_Länge"]}})
+        self.create_lookup()
+
+    def __enter__(self):
+        """This method returns the store for a with block.
+
+        Returns:
+            store (BlobStore): Store
+        """
+
+        return self
+
+    def __exit__(self, *_args):
+        """This method closes the data file at the end of a with block.
+        """
+
+        self.close()
+
+    def __len__(self):
+        """This method returns the number of stored operations.
+
+        Returns:
+            length (integer): Number of stored operations
+        """
+
+        return len(self.df_index)
+
+    def create_lookup(self):
+        """This method creates the dictionaries from the keys to the rows of the index, for O(1) access.
+        """
+
+        nr = self.df_index["Nr"].astype(int).tolist()
+        alarmierungszeit = self.df_index["Alarmierungszeit"].tolist()
+        self.lookup = dict(zip(zip(nr, alarmierungszeit), range(len(nr))))
+        # Without Alarmierungszeit the newest operation with the Nr is used, the index is sorted newest first
+        self.lookup_nr = {}
+        for row, key in enumerate(nr):
+            self.lookup_nr.setdefault(key, row)
+
+    def close(self):
+        """This method closes the memory map and the data file.
+        """
+
+        if self.mmap is not None:
+            self.mmap.close()
+            self.file.close()
+            self.mmap, self.file = None, None
+
+    def open(self):
+        """This method maps the data file into memory, if not done yet.
+        """
+
+        if self.mmap is None and os.path.exists(self.path_data) and os.path.getsize(self.path_data) > 0:
+            self.file = open(self.path_data, "rb")
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+
+    def append(self, df):
+        """This method adds the columns Content and Text of all operations which are not stored yet.
+
+        Args:
+            df (pandas DataFrame): Data with Nr, Alarmierungszeit, Content and Text
+
+        Returns:
+            df (pandas DataFrame): Data without Content and Text
+        """
+
+        self.close()
+        keys = list(zip(df["Nr"].astype(int), df["Alarmierungszeit"].astype(str)))
+        neu = np.array([key not in self.lookup for key in keys], dtype = bool)
+        df_neu = df[neu].drop_duplicates(subset = ["Nr", "Alarmierungszeit"])
+
+        offset = os.path.getsize(self.path_data) if os.path.exists(self.path_data) else 0
+        dict_index = {"Nr": df_neu["Nr"].astype(int).to_numpy(),
+                      "Alarmierungszeit": df_neu["Alarmierungszeit"].astype(str).to_numpy()}
+        blobs = []
+
+        with timer("blob_compress"):
+            for column in COLUMNS:
+                compressed = [zlib.compress(str(value).encode("utf-8")) for value in df_neu[column].fillna("")]
+                lengths = np.array([len(blob) for blob in compressed], dtype = np.int64)
+                dict_index[column + "_Offset"] = offset + sum(len(blob) for blob in blobs) + np.cumsum(lengths) - lengths
+                dict_index[column + "_Länge"] = lengths
+                blobs.extend(compressed)
+
+        with timer("blob_write"):
+            os.makedirs(os.path.dirname(self.path_data) or ".", exist_ok = True)
+            with open(self.path_data, "ab") as file:
+                file.write(b"".join(blobs))
+
+            df_index_neu = pd.DataFrame(dict_index)
+            df_index_neu.to_csv(self.path_index, mode = "a", index = False, header = len(self.df_index) == 0)
+
+        self.df_index = pd.concat([self.df_index, df_index_neu], ignore_index = True)
+        self.df_index = self.df_index.sort_values(by = ["Alarmierungszeit", "Nr"], ascending = False,
+                                                  kind = "stable").reset_index(drop = True)
+        self.create_lookup()
+        count("blob_rows", len(df_neu))
+        count("blob_bytes", sum(len(blob) for blob in blobs))
+
+        return df.drop(columns = [column for column in COLUMNS if column in df.columns])
+
+    def get(self, nr, column = "Content", alarmierungszeit = None):
+        """This method reads one entry of the store.
+
+        Args:
+            nr (integer): Nr of the operation
+            column (string, optional): "Content" or "Text". Defaults to "Content".
+            alarmierungszeit (string, optional): Alarmierungszeit of the operation, "%Y-%m-%d %H:%M:%S".
+                                                 Defaults to None, then the newest operation with the Nr is used.
+
+        Returns:
+            value (string): Content or Text of the operation
+        """
+
+        if alarmierungszeit is None:
+            row = self.lookup_nr[int(nr)]
+        else:
+            row = self.lookup[(int(nr), str(alarmierungszeit))]
+
+        self.open()
+        offset = int(self.df_index[column + "_Offset"].iat[row])
+        length = int(self.df_index[column + "_Länge"].iat[row])
+        count("blob_reads")
+
+        return zlib.decompress(self.mmap[offset:offset + length]).decode("utf-8")
+
+    def get_column(self, df, column = "Content"):
+        """This method reads the entries for all operations of a data set, e.g. for the notebooks.
+
+        Args:
+            df (pandas DataFrame): Data with Nr and Alarmierungszeit
+            column (string, optional): "Content" or "Text". Defaults to "Content".
+
+        Returns:
+            values (pandas Series): Content or Text, None for operations which are not stored
+        """
+
+        values = [self.get(nr, column, alarmierungszeit) if (int(nr), str(alarmierungszeit)) in self.lookup else None
+                  for nr, alarmierungszeit in zip(df["Nr"], df["Alarmierungszeit"])]
+
+        return pd.Series(values, index = df.index, name = column)
+
+
+def move_html_columns(df, store_path = STORE_PATH):
+    """This function moves the columns Content and Text into the store, if the data contains them.
+
+    Args:
+        df (pandas DataFrame): Data with Nr and Alarmierungszeit
+        store_path (string, optional): Path of the store without extension. Defaults to "./Dataset/einsätze_html".
+
+    Returns:
+        df (pandas DataFrame): Data without Content and Text
+    """
+
+    if set(COLUMNS).issubset(df.columns):
+        with BlobStore(store_path) as store:
+            df = store.append(df)
+
+    return df
+
+
+def migrate_dataset(path = "./Dataset/einsätze_erweitert.csv", store_path = STORE_PATH):
+    """This function moves the columns Content and Text of an existing data set into the store.
+
+    Args:
+        path (string, optional): Data set. Defaults to "./Dataset/einsätze_erweitert.csv".
+        store_path (string, optional): Path of the store without extension. Defaults to "./Dataset/einsätze_html".
+
+    Returns:
+        migrated (boolean): True if the columns were moved, False if the data set was already migrated
+    """
+
+    with timer("csv_read"):
+        df = pd.read_csv(path)
+
+    if not set(COLUMNS).issubset(df.columns):
+        logging.info("Data set is already migrated: " + path)
+        return False
+
+    size = os.path.getsize(path)
+    df = move_html_columns(df, store_path)
+
+    with timer("csv_write"):
+        df.to_csv(path, index = False)
+    logging.info("Size of the data set: " + str(round(size / 1e6, 2)) + " MB -> " +
+                 str(round(os.path.getsize(path) / 1e6, 2)) + " MB")
+
+    return True
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py dataset migrate"
+    migrate_dataset()
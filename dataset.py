@@ -10,10 +10,16 @@ import pandas as pd
 import geopy
 from geopy.extra.rate_limiter import RateLimiter
 import logging
+import os
+import sys
+
+from instrumentation import timer, timed, count
+from blobstore import move_html_columns
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
 
 
+@timed("add_features")
 def add_features(df):
     """This function adds features extracted directly from the data. For easier analysis.
 
@@ -40,11 +46,14 @@ def add_features(df):
     return df
 
 
-def add_geodata_features(df):
+@timed("add_geodata_features")
+def add_geodata_features(df, geocoder = None, min_delay_seconds = 1):
     """This function adds concrete geodata. Is limited to Schweinfurt county, otherwise too many errors will appear.
 
     Args:
         df (pandas DataFrame): Contains the data
+        geocoder (geopy Geocoder, optional): Object with a geocode method. Defaults to None, then Nominatim is used.
+        min_delay_seconds (float, optional): Minimum delay between two requests. Defaults to 1.
 
     Returns:
         df (pandas DataFrame): Contains all the data and extended features 
@@ -54,8 +63,9 @@ def add_geodata_features(df):
     df["Adresse_Einsatzort"] = "Germany, Bavaria, Schweinfurt, " + df["Einsatzort"]
 
     # Add coordinates from Einsatzort
-    service = geopy.Nominatim(user_agent = "myGeocoder")
-    df["Koordinaten_Einsatzort"] = df["Adresse_Einsatzort"].apply(RateLimiter(service.geocode, min_delay_seconds = 1))
+    service = geopy.Nominatim(user_agent = "myGeocoder") if geocoder is None else geocoder
+    df["Koordinaten_Einsatzort"] = df["Adresse_Einsatzort"].apply(RateLimiter(service.geocode, min_delay_seconds = min_delay_seconds))
+    count("geocode_requests", len(df))
 
     # Extract longitude and latitude
     df["Längengrad"] = df["Koordinaten_Einsatzort"].apply(lambda x: x.longitude if x is not None else None)
@@ -64,12 +74,19 @@ def add_geodata_features(df):
     return df
 
 
-def create_dataset():
+def create_dataset(geocoder = None, min_delay_seconds = 1, directory = "./Dataset"):
     """This function creates the dataset. The files must be downloaded beforehand with webscraping.
+
+    Args:
+        geocoder (geopy Geocoder, optional): Object with a geocode method. Defaults to None, then Nominatim is used.
+        min_delay_seconds (float, optional): Minimum delay between two geocoding requests. Defaults to 1.
+        directory (string, optional): Folder with einsätze.csv, all files are written into it. Defaults to "./Dataset".
     """
 
     # Read data
-    df = pd.read_csv("./Dataset/einsätze.csv")
+    with timer("csv_read"):
+        df = pd.read_csv(os.path.join(directory, "einsätze.csv"))
+    count("rows", len(df))
     logging.info("Shape of the scraped data: " + str(df.shape))
 
     # Feature Engineering
@@ -77,8 +94,10 @@ def create_dataset():
 
     # Do not query each Einsatzort individually, save time
     df_einsatzorte_unique = pd.DataFrame(df["Einsatzort"].unique(), columns = ["Einsatzort"])
-    df_einsatzorte_unique = add_geodata_features(df_einsatzorte_unique)
-    df_einsatzorte_unique.to_csv("./Dataset/einsatzorte_koordinaten.csv", index = False)    # save
+    df_einsatzorte_unique = add_geodata_features(df_einsatzorte_unique, geocoder, min_delay_seconds)
+    count("geocode_cache_hits", len(df) - len(df_einsatzorte_unique))
+    with timer("csv_write"):
+        df_einsatzorte_unique.to_csv(os.path.join(directory, "einsatzorte_koordinaten.csv"), index = False)    # save
 
     # Add coordinates of the Einsatzort
     df["Koordinaten_Einsatzort"] = df["Einsatzort"].map(df_einsatzorte_unique.set_index("Einsatzort")["Koordinaten_Einsatzort"])
@@ -87,8 +106,12 @@ def create_dataset():
     df["Längengrad"] = df["Koordinaten_Einsatzort"].apply(lambda x: x.longitude if x is not None else None)
     df["Breitengrad"] = df["Koordinaten_Einsatzort"].apply(lambda x: x.latitude if x is not None else None)
 
+    # Move the HTML columns into the blob store, the data set only keeps the small columns
+    df = move_html_columns(df, os.path.join(directory, "einsätze_html"))
+
     # Save df as csv
-    df.to_csv("./Dataset/einsätze_erweitert.csv", index = False)
+    with timer("csv_write"):
+        df.to_csv(os.path.join(directory, "einsätze_erweitert.csv"), index = False)
     logging.info("Shape of the extended data: " + str(df.shape))
     logging.info("The files 'einsätze.csv' and 'einsatzorte_koordinaten.csv' can be deleted.")
 
@@ -99,24 +122,58 @@ def extend_dataset():
     """
 
     # Read data
-    df = pd.read_csv("./Dataset/einsätze_erweitert.csv")
-    df.to_csv("./Dataset/einsätze_erweitert_alt.csv", index = False)
+    with timer("csv_read"):
+        df = pd.read_csv("./Dataset/einsätze_erweitert.csv")
+    with timer("csv_write"):
+        df.to_csv("./Dataset/einsätze_erweitert_alt.csv", index = False)
     logging.info("Shape the existing data: " + str(df.shape))
 
     # Read in newly scraped data
-    df_fehlend = pd.read_csv("./Dataset/einsätze_fehlend.csv")
+    with timer("csv_read"):
+        df_fehlend = pd.read_csv("./Dataset/einsätze_fehlend.csv")
+    count("rows", len(df_fehlend))
     logging.info("Shape of the new data: " + str(df_fehlend.shape))
     
     # Feature Engineering
     df_fehlend = add_features(df_fehlend)
     df_fehlend = add_geodata_features(df_fehlend)
 
+    # Move the HTML columns into the blob store, also of a data set created before the blob store
+    df = move_html_columns(df)
+    df_fehlend = move_html_columns(df_fehlend)
+
     # concat df and df_fehlend
     df = pd.concat([df, df_fehlend], axis = 0)
     df = df.sort_values(by = "Alarmierungszeit", ascending = False)
-    df.to_csv("./Dataset/einsätze_erweitert.csv", index = False)
+    with timer("csv_write"):
+        df.to_csv("./Dataset/einsätze_erweitert.csv", index = False)
     logging.info("Shape of the combined data: " + str(df.shape))
 
+    # The data set is saved, a broken state of one of the following updates must not fail the sync. Imported here,
+    # so that the other functions of this file do not load scipy and scikit-learn
+    from anomaly import update_anomalies
+    from events import update_events
+    from term_stats import update_term_stats
+
+    # Only the new days update the statistics, surges are logged
+    try:
+        update_anomalies(df)
+    except Exception as e:
+        logging.error("Anomaly statistics not updated: " + str(e))
+
+    # New operations join the open events (storms, floods) or form new ones, the Event_IDs are saved per operation
+    try:
+        df_assigned = update_events(df)
+        logging.info("Operations with a new or changed Event_ID: " + str((df_assigned["Event_ID"] >= 0).sum()))
+    except Exception as e:
+        logging.error("Events not updated: " + str(e))
+
+    # Term frequencies of the new Kurzberichte
+    try:
+        update_term_stats(df)
+    except Exception as e:
+        logging.error("Term statistics not updated: " + str(e))
+
     # Part of the csvs can be deleted
     logging.info("The files 'check.csv' and 'check_fehlend.csv' are not relevant any further.")
     logging.info("The files 'einsätze_erweitert_alt.csv' and 'einsätze_fehlend.csv' can be deleted.")
@@ -124,11 +181,6 @@ def extend_dataset():
 
 if __name__ == "__main__":
 
-    # User input
-    user_input = input("Do you want to create the dataset or extend the dataset? (create/extend): ")
-
-    if user_input == "create":
-        create_dataset()
-    elif user_input == "extend":
-        extend_dataset()   
-    
+    # Same as "python main.py dataset create|extend"
+    from main import main
+    sys.exit(main(["dataset"] + sys.argv[1:]))
@@ -0,0 +1,286 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: details.py                                                                             #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides the scraper for the detail pages (Link_einsatz) of the operations.    #
+#          End of the operation, vehicles and the full report are joined onto the data set.         #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import requests
+from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from furl import furl
+import gzip
+import logging
+import os
+import re
+import threading
+
+from instrumentation import timer, timed, count
+from blobstore import TEXT_COLUMNS
+from ratelimit import RateBudget, RateLimitedSession
+from webscraping import PROXIES, get_page
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+BASE_URL = "https://www.kfv-schweinfurt.de"
+DETAILS_PATH = "./Dataset/einsätze_details.csv"
+CACHE_DIR = "./Dataset/Details"
+DETAIL_COLUMNS = ["Einsatzende", "Fahrzeuge", "Einsatzbericht"]
+# The full report (TEXT_COLUMNS) stays in einsätze_details.csv, only the small columns are joined onto the data set
+JOIN_COLUMNS = [column for column in DETAIL_COLUMNS if column not in TEXT_COLUMNS]
+
+
+def get_cache_path(link, cache_dir = CACHE_DIR):
+    """This function determines the file of a detail page in the cache.
+
+    Args:
+        link (string): Link to the operation, e.g. "/index.php/einsaetze/einsatzbericht/40822"
+        cache_dir (string, optional): Folder of the cache. Defaults to "./Dataset/Details".
+
+    Returns:
+        path (string): File of the compressed page
+    """
+
+    name = re.sub("[^A-Za-z0-9]+", "_", link.rstrip("/").split("/")[-1])
+
+    return os.path.join(cache_dir, name + ".html.gz")
+
+
+def fetch_detail(link, base_url = BASE_URL, cache_dir = CACHE_DIR, session = None, proxy = PROXIES[1], budget = None):
+    """This function returns the detail page of an operation. Pages in the cache are not downloaded again,
+       downloaded pages are saved compressed in the cache.
+
+    Args:
+        link (string): Link to the operation
+        base_url (string, optional): Scheme and host of the website. Defaults to "https://www.kfv-schweinfurt.de".
+        cache_dir (string, optional): Folder of the cache, None to disable. Defaults to "./Dataset/Details".
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        budget (RateBudget, optional): Shared request budget, every attempt takes a token. Defaults to None (no limit).
+
+    Returns:
+        page (string): HTML code of the page
+    """
+
+    path = get_cache_path(link, cache_dir) if cache_dir is not None else None
+
+    if path is not None and os.path.exists(path):
+        count("detail_cache_hits")
+        with gzip.open(path, "rt", encoding = "utf-8") as file:
+            return file.read()
+
+    # Every attempt of get_page takes a token, also the retries
+    if budget is not None:
+        session = RateLimitedSession(requests if session is None else session, budget)
+    page = get_page(base_url + link, session, proxy).content.decode("utf-8")
+
+    if path is not None:
+        # Write atomically, an interrupted run must not leave a broken page in the cache
+        os.makedirs(cache_dir, exist_ok = True)
+        with gzip.open(path + ".tmp", "wt", encoding = "utf-8") as file:
+            file.write(page)
+        os.replace(path + ".tmp", path)
+
+    return page
+
+
+@timed("parse_detail")
+def parse_detail(page):
+    """This function extracts the details from the HTML code of a detail page. The details table consists of rows
+       with a label ending in ":" and a value, the report follows the heading "Einsatzbericht".
+
+    Args:
+        page (string): HTML code of the page
+
+    Returns:
+        dict_detail (dictionary): Einsatzende ("%Y-%m-%d %H:%M:%S"), Fahrzeuge (separated by ;) and Einsatzbericht,
+                                  None if not available
+    """
+
+    soup = BeautifulSoup(page, "html.parser")
+    dict_detail = dict.fromkeys(DETAIL_COLUMNS)
+
+    # Label and value of the details table
+    for row in soup.find_all("tr"):
+        cells = row.find_all(["td", "th"])
+        if len(cells) < 2 or not cells[0].get_text(strip = True).endswith(":"):
+            continue
+        label = cells[0].get_text(strip = True)[:-1]
+
+        if label == "Einsatzende":
+            datum_zeit = re.search(r"(\d{2}\.\d{2}\.\d{4})\D*(\d{2}:\d{2})", cells[1].get_text(" "))
+            if datum_zeit is not None:
+                einsatzende = datetime.strptime(datum_zeit.group(1) + " " + datum_zeit.group(2), "%d.%m.%Y %H:%M")
+                dict_detail["Einsatzende"] = einsatzende.strftime("%Y-%m-%d %H:%M:%S")
+
+        elif label == "Fahrzeuge":
+            fahrzeuge = [item.get_text(strip = True) for item in cells[1].find_all("li")]
+            if len(fahrzeuge) == 0:
+                fahrzeuge = [item.strip() for item in re.split("[,\n]", cells[1].get_text("\n")) if item.strip() != ""]
+            dict_detail["Fahrzeuge"] = ";".join(fahrzeuge)
+
+    # All paragraphs after the heading of the report
+    heading = soup.find(lambda tag: tag.name in ["h2", "h3", "h4"] and
+                        tag.get_text(strip = True).startswith("Einsatzbericht"))
+    if heading is not None:
+        absätze = [tag.get_text(" ", strip = True) for tag in heading.find_next_siblings("p")]
+        dict_detail["Einsatzbericht"] = "\n".join(absatz for absatz in absätze if absatz != "")
+
+    return dict_detail
+
+
+def get_missing_operations(df, df_details):
+    """This function determines the operations without details, newest operation first.
+
+    Args:
+        df (pandas DataFrame): Data set with Nr, Alarmierungszeit and Link_einsatz
+        df_details (pandas DataFrame): Already scraped details
+
+    Returns:
+        df_missing (pandas DataFrame): Nr, Alarmierungszeit and Link_einsatz of the operations without details
+    """
+
+    df_missing = df[["Nr", "Alarmierungszeit", "Link_einsatz"]].astype({"Alarmierungszeit": str})
+    df_missing = df_missing.merge(df_details[["Nr", "Alarmierungszeit"]].astype({"Alarmierungszeit": str}),
+                                  how = "left", on = ["Nr", "Alarmierungszeit"], indicator = True)
+    df_missing = df_missing[(df_missing["_merge"] == "left_only") & df_missing["Link_einsatz"].notna()]
+    df_missing = df_missing.drop(columns = "_merge").sort_values(by = ["Alarmierungszeit", "Nr"], ascending = False)
+
+    return df_missing.reset_index(drop = True)
+
+
+def scrape_details(df, path = DETAILS_PATH, cache_dir = CACHE_DIR, base_url = BASE_URL, session = None,
+                   proxy = PROXIES[1], workers = 4, rate = 1.0, limit = None, chunk_size = 100):
+    """This function scrapes the detail pages of all operations without details yet. The workers share one request
+       budget, so the server load only depends on rate. The results are appended after every chunk, an interrupted
+       run continues where it stopped. Failed pages are tried again in the next run.
+
+    Args:
+        df (pandas DataFrame): Data set with Nr, Alarmierungszeit and Link_einsatz
+        path (string, optional): File of the details. Defaults to "./Dataset/einsätze_details.csv".
+        cache_dir (string, optional): Folder of the page cache, None to disable. Defaults to "./Dataset/Details".
+        base_url (string, optional): Scheme and host of the website. Defaults to "https://www.kfv-schweinfurt.de".
+        session (requests Session, optional): Object with a get method. Defaults to None, then every worker uses its
+                                              own requests Session.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        workers (integer, optional): Number of parallel downloads. Defaults to 4.
+        rate (float, optional): Requests per second of all workers together. Defaults to 1.0.
+        limit (integer, optional): Maximum number of operations in this run. Defaults to None (all).
+        chunk_size (integer, optional): Number of operations between two saves. Defaults to 100.
+
+    Returns:
+        df_details (pandas DataFrame): All scraped details
+    """
+
+    df_details = pd.read_csv(path) if os.path.exists(path) else pd.DataFrame(columns = ["Nr", "Alarmierungszeit"])
+    df_missing = get_missing_operations(df, df_details)
+    df_missing = df_missing.head(limit) if limit is not None else df_missing
+    logging.info("Operations without details: " + str(len(df_missing)))
+
+    budget = RateBudget(rate)
+    local = threading.local()
+
+    def scrape(einsatz):
+        if session is None and not hasattr(local, "session"):
+            local.session = requests.Session()
+
+        try:
+            page = fetch_detail(einsatz.Link_einsatz, base_url, cache_dir, session or local.session, proxy, budget)
+            dict_detail = parse_detail(page)
+        except Exception as e:
+            logging.error(str(e) + ", details are fetched again in the next run")
+            count("failed_details")
+            return None
+
+        return {"Nr": einsatz.Nr, "Alarmierungszeit": einsatz.Alarmierungszeit, **dict_detail}
+
+    list_df = [df_details]
+
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        for start in range(0, len(df_missing), chunk_size):
+            chunk = df_missing.iloc[start:start + chunk_size].itertuples(index = False)
+            rows = [row for row in executor.map(scrape, chunk) if row is not None]
+            df_chunk = pd.DataFrame(rows, columns = ["Nr", "Alarmierungszeit"] + DETAIL_COLUMNS)
+
+            with timer("csv_write"):
+                df_chunk.to_csv(path, mode = "a", index = False, header = not os.path.exists(path))
+            list_df.append(df_chunk)
+            count("details", len(df_chunk))
+            logging.info("Details: " + str(start + len(df_chunk)) + " of " + str(len(df_missing)))
+
+    df_details = pd.concat(list_df, ignore_index = True)
+
+    return df_details
+
+
+def add_details(df, df_details):
+    """This function joins the small details onto the data set and adds the duration of the operation.
+       Details which were joined before are replaced, the Einsatzbericht is not joined (see TEXT_COLUMNS).
+
+    Args:
+        df (pandas DataFrame): Data set with Nr and Alarmierungszeit
+        df_details (pandas DataFrame): Scraped details
+
+    Returns:
+        df (pandas DataFrame): Data set with Einsatzende, Fahrzeuge and Einsatzdauer_Minuten
+    """
+
+    df = df.drop(columns = [column for column in DETAIL_COLUMNS + ["Einsatzdauer_Minuten"] if column in df.columns])
+    df_details = df_details.astype({"Alarmierungszeit": str})
+    df_details = df_details.drop_duplicates(subset = ["Nr", "Alarmierungszeit"], keep = "last")
+
+    alarmierungszeit = df["Alarmierungszeit"]
+    df = df.astype({"Alarmierungszeit": str}).merge(df_details[["Nr", "Alarmierungszeit"] + JOIN_COLUMNS], how = "left",
+                                                    on = ["Nr", "Alarmierungszeit"])
+    df["Alarmierungszeit"] = alarmierungszeit.to_numpy()
+
+    dauer = pd.to_datetime(df["Einsatzende"]) - pd.to_datetime(df["Alarmierungszeit"])
+    df["Einsatzdauer_Minuten"] = dauer.dt.total_seconds() // 60
+
+    return df
+
+
+def update_dataset_details(dataset_path = "./Dataset/einsätze_erweitert.csv", path = DETAILS_PATH, url = BASE_URL,
+                           workers = 4, rate = 1.0, limit = None, proxy = PROXIES[1]):
+    """This function scrapes the missing details and joins all details onto the data set.
+
+    Args:
+        dataset_path (string, optional): Data set. Defaults to "./Dataset/einsätze_erweitert.csv".
+        path (string, optional): File of the details. Defaults to "./Dataset/einsätze_details.csv".
+        url (string, optional): Any URL of the website, only scheme and host are used.
+                                Defaults to "https://www.kfv-schweinfurt.de".
+        workers (integer, optional): Number of parallel downloads. Defaults to 4.
+        rate (float, optional): Requests per second of all workers together. Defaults to 1.0.
+        limit (integer, optional): Maximum number of operations in this run. Defaults to None (all).
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+
+    Returns:
+        missing (integer): Number of operations which still have no details
+    """
+
+    with timer("csv_read"):
+        df = pd.read_csv(dataset_path)
+
+    base_url = furl(url).origin
+    df_details = scrape_details(df, path, os.path.join(os.path.dirname(path), "Details"), base_url, proxy = proxy,
+                                workers = workers, rate = rate, limit = limit)
+    df = add_details(df, df_details)
+
+    with timer("csv_write"):
+        df.to_csv(dataset_path, index = False)
+
+    missing = len(get_missing_operations(df, df_details))
+    logging.info("Operations without details: " + str(missing))
+
+    return missing
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py scrape details"
+    update_dataset_details()
@@ -0,0 +1,371 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: events.py                                                                              #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides a spatio-temporal clustering of operations into events (storms,       #
+#          floods). New operations are assigned to the open events incrementally.                   #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+from scipy.spatial import cKDTree
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+import json
+import logging
+import os
+
+from station_coverage import EARTH_RADIUS_KM
+from instrumentation import timer, count
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+STATE_PATH = "./Dataset/ereignisse_status.json"
+ASSIGNMENTS_PATH = "./Dataset/ereignisse_einsätze.csv"
+LATITUDE_0 = 50.0   # Schweinfurt county, reference of the projection
+EVENT_COLUMNS = ["Event_ID", "Start", "Ende", "Anzahl", "Längengrad_min", "Längengrad_max", "Breitengrad_min",
+                 "Breitengrad_max", "Längengrad_Mittel", "Breitengrad_Mittel", "Einsatztyp"]
+
+
+def find_links(zeit, längengrad, breitengrad, radius_km = 5.0, time_window_hours = 3.0, einsatztyp = None):
+    """This function finds all pairs of operations which are close in place and time. The time is scaled, so that
+       the time window has the same length as the radius, and one KD-tree over (x, y, time) returns all candidates
+       in near-linear time (Chebyshev distance). The candidates are then filtered by the real distance.
+
+    Args:
+        zeit (numpy array): Alarmierungszeit in seconds
+        längengrad (numpy array): Longitudes in degrees
+        breitengrad (numpy array): Latitudes in degrees
+        radius_km (float, optional): Maximum distance in km. Defaults to 5.0.
+        time_window_hours (float, optional): Maximum time difference in hours. Defaults to 3.0.
+        einsatztyp (numpy array, optional): Codes of the Einsatztyp, only equal types are linked. Defaults to None.
+
+    Returns:
+        pairs (numpy array): Index pairs, shape (k, 2)
+    """
+
+    # Equirectangular projection in km, exact enough within one county
+    x = EARTH_RADIUS_KM * np.radians(längengrad) * np.cos(np.radians(LATITUDE_0))
+    y = EARTH_RADIUS_KM * np.radians(breitengrad)
+    t = zeit / (time_window_hours * 3600) * radius_km
+
+    # Different types are moved far apart, so they are never neighbours
+    if einsatztyp is not None:
+        x = x + einsatztyp * 100 * radius_km
+
+    with timer("event_tree"):
+        tree = cKDTree(np.column_stack([x, y, t]))
+        pairs = tree.query_pairs(radius_km, p = np.inf, output_type = "ndarray")
+
+    distance = np.hypot(x[pairs[:, 0]] - x[pairs[:, 1]], y[pairs[:, 0]] - y[pairs[:, 1]])
+
+    return pairs[distance <= radius_km]
+
+
+def summarize(df):
+    """This function calculates time, extent and size of events.
+
+    Args:
+        df (pandas DataFrame): Operations with Event_ID, Alarmierungszeit, Längengrad, Breitengrad and Einsatztyp
+
+    Returns:
+        df_events (pandas DataFrame): One row per event
+    """
+
+    if df.empty:
+        return pd.DataFrame(columns = EVENT_COLUMNS)
+
+    df_events = df.groupby("Event_ID").agg(Start = ("Alarmierungszeit", "min"), Ende = ("Alarmierungszeit", "max"),
+                                           Anzahl = ("Alarmierungszeit", "size"),
+                                           Längengrad_min = ("Längengrad", "min"), Längengrad_max = ("Längengrad", "max"),
+                                           Breitengrad_min = ("Breitengrad", "min"), Breitengrad_max = ("Breitengrad", "max"),
+                                           Längengrad_Mittel = ("Längengrad", "mean"),
+                                           Breitengrad_Mittel = ("Breitengrad", "mean"),
+                                           Einsatztyp = ("Einsatztyp", lambda x: x.mode().iloc[0]))
+
+    return df_events.reset_index()[EVENT_COLUMNS]
+
+
+def merge_summaries(df_events):
+    """This function combines several summary rows of the same event, e.g. the saved part and the new operations.
+
+    Args:
+        df_events (pandas DataFrame): Summary rows, several rows per Event_ID possible
+
+    Returns:
+        df_events (pandas DataFrame): One row per event
+    """
+
+    df_events = df_events.assign(Summe_Längengrad = df_events["Längengrad_Mittel"] * df_events["Anzahl"],
+                                 Summe_Breitengrad = df_events["Breitengrad_Mittel"] * df_events["Anzahl"])
+    df_events = df_events.sort_values(by = "Anzahl", ascending = False).groupby("Event_ID").agg(
+        Start = ("Start", "min"), Ende = ("Ende", "max"), Anzahl = ("Anzahl", "sum"),
+        Längengrad_min = ("Längengrad_min", "min"), Längengrad_max = ("Längengrad_max", "max"),
+        Breitengrad_min = ("Breitengrad_min", "min"), Breitengrad_max = ("Breitengrad_max", "max"),
+        Summe_Längengrad = ("Summe_Längengrad", "sum"), Summe_Breitengrad = ("Summe_Breitengrad", "sum"),
+        Einsatztyp = ("Einsatztyp", "first"))
+
+    df_events["Längengrad_Mittel"] = df_events["Summe_Längengrad"] / df_events["Anzahl"]
+    df_events["Breitengrad_Mittel"] = df_events["Summe_Breitengrad"] / df_events["Anzahl"]
+
+    return df_events.reset_index()[EVENT_COLUMNS]
+
+
+class EventIndex():
+    """This class clusters operations into events. Operations are linked if they are at most radius_km apart and at
+       most time_window_hours apart, an event is a connected group of at least min_size operations. Only the
+       operations of the last time window are kept, because only they can be linked with new operations, and the
+       older operations of groups which are still too small, so that a slow chain reaches min_size as in the batch
+       clustering (tail). New operations are clustered together with the tail: they join open events, connect open
+       events or form new events. Event IDs stay stable, connected events keep the smaller ID.
+    """
+
+    def __init__(self, radius_km = 5.0, time_window_hours = 3.0, min_size = 5, by_type = False):
+        """Initialisation of the class (constructor).
+
+        Args:
+            radius_km (float, optional): Maximum distance of linked operations in km. Defaults to 5.0.
+            time_window_hours (float, optional): Maximum time difference of linked operations. Defaults to 3.0.
+            min_size (integer, optional): Minimum number of operations of an event. Defaults to 5.
+            by_type (boolean, optional): Only link operations of the same Einsatztyp. Defaults to False.
+        """
+
+        self.radius_km = radius_km
+        self.time_window_hours = time_window_hours
+        self.min_size = min_size
+        self.by_type = by_type
+        self.next_id = 0
+        self.last = None
+        self.merged = {}    # old Event_ID -> new Event_ID of the last add
+        self.df_tail = pd.DataFrame(columns = ["Nr", "Alarmierungszeit", "Längengrad", "Breitengrad", "Einsatztyp",
+                                               "Event_ID"])
+        self.df_events = pd.DataFrame(columns = EVENT_COLUMNS)
+
+    def add(self, df):
+        """This method assigns new operations to events. Operations without coordinates, operations which are
+           already in the tail and operations before the tail are ignored, so the whole data set can be passed.
+           Operations added later to the past (e.g. by repair) need a rebuild.
+
+        Args:
+            df (pandas DataFrame): Operations with Nr, Alarmierungszeit, Längengrad, Breitengrad and Einsatztyp
+
+        Returns:
+            df_assigned (pandas DataFrame): The new operations with Event_ID, -1 if they belong to no event, and the
+                                            operations of the tail whose Event_ID changed
+        """
+
+        self.merged = {}
+        df = df[["Nr", "Alarmierungszeit", "Längengrad", "Breitengrad", "Einsatztyp"]].dropna(subset = ["Längengrad", "Breitengrad"])
+        df = df.assign(Alarmierungszeit = pd.to_datetime(df["Alarmierungszeit"]).dt.strftime("%Y-%m-%d %H:%M:%S"))
+        if self.last is not None:
+            ende = pd.Timestamp(self.last) - pd.Timedelta(hours = self.time_window_hours)
+            df = df[df["Alarmierungszeit"] >= ende.strftime("%Y-%m-%d %H:%M:%S")]
+        tail_keys = set(zip(self.df_tail["Nr"].astype(int), self.df_tail["Alarmierungszeit"]))
+        df = df[[key not in tail_keys for key in zip(df["Nr"].astype(int), df["Alarmierungszeit"])]]
+        df = df.drop_duplicates(subset = ["Nr", "Alarmierungszeit"]).assign(Event_ID = -1)
+        count("event_operations", len(df))
+
+        if df.empty:
+            return df
+
+        with timer("event_clustering"):
+            df_all = pd.concat([self.df_tail.assign(Neu = False), df.assign(Neu = True)], ignore_index = True)
+            df_all = df_all.sort_values(by = "Alarmierungszeit", kind = "stable").reset_index(drop = True)
+            df_all["Event_ID"] = df_all["Event_ID"].astype(np.int64)
+
+            zeit = pd.to_datetime(df_all["Alarmierungszeit"]).to_numpy(dtype = "datetime64[s]").astype(np.int64)
+            einsatztyp = pd.factorize(df_all["Einsatztyp"])[0] if self.by_type else None
+            pairs = find_links(zeit, df_all["Längengrad"].to_numpy(dtype = np.float64),
+                               df_all["Breitengrad"].to_numpy(dtype = np.float64), self.radius_km,
+                               self.time_window_hours, einsatztyp)
+
+            # Connected groups of linked operations
+            n = len(df_all)
+            graph = coo_matrix((np.ones(len(pairs), dtype = np.int8), (pairs[:, 0], pairs[:, 1])), shape = (n, n))
+            _, komponente = connected_components(graph, directed = False)
+            df_all["Komponente"] = komponente
+            event_id_vorher = df_all["Event_ID"].copy()
+
+            self.assign_ids(df_all)
+
+        # Only the last time window can be linked with later operations, groups without event stay complete
+        self.last = df_all["Alarmierungszeit"].iloc[-1]
+        ende = pd.Timestamp(self.last) - pd.Timedelta(hours = self.time_window_hours)
+        aktiv = df_all["Alarmierungszeit"] >= ende.strftime("%Y-%m-%d %H:%M:%S")
+        offen = (df_all["Event_ID"] < 0) & df_all["Komponente"].isin(df_all.loc[aktiv, "Komponente"])
+        self.df_tail = df_all[aktiv | offen].drop(columns = ["Neu", "Komponente"]).reset_index(drop = True)
+
+        geändert = df_all["Neu"] | (df_all["Event_ID"] != event_id_vorher)
+        df_assigned = df_all[geändert].drop(columns = ["Neu", "Komponente"])
+        count("events", len(self.df_events))
+
+        return df_assigned.sort_values(by = "Alarmierungszeit", ascending = False).reset_index(drop = True)
+
+    def assign_ids(self, df_all):
+        """This method gives every group its Event_ID and updates the summaries of the events. Changes df_all.
+
+        Args:
+            df_all (pandas DataFrame): Tail and new operations with Event_ID (-1 for new ones) and Komponente
+        """
+
+        # Smallest existing ID per group, groups of events which are connected now are merged
+        df_known = df_all[df_all["Event_ID"] >= 0]
+        ziel = df_known.groupby("Komponente")["Event_ID"].min()
+        merged = df_known[df_known["Event_ID"] != df_known["Komponente"].map(ziel)]
+        zuordnung = dict(zip(merged["Event_ID"], merged["Komponente"].map(ziel)))
+
+        # New groups which are large enough become events
+        größe = df_all["Komponente"].map(df_all["Komponente"].value_counts())
+        neue_gruppen = np.setdiff1d(df_all.loc[größe >= self.min_size, "Komponente"].unique(), ziel.index)
+        ziel = pd.concat([ziel, pd.Series(np.arange(self.next_id, self.next_id + len(neue_gruppen)), index = neue_gruppen)])
+        self.next_id += len(neue_gruppen)
+
+        # Operations which were not part of an event yet are added to the summary of their event
+        zusätzlich = (df_all["Event_ID"] < 0) & df_all["Komponente"].isin(ziel.index)
+        df_all["Event_ID"] = df_all["Komponente"].map(ziel).fillna(-1).astype(np.int64)
+
+        df_events = self.df_events.copy()
+        df_events["Event_ID"] = df_events["Event_ID"].astype(np.int64).replace(zuordnung)
+        df_events = pd.concat([df_events, summarize(df_all[zusätzlich])], ignore_index = True)
+        self.df_events = merge_summaries(df_events) if not df_events.empty else df_events
+        self.merged = {int(alt): int(neu) for alt, neu in zuordnung.items()}
+        count("merged_events", len(zuordnung))
+
+    def get_events(self):
+        """This method returns all events.
+
+        Returns:
+            df_events (pandas DataFrame): One row per event with Event_ID, Start, Ende, Anzahl, extent, centre and
+                                          most common Einsatztyp, newest first
+        """
+
+        return self.df_events.sort_values(by = "Start", ascending = False).reset_index(drop = True)
+
+    def save(self, path = STATE_PATH):
+        """This method saves the parameters, the events and the tail as JSON, atomically.
+
+        Args:
+            path (string, optional): File of the state. Defaults to "./Dataset/ereignisse_status.json".
+        """
+
+        state = {"parameters": {"radius_km": self.radius_km, "time_window_hours": self.time_window_hours,
+                                "min_size": self.min_size, "by_type": self.by_type},
+                 "next_id": self.next_id,
+                 "last": self.last,
+                 "tail": self.df_tail.to_dict("records"),
+                 "events": self.df_events.to_dict("records")}
+
+        with open(path + ".tmp", "w", encoding = "utf-8") as file:
+            json.dump(state, file, ensure_ascii = False, default = int)
+        os.replace(path + ".tmp", path)
+
+    @classmethod
+    def load(cls, path = STATE_PATH, **parameters):
+        """This method loads the state, a new index is created if there is no state yet.
+
+        Args:
+            path (string, optional): File of the state. Defaults to "./Dataset/ereignisse_status.json".
+            parameters (dictionary): Parameters of a new index, see __init__
+
+        Returns:
+            index (EventIndex): Event index
+        """
+
+        if not os.path.exists(path):
+            return cls(**parameters)
+
+        with open(path, "r", encoding = "utf-8") as file:
+            state = json.load(file)
+
+        index = cls(**state["parameters"])
+        index.next_id = state["next_id"]
+        index.last = state["last"]
+        if len(state["tail"]) > 0:
+            index.df_tail = pd.DataFrame(state["tail"])
+        if len(state["events"]) > 0:
+            index.df_events = pd.DataFrame(state["events"])[EVENT_COLUMNS]
+
+        return index
+
+
+def cluster_events(df, radius_km = 5.0, time_window_hours = 3.0, min_size = 5, by_type = False):
+    """This function clusters a whole data set into events.
+
+    Args:
+        df (pandas DataFrame): Operations with Nr, Alarmierungszeit, Längengrad, Breitengrad and Einsatztyp
+        radius_km (float, optional): Maximum distance of linked operations in km. Defaults to 5.0.
+        time_window_hours (float, optional): Maximum time difference of linked operations. Defaults to 3.0.
+        min_size (integer, optional): Minimum number of operations of an event. Defaults to 5.
+        by_type (boolean, optional): Only link operations of the same Einsatztyp. Defaults to False.
+
+    Returns:
+        df_assigned (pandas DataFrame): Operations with Event_ID, -1 if they belong to no event
+        df_events (pandas DataFrame): One row per event
+    """
+
+    index = EventIndex(radius_km, time_window_hours, min_size, by_type)
+    df_assigned = index.add(df)
+
+    return df_assigned, index.get_events()
+
+
+def save_assignments(df_assigned, merged = None, path = ASSIGNMENTS_PATH):
+    """This function saves the Event_ID of every operation which belongs to an event. Assignments of the same
+       operation are replaced, operations of merged events get the new Event_ID.
+
+    Args:
+        df_assigned (pandas DataFrame): Operations with Nr, Alarmierungszeit and Event_ID, see EventIndex.add
+        merged (dictionary, optional): Old Event_ID -> new Event_ID. Defaults to None.
+        path (string, optional): File of the assignments. Defaults to "./Dataset/ereignisse_einsätze.csv".
+
+    Returns:
+        df_assignments (pandas DataFrame): Nr, Alarmierungszeit and Event_ID of all operations in events
+    """
+
+    if os.path.exists(path):
+        df_assignments = pd.read_csv(path, dtype = {"Alarmierungszeit": str})
+    else:
+        df_assignments = pd.DataFrame({"Nr": pd.Series(dtype = np.int64), "Alarmierungszeit": pd.Series(dtype = str),
+                                       "Event_ID": pd.Series(dtype = np.int64)})
+
+    df_assignments["Event_ID"] = df_assignments["Event_ID"].astype(np.int64).replace(merged or {})
+    df_neu = df_assigned.loc[df_assigned["Event_ID"] >= 0, ["Nr", "Alarmierungszeit", "Event_ID"]]
+    df_assignments = pd.concat([df_assignments, df_neu], ignore_index = True)
+    df_assignments = df_assignments.drop_duplicates(subset = ["Nr", "Alarmierungszeit"], keep = "last")
+    df_assignments = df_assignments.sort_values(by = "Alarmierungszeit", ascending = False).reset_index(drop = True)
+
+    with timer("csv_write"):
+        df_assignments.to_csv(path + ".tmp", index = False)
+        os.replace(path + ".tmp", path)
+
+    return df_assignments
+
+
+def update_events(df, path = STATE_PATH, assignments_path = ASSIGNMENTS_PATH):
+    """This function assigns new operations to the saved events. The first call clusters the whole history.
+       The Event_ID of every operation is saved in the assignments file, see save_assignments.
+
+    Args:
+        df (pandas DataFrame): Data set or new operations
+        path (string, optional): File of the state. Defaults to "./Dataset/ereignisse_status.json".
+        assignments_path (string, optional): File of the assignments. Defaults to "./Dataset/ereignisse_einsätze.csv".
+
+    Returns:
+        df_assigned (pandas DataFrame): The new operations and the changed operations of the tail with Event_ID
+    """
+
+    index = EventIndex.load(path)
+    df_assigned = index.add(df)
+    save_assignments(df_assigned, index.merged, assignments_path)
+    index.save(path)
+
+    return df_assigned
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py events"
+    update_events(pd.read_csv("./Dataset/einsätze_erweitert.csv"))
+    print(EventIndex.load().get_events().head(20))
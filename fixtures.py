@@ -0,0 +1,424 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: fixtures.py                                                                            #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides offline fixtures: a synthetic operations generator, HTML and RSS     #
+#          pages in the layout of the KFV archive, recorded pages and a fake geocoder.              #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+from collections import namedtuple
+from furl import furl
+import html
+import os
+import re
+import zlib
+
+
+BASE_URL = "https://www.kfv-schweinfurt.de"
+PAGE_SIZE = 10
+
+EINSATZTYPEN = ["Technische Hilfe", "Brand", "Sonstiges", "Gefahrgut", "First Responder", "Sicherheitswache"]
+EINSATZTYPEN_P = [0.48, 0.30, 0.12, 0.04, 0.04, 0.02]
+EINSATZORTE = ["Schweinfurt", "Gochsheim", "Röthlein", "Heidenfeld", "Grafenrheinfeld", "Bergrheinfeld", "Werneck",
+               "Niederwerrn", "Schonungen", "Gerolzhofen", "Dittelbrunn", "Euerbach", "Geldersheim", "Poppenhausen",
+               "Sennfeld", "Schwebheim", "Donnersdorf", "Wasserlosen", "Stadtlauringen", "Üchtelhausen"]
+KURZBERICHTE = {"Technische Hilfe": ["Wohnung öffnen akut", "Verkehrsunfall mit eingeklemmter Person", "Baum auf Straße",
+                                     "Ölspur", "Wasser im Keller", "Tragehilfe Rettungsdienst"],
+                "Brand": ["Brand am Gebäude", "Flächenbrand", "Brandmeldeanlage ausgelöst", "Kaminbrand",
+                          "PKW Brand", "Rauchentwicklung"],
+                "Sonstiges": ["Unterstützung Polizei", "Tierrettung", "Sturmschaden"],
+                "Gefahrgut": ["Gasgeruch", "Austritt Betriebsstoffe"],
+                "First Responder": ["Notfall", "Reanimation"],
+                "Sicherheitswache": ["Sicherheitswache Veranstaltung"]}
+WOCHENTAGE_KURZ = ["Mo", "Di", "Mi", "Do", "Fr", "Sa", "So"]
+WOCHENTAGE_RSS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+FAHRZEUGE = ["HLF 20", "LF 10", "TLF 16/25", "DLK 23/12", "MTW", "RW", "GW-L2", "KdoW"]
+MONATE_RSS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+Location = namedtuple("Location", ["address", "latitude", "longitude"])
+
+
+def generate_operations(n, seed = 28, with_html = False, newest = "2022-12-31 21:55:00"):
+    """This function generates synthetic operations with the same columns as the scraped data. Vectorized, so
+       that millions of rows can be generated within seconds. Newest operation first, like the archive.
+
+    Args:
+        n (integer): Number of operations
+        seed (integer, optional): Seed of the random generator. Defaults to 28.
+        with_html (boolean, optional): Fill Content and Text with the HTML code of the row. Defaults to False.
+        newest (string, optional): Alarmierungszeit of the newest operation. Defaults to "2022-12-31 21:55:00".
+
+    Returns:
+        df (pandas DataFrame): Synthetic operations
+    """
+
+    rng = np.random.default_rng(seed)
+
+    # Roughly two operations per day, full minutes like on the website
+    abstände = rng.exponential(12 * 60, n).astype(np.int64) + 1
+    abstände[0] = 0
+    alarmierungszeit = pd.Timestamp(newest) - pd.to_timedelta(np.cumsum(abstände), unit = "m")
+
+    einsatztyp = rng.choice(len(EINSATZTYPEN), n, p = EINSATZTYPEN_P)
+    einsatzort = rng.integers(0, len(EINSATZORTE), n)
+
+    # Local fire brigade first, then up to three further organisations
+    organisationen_pool = np.array(["FF " + ort for ort in EINSATZORTE] + ["FL Schweinfurt-Land 1", "FL Schweinfurt-Land 4",
+                                                                         "FL Schweinfurt-Land 4/4", "BF Schweinfurt"], dtype = object)
+    weitere = rng.integers(0, len(organisationen_pool), (n, 3))
+    anzahl_weitere = rng.integers(0, 4, n)
+    organisationen = organisationen_pool[einsatzort]
+    for i in range(3):
+        mit = anzahl_weitere > i
+        organisationen = np.where(mit, organisationen + ";" + organisationen_pool[weitere[:, i]], organisationen)
+
+    # Kurzbericht of the matching Einsatztyp
+    kurzbericht = np.empty(n, dtype = object)
+    for i, typ in enumerate(EINSATZTYPEN):
+        maske = einsatztyp == i
+        kurzbericht[maske] = np.array(KURZBERICHTE[typ], dtype = object)[rng.integers(0, len(KURZBERICHTE[typ]), maske.sum())]
+
+    bild = np.where(rng.random(n) < 0.1, pd.Series(np.arange(n)).map("bild_{}.jpg".format).to_numpy(), "nopic.png")
+    link_id = 40822 - np.arange(n) * 3
+
+    df = pd.DataFrame({"Nr": np.arange(n, 0, -1),
+                       "Alarmierungszeit": alarmierungszeit.strftime("%Y-%m-%d %H:%M:%S"),
+                       "Wochentag": alarmierungszeit.strftime("%A"),
+                       "Einsatztyp": np.array(EINSATZTYPEN, dtype = object)[einsatztyp],
+                       "Einsatzort": np.array(EINSATZORTE, dtype = object)[einsatzort],
+                       "Link_einsatz": pd.Series(link_id).map("/index.php/einsaetze/einsatzbericht/{}".format).to_numpy(),
+                       "Bild": bild,
+                       "Kurzbericht": kurzbericht,
+                       "Organisationen": organisationen,
+                       "Content": "Content",
+                       "Text": "Text"})
+
+    if with_html:
+        rows = [create_row(row) for row in df.itertuples(index = False)]
+        df["Content"] = rows
+        df["Text"] = [re.sub("<[^>]*>", "", row) for row in rows]
+
+    return df
+
+
+def create_row(einsatz, base_url = BASE_URL):
+    """This function creates the HTML code of one row of the table #einsatzberichtList.
+
+    Args:
+        einsatz (namedtuple, pandas Series): Operation with Alarmierungszeit, Einsatztyp, Einsatzort, Link_einsatz,
+                                             Bild, Kurzbericht and Organisationen
+        base_url (string, optional): Website of the images. Defaults to "https://www.kfv-schweinfurt.de".
+
+    Returns:
+        row (string): HTML code of the row
+    """
+
+    zeit = pd.Timestamp(einsatz.Alarmierungszeit)
+    bild = "einsatzbilder/" + str(zeit.year) + "/" + einsatz.Bild if einsatz.Bild != "nopic.png" else "nopic.png"
+
+    # The organisations are hidden in comments, extract_data reads them from the HTML code
+    organisationen = "".join(['<!-- <span class="label label-info"> --!>' + html.escape(organisation, quote = False) +
+                              "<!-- </span>--!>" for organisation in str(einsatz.Organisationen).split(";")])
+
+    # extract_data expects the text at fixed lines
+    lines = [""] * 26
+    lines[1] = "Alarmierung"    # whitespace-only text between table tags is collapsed by the parser
+    lines[2] = WOCHENTAGE_KURZ[zeit.dayofweek] + " " + zeit.strftime("%d.%m.%Y") + " " + zeit.strftime("%H:%M") + "Uhr"
+    lines[6] = html.escape(einsatz.Einsatztyp, quote = False)
+    lines[8] = "Einsatzort"
+    lines[9] = " " + html.escape(einsatz.Einsatzort, quote = False) + "\t\t"
+    lines[23] = "\t" * 5 + html.escape(str(einsatz.Kurzbericht), quote = False)
+
+    row = ('<tr class="row">' + "\n".join(lines[:2]) + "\n" +
+           '<td class="date">' + lines[2] + "\n" + "\n".join(lines[3:6]) + "\n" +
+           '<td class="type"><a href="' + einsatz.Link_einsatz + '">' + lines[6] + "</a>" + "\n" + "\n".join(lines[7:9]) + "\n" +
+           '<td class="place">' + lines[9] + "\n" + "\n".join(lines[10:23]) + "\n" +
+           '<td class="report"><img src="' + base_url + "/images/" + bild + '"/>' + lines[23] + "\n" +
+           "\n".join(lines[24:]) + "<!--" + organisationen + " --></td></tr>")
+
+    return row
+
+
+def create_archive_page(df_page, start = 0, last_start = 0, base_url = BASE_URL):
+    """This function creates an archive page (einsaetze/einsatzarchiv?start=N) with the table #einsatzberichtList.
+
+    Args:
+        df_page (pandas DataFrame): Operations of the page
+        start (integer, optional): Start number of the page. Defaults to 0.
+        last_start (integer, optional): Start number of the last page, for the pagination. Defaults to 0.
+        base_url (string, optional): Website of the images. Defaults to "https://www.kfv-schweinfurt.de".
+
+    Returns:
+        page (string): HTML code of the page
+    """
+
+    pagination = "".join(['<li><a href="/index.php/einsaetze/einsatzarchiv?start=' + str(nummer) + '">' +
+                          str(nummer // PAGE_SIZE + 1) + "</a></li>"
+                          for nummer in sorted({max(start - PAGE_SIZE, 0), start, min(start + PAGE_SIZE, last_start)})])
+    pagination += '<li><a title="Ende" href="/index.php/einsaetze/einsatzarchiv?start=' + str(last_start) + '">Ende</a></li>'
+
+    # header row, operations, two footer rows (excluded by webscraper)
+    rows = "".join(create_row(einsatz, base_url) for einsatz in df_page.itertuples(index = False))
+    page = ('<html><body><table id="einsatzberichtList"><tr><th>Datum</th><th>Art</th><th>Ort</th><th>Bericht</th></tr>' + rows +
+            '<tr><td colspan="4"></td></tr><tr><td colspan="4"><ul class="pagination">' + pagination + "</ul></td></tr>" +
+            "</table></body></html>")
+
+    return page
+
+
+def create_feed_page(df_page, base_url = BASE_URL):
+    """This function creates an RSS feed page (einsaetze/einsatzarchiv?format=feed&type=rss&start=N).
+
+    Args:
+        df_page (pandas DataFrame): Operations of the page
+        base_url (string, optional): Website of the links. Defaults to "https://www.kfv-schweinfurt.de".
+
+    Returns:
+        page (string): XML code of the page
+    """
+
+    items = []
+
+    for einsatz in df_page.itertuples(index = False):
+        zeit = pd.Timestamp(einsatz.Alarmierungszeit)
+        pub_date = (WOCHENTAGE_RSS[zeit.dayofweek] + ", " + zeit.strftime("%d") + " " + MONATE_RSS[zeit.month - 1] + " " +
+                    zeit.strftime("%Y %H:%M:%S") + " +0000")
+        items.append("<item><title>Einsatzbericht Nr: " + str(einsatz.Nr) + " - " + html.escape(str(einsatz.Kurzbericht)) +
+                     "</title><link>" + base_url + einsatz.Link_einsatz + "</link><pubDate>" + pub_date + "</pubDate></item>")
+
+    page = ('<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>Einsatzarchiv</title>' +
+            "".join(items) + "</channel></rss>")
+
+    return page
+
+
+def create_detail_page(einsatz):
+    """This function creates the detail page of an operation (einsaetze/einsatzbericht/ID) with the details table
+       and the full report. End of the operation and vehicles are derived from the link, so they are deterministic.
+
+    Args:
+        einsatz (namedtuple, pandas Series): Operation with Alarmierungszeit, Einsatztyp, Einsatzort, Link_einsatz,
+                                             Kurzbericht and Organisationen
+
+    Returns:
+        page (string): HTML code of the page
+    """
+
+    checksum = zlib.crc32(einsatz.Link_einsatz.encode("utf-8"))
+    zeit = pd.Timestamp(einsatz.Alarmierungszeit)
+    einsatzende = zeit + pd.Timedelta(minutes = 10 + checksum % 240)
+    fahrzeuge = [organisation + " " + FAHRZEUGE[(checksum + i) % len(FAHRZEUGE)]
+                 for i, organisation in enumerate(str(einsatz.Organisationen).split(";"))]
+
+    page = ('<html><body><div class="eiko_einsatzbericht"><h1>' + html.escape(einsatz.Einsatztyp, quote = False) + "</h1>" +
+            '<table class="eiko_details">' +
+            "<tr><td>Alarmierung:</td><td>" + zeit.strftime("%d.%m.%Y %H:%M") + " Uhr</td></tr>" +
+            "<tr><td>Einsatzende:</td><td>" + einsatzende.strftime("%d.%m.%Y %H:%M") + " Uhr</td></tr>" +
+            "<tr><td>Einsatzort:</td><td>" + html.escape(einsatz.Einsatzort, quote = False) + "</td></tr>" +
+            "<tr><td>Fahrzeuge:</td><td><ul>" + "".join("<li>" + html.escape(fahrzeug, quote = False) + "</li>"
+                                                       for fahrzeug in fahrzeuge) + "</ul></td></tr></table>" +
+            "<h2>Einsatzbericht:</h2><p>" + html.escape(str(einsatz.Kurzbericht), quote = False) + ". " +
+            "Die Einsatzstelle wurde erkundet und abgesichert.</p><p>Anschließend Rückfahrt zum Standort.</p>" +
+            "</div></body></html>")
+
+    return page
+
+
+def create_image(path):
+    """This function creates the bytes of an image. Every tenth image has the same content as another image, like an
+       image which was uploaded twice under different names.
+
+    Args:
+        path (string): Path of the image, e.g. "/images/einsatzbilder/2022/bild_1.jpg"
+
+    Returns:
+        image (bytes): Content of the image
+    """
+
+    checksum = zlib.crc32(path.encode("utf-8"))
+    if checksum % 10 == 0:
+        checksum = 0
+
+    rng = np.random.default_rng(checksum)
+    pixel = rng.integers(0, 256, (32, 32, 3), dtype = np.uint8)
+
+    # Binary PPM, readable by Pillow without further libraries
+    image = b"P6 32 32 255\n" + pixel.tobytes()
+
+    return image
+
+
+def get_recording_name(url):
+    """This function converts a URL into a file name for recorded pages.
+
+    Args:
+        url (string): URL of the page
+
+    Returns:
+        name (string): File name
+    """
+
+    url = furl(url)
+    name = re.sub("[^A-Za-z0-9]+", "_", str(url.path) + "_" + "_".join(k + "_" + str(v) for k, v in sorted(url.args.items())))
+
+    return name.strip("_") + ".html"
+
+
+def record_pages(urls, directory = "./Fixtures"):
+    """This function downloads pages once and saves them, so that they can be replayed offline with FakeSession.
+
+    Args:
+        urls (list): URLs of the pages
+        directory (string, optional): Folder of the recorded pages. Defaults to "./Fixtures".
+    """
+
+    import requests
+
+    os.makedirs(directory, exist_ok = True)
+
+    for url in urls:
+        page = requests.get(url)
+        with open(os.path.join(directory, get_recording_name(url)), "wb") as file:
+            file.write(page.content)
+
+
+class FakeResponse():
+    """This class imitates the parts of requests Response which are used by the scrapers.
+    """
+
+    def __init__(self, content, status_code = 200):
+        """Initialisation of the class (constructor).
+
+        Args:
+            content (bytes): Content of the response
+            status_code (integer, optional): HTTP status code. Defaults to 200.
+        """
+
+        self.content = content
+        self.status_code = status_code
+
+    @property
+    def text(self):
+        """This method returns the content as string, like requests.
+
+        Returns:
+            text (string): Decoded content
+        """
+
+        return self.content.decode("utf-8", errors = "replace")
+
+    def raise_for_status(self):
+        """This method raises an exception for error status codes, like requests.
+        """
+
+        if self.status_code >= 400:
+            raise Exception("HTTP error " + str(self.status_code))
+
+    def iter_content(self, chunk_size = 1):
+        """This method returns the content in chunks, like a streamed requests Response.
+
+        Args:
+            chunk_size (integer, optional): Size of the chunks in bytes. Defaults to 1.
+
+        Returns:
+            chunks (generator): Chunks of the content
+        """
+
+        return (self.content[i:i + chunk_size] for i in range(0, len(self.content), chunk_size))
+
+    def close(self):
+        """This method releases the connection, like requests. Nothing to do.
+        """
+
+
+class FakeSession():
+    """This class replaces requests for the scrapers. Recorded pages are served first, all other archive, feed,
+       detail pages and images are generated from a corpus of operations.
+    """
+
+    def __init__(self, df_corpus, directory = None, page_size = PAGE_SIZE, base_url = BASE_URL):
+        """Initialisation of the class (constructor).
+
+        Args:
+            df_corpus (pandas DataFrame): Operations, newest first
+            directory (string, optional): Folder with recorded pages. Defaults to None.
+            page_size (integer, optional): Operations per page. Defaults to 10.
+            base_url (string, optional): Website of the images and links. Defaults to "https://www.kfv-schweinfurt.de".
+        """
+
+        self.df_corpus = df_corpus.reset_index(drop = True)
+        self.directory = directory
+        self.page_size = page_size
+        self.base_url = base_url
+        self.requests = 0
+
+    def get(self, url, **_kwargs):
+        """This method returns the page of the URL. Further arguments (proxies, timeout) are ignored.
+
+        Args:
+            url (string): URL of the page
+
+        Returns:
+            response (FakeResponse): Response with the page
+        """
+
+        self.requests += 1
+
+        if self.directory is not None:
+            path = os.path.join(self.directory, get_recording_name(url))
+            if os.path.exists(path):
+                with open(path, "rb") as file:
+                    return FakeResponse(file.read())
+
+        url = furl(url)
+        if str(url.path).startswith("/images/"):
+            return FakeResponse(create_image(str(url.path)))
+
+        if "einsatzbericht" in str(url.path):
+            df_einsatz = self.df_corpus[self.df_corpus["Link_einsatz"] == str(url.path)]
+            if df_einsatz.empty:
+                return FakeResponse(b"Not Found", 404)
+            return FakeResponse(create_detail_page(next(df_einsatz.itertuples(index = False))).encode("utf-8"))
+
+        args = url.args
+        start = int(args.get("start", 0))
+        df_page = self.df_corpus.iloc[start:start + self.page_size]
+
+        if args.get("format") == "feed":
+            page = create_feed_page(df_page, self.base_url)
+        else:
+            last_start = max(len(self.df_corpus) - 1, 0) // self.page_size * self.page_size
+            page = create_archive_page(df_page, start, last_start, self.base_url)
+
+        return FakeResponse(page.encode("utf-8"))
+
+
+class FakeGeocoder():
+    """This class replaces the Nominatim geocoder. Every address gets deterministic coordinates in Schweinfurt county.
+    """
+
+    def __init__(self):
+        """Initialisation of the class (constructor).
+        """
+
+        self.requests = 0
+
+    def geocode(self, address):
+        """This method returns the coordinates of an address.
+
+        Args:
+            address (string): Address
+
+        Returns:
+            location (Location): Location with address, latitude and longitude
+        """
+
+        self.requests += 1
+        checksum = zlib.crc32(address.encode("utf-8"))
+        latitude = 49.85 + (checksum % 1000) / 1000 * 0.35
+        longitude = 9.95 + (checksum // 1000 % 1000) / 1000 * 0.6
+
+        return Location(address, latitude, longitude)
@@ -0,0 +1,267 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: images.py                                                                              #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides the download of the operation images (Bild). Images are streamed to   #
+#          disk, deduplicated by file name and content and get thumbnails.                          #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import requests
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import hashlib
+import importlib
+import logging
+import os
+import re
+import threading
+
+from instrumentation import timer, count
+from ratelimit import RateBudget
+from webscraping import PROXIES
+from sources import KFV_SCHWEINFURT
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+IMAGES_DIR = "./Dataset/Bilder"
+MANIFEST_PATH = "./Dataset/bilder.csv"
+MANIFEST_COLUMNS = ["Bild", "URL", "Sha256", "Bytes", "Datei"]
+NO_IMAGE = "nopic.png"
+
+
+def get_image_urls(df, store_path = None, source = KFV_SCHWEINFURT):
+    """This function determines the URL of every image. The path of the image is taken from the HTML code of the
+       operation, if the data or the blob store contains it, otherwise it is einsatzbilder/Jahr/Bild.
+
+    Args:
+        df (pandas DataFrame): Data set with Nr, Alarmierungszeit and Bild
+        store_path (string, optional): Blob store with the HTML code. Defaults to None (not used).
+        source (Source, optional): Website of the images, see Source.images_url. Defaults to KFV_SCHWEINFURT.
+
+    Returns:
+        df_urls (pandas DataFrame): Bild and URL, one row per file name, newest operation first
+    """
+
+    images_url = source.images_url
+    df_urls = df[df["Bild"].notna() & (df["Bild"] != NO_IMAGE)]
+    df_urls = df_urls.sort_values(by = "Alarmierungszeit", ascending = False).drop_duplicates(subset = "Bild")
+
+    if "Content" in df_urls.columns:
+        content = df_urls["Content"]
+    elif store_path is not None and os.path.exists(store_path + ".index.csv"):
+        from blobstore import BlobStore
+        with BlobStore(store_path) as store:
+            content = store.get_column(df_urls.astype({"Alarmierungszeit": str}))
+    else:
+        content = pd.Series(None, index = df_urls.index, dtype = object)
+
+    jahr = pd.to_datetime(df_urls["Alarmierungszeit"]).dt.year.astype(str)
+    pfad = content.fillna("").str.extract(re.escape(images_url) + r'([^"]+)', expand = False)
+    pfad = pfad.fillna("einsatzbilder/" + jahr + "/" + df_urls["Bild"])
+
+    df_urls = pd.DataFrame({"Bild": df_urls["Bild"].to_numpy(), "URL": (images_url + pfad).to_numpy()})
+
+    return df_urls
+
+
+def download_image(url, path, session = None, proxy = PROXIES[1], chunk_size = 65536):
+    """This function streams an image to disk, the file is never completely in memory. The hash is computed while
+       writing. An interrupted download leaves only a .tmp file, which is overwritten in the next run.
+
+    Args:
+        url (string): URL of the image
+        path (string): File of the image
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        chunk_size (integer, optional): Size of the chunks in bytes. Defaults to 65536.
+
+    Returns:
+        sha256 (string): Hash of the content
+        size (integer): Size in bytes
+    """
+
+    session = requests if session is None else session
+    sha256 = hashlib.sha256()
+    size = 0
+
+    with timer("request"):
+        response = session.get(url, proxies = proxy, timeout = 60, stream = True)
+
+    try:
+        response.raise_for_status()
+
+        with timer("image_write"), open(path + ".tmp", "wb") as file:
+            for chunk in response.iter_content(chunk_size = chunk_size):
+                file.write(chunk)
+                sha256.update(chunk)
+                size += len(chunk)
+    finally:
+        response.close()
+
+    os.replace(path + ".tmp", path)
+    count("images")
+    count("image_bytes", size)
+
+    return sha256.hexdigest(), size
+
+
+def create_thumbnail(path, thumbnail_path, size = (256, 256)):
+    """This function creates a thumbnail of an image. Runs in a process of the pool, so it is a top-level function.
+
+    Args:
+        path (string): File of the image
+        thumbnail_path (string): File of the thumbnail (JPEG)
+        size (tuple, optional): Maximum width and height. Defaults to (256, 256).
+
+    Returns:
+        created (boolean): True if the thumbnail was created, False if the image can not be read
+    """
+
+    from PIL import Image
+
+    # A broken or huge image must not stop the other thumbnails
+    try:
+        with Image.open(path) as image:
+            image.thumbnail(size)
+            image.convert("RGB").save(thumbnail_path + ".tmp", "JPEG")
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        logging.warning("No thumbnail for " + path + ": " + str(e))
+        return False
+
+    os.replace(thumbnail_path + ".tmp", thumbnail_path)
+
+    return True
+
+
+def create_thumbnails(df_manifest, directory = IMAGES_DIR, size = (256, 256), workers = None):
+    """This function creates the missing thumbnails in a process pool, resizing is CPU-bound.
+
+    Args:
+        df_manifest (pandas DataFrame): Manifest of the downloaded images
+        directory (string, optional): Folder of the images. Defaults to "./Dataset/Bilder".
+        size (tuple, optional): Maximum width and height. Defaults to (256, 256).
+        workers (integer, optional): Number of processes. Defaults to None (number of CPUs).
+
+    Returns:
+        created (integer): Number of created thumbnails
+    """
+
+    # Checked once here, an error in every process would only appear after all downloads
+    try:
+        importlib.import_module("PIL.Image")
+    except ImportError as e:
+        logging.warning("No thumbnails, Pillow can not be imported: " + str(e))
+        return 0
+
+    thumbnail_dir = os.path.join(directory, "Thumbnails")
+    os.makedirs(thumbnail_dir, exist_ok = True)
+
+    # One thumbnail per file, duplicates by content share the file
+    dateien = [datei for datei in df_manifest["Datei"].unique()
+               if not os.path.exists(os.path.join(thumbnail_dir, os.path.splitext(datei)[0] + ".jpg"))]
+    if len(dateien) == 0:
+        return 0
+
+    with timer("thumbnails"), ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = [executor.submit(create_thumbnail, os.path.join(directory, datei),
+                                   os.path.join(thumbnail_dir, os.path.splitext(datei)[0] + ".jpg"), size)
+                   for datei in dateien]
+        created = 0
+        for datei, future in zip(dateien, futures):
+            try:
+                created += future.result()
+            except Exception as e:
+                logging.warning("No thumbnail for " + datei + ": " + str(e))
+
+    count("thumbnails", created)
+
+    return created
+
+
+def harvest_images(df, directory = IMAGES_DIR, manifest_path = MANIFEST_PATH, store_path = None, session = None,
+                   proxy = PROXIES[1], workers = 4, rate = 1.0, thumbnails = True, chunk_size = 100,
+                   source = KFV_SCHWEINFURT):
+    """This function downloads all images which are not in the manifest yet. nopic.png is skipped, every file name is
+       downloaded once and images with the same content are stored once. The manifest is appended after every chunk,
+       so an interrupted run continues where it stopped and new operations only cost their own images.
+
+    Args:
+        df (pandas DataFrame): Data set with Nr, Alarmierungszeit and Bild
+        directory (string, optional): Folder of the images. Defaults to "./Dataset/Bilder".
+        manifest_path (string, optional): Manifest of the downloaded images. Defaults to "./Dataset/bilder.csv".
+        store_path (string, optional): Blob store with the HTML code for the image paths. Defaults to None.
+        session (requests Session, optional): Object with a get method. Defaults to None, then every worker uses its
+                                              own requests Session.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        workers (integer, optional): Number of parallel downloads. Defaults to 4.
+        rate (float, optional): Requests per second of all workers together. Defaults to 1.0.
+        thumbnails (boolean, optional): Create the missing thumbnails. Defaults to True.
+        chunk_size (integer, optional): Number of images between two saves of the manifest. Defaults to 100.
+        source (Source, optional): Website of the images. Defaults to KFV_SCHWEINFURT.
+
+    Returns:
+        df_manifest (pandas DataFrame): Manifest of all downloaded images
+    """
+
+    os.makedirs(directory, exist_ok = True)
+    df_manifest = pd.read_csv(manifest_path) if os.path.exists(manifest_path) else pd.DataFrame(columns = MANIFEST_COLUMNS)
+
+    df_urls = get_image_urls(df, store_path, source)
+    df_urls = df_urls[~df_urls["Bild"].isin(df_manifest["Bild"])]
+    logging.info("Images to download: " + str(len(df_urls)))
+
+    budget = RateBudget(rate)
+    local = threading.local()
+    hashes = dict(zip(df_manifest["Sha256"], df_manifest["Datei"]))
+    lock = threading.Lock()
+
+    def download(bild, url):
+        if session is None and not hasattr(local, "session"):
+            local.session = requests.Session()
+
+        datei = re.sub("[^A-Za-z0-9._-]+", "_", bild)
+        budget.acquire()
+        try:
+            sha256, size = download_image(url, os.path.join(directory, datei), session or local.session, proxy)
+        except Exception as e:
+            logging.error(str(e) + ", image is downloaded again in the next run")
+            count("failed_images")
+            return None
+
+        # Same content under another file name, keep only the first file
+        with lock:
+            if hashes.setdefault(sha256, datei) != datei:
+                os.remove(os.path.join(directory, datei))
+                datei = hashes[sha256]
+                count("duplicate_images")
+
+        return {"Bild": bild, "URL": url, "Sha256": sha256, "Bytes": size, "Datei": datei}
+
+    list_df = [df_manifest]
+
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        for start in range(0, len(df_urls), chunk_size):
+            chunk = df_urls.iloc[start:start + chunk_size]
+            rows = [row for row in executor.map(download, chunk["Bild"], chunk["URL"]) if row is not None]
+            df_chunk = pd.DataFrame(rows, columns = MANIFEST_COLUMNS)
+
+            with timer("csv_write"):
+                df_chunk.to_csv(manifest_path, mode = "a", index = False, header = not os.path.exists(manifest_path))
+            list_df.append(df_chunk)
+            logging.info("Images: " + str(start + len(df_chunk)) + " of " + str(len(df_urls)))
+
+    df_manifest = pd.concat(list_df, ignore_index = True)
+
+    if thumbnails and not df_manifest.empty:
+        create_thumbnails(df_manifest, directory)
+
+    return df_manifest
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py scrape images"
+    from blobstore import STORE_PATH
+    harvest_images(pd.read_csv("./Dataset/einsätze_erweitert.csv"), store_path = STORE_PATH)
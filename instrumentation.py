@@ -0,0 +1,268 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: instrumentation.py                                                                     #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides lightweight timers, counters and a machine-readable run report for   #
+#          the pipeline stages scrape -> dataset -> ML. Only the standard library is used.          #
+#---------------------------------------------------------------------------------------------------#
+
+
+from contextlib import contextmanager
+from datetime import datetime
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource     # not available on Windows
+except ImportError:
+    resource = None
+
+
+_lock = threading.Lock()
+_stages = {}    # stage name -> {"calls", "seconds", "max_seconds"}
+_counters = {}  # counter name -> value
+_gauges = {}    # gauge name -> last value
+
+
+def reset():
+    """This function removes all recorded timings, counters and gauges, e.g. at the start of a new run.
+    """
+
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+        _gauges.clear()
+
+
+def add_timing(stage, seconds):
+    """This function adds the duration of one call to a stage.
+
+    Args:
+        stage (string): Name of the stage, e.g. "webscraper"
+        seconds (float): Duration of the call in seconds
+    """
+
+    with _lock:
+        values = _stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+        values["calls"] += 1
+        values["seconds"] += seconds
+        values["max_seconds"] = max(values["max_seconds"], seconds)
+
+
+@contextmanager
+def timer(stage):
+    """This function measures the duration of a with block. Exceptions are passed through, the time is still recorded.
+
+    Args:
+        stage (string): Name of the stage, e.g. "csv_read"
+    """
+
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        add_timing(stage, time.perf_counter() - start)
+
+
+def timed(stage):
+    """This function creates a decorator which measures every call of the decorated function.
+
+    Args:
+        stage (string): Name of the stage, e.g. "add_features"
+
+    Returns:
+        decorator (function): Decorator for the function
+    """
+
+    def decorator(function):
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(counter, value = 1):
+    """This function increases a counter, e.g. pages, rows, bytes or cache hits.
+
+    Args:
+        counter (string): Name of the counter
+        value (integer, optional): Value to be added. Defaults to 1.
+    """
+
+    with _lock:
+        _counters[counter] = _counters.get(counter, 0) + value
+
+
+def gauge(name, value):
+    """This function sets a gauge, a value which is replaced instead of added, e.g. rows per second or memory.
+
+    Args:
+        name (string): Name of the gauge
+        value (float): Current value
+    """
+
+    with _lock:
+        _gauges[name] = value
+
+
+def get_peak_memory_mb():
+    """This function determines the peak memory (maximum resident set size) of the current process.
+
+    Returns:
+        peak_memory_mb (float): Peak memory in MB, None if it can not be determined
+    """
+
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KB, macOS bytes
+        return round(max_rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 2)
+    except (ImportError, AttributeError):
+        return None
+
+
+def create_report(run, stages = None, counters = None, gauges = None):
+    """This function creates a report from given timings, counters and gauges, without the global state.
+
+    Args:
+        run (string): Name of the run, e.g. "scrape latest"
+        stages (dictionary, optional): Stage name -> {"calls", "seconds", "max_seconds"}. Defaults to None.
+        counters (dictionary, optional): Counter name -> value. Defaults to None.
+        gauges (dictionary, optional): Gauge name -> value. Defaults to None.
+
+    Returns:
+        report (dictionary): Report of the run
+    """
+
+    stages = {stage: {"calls": values["calls"], "seconds": round(values["seconds"], 6),
+                      "max_seconds": round(values["max_seconds"], 6)} for stage, values in (stages or {}).items()}
+
+    report = {"Datetime": datetime.now().strftime("%Y.%m.%d %H:%M:%S"), "Run": run, "Stages": stages,
+              "Counters": dict(counters or {}), "Gauges": dict(gauges or {}), "Peak_memory_mb": get_peak_memory_mb()}
+
+    return report
+
+
+def get_report(run):
+    """This function collects all timings, counters and gauges into one report.
+
+    Args:
+        run (string): Name of the run, e.g. "scrape latest"
+
+    Returns:
+        report (dictionary): Report of the run
+    """
+
+    with _lock:
+        stages = {stage: dict(values) for stage, values in _stages.items()}
+        counters, gauges = dict(_counters), dict(_gauges)
+
+    return create_report(run, stages, counters, gauges)
+
+
+def read_last_report(path, run):
+    """This function reads the last report of the same run from a JSON lines file.
+
+    Args:
+        path (string): JSON lines file with the reports
+        run (string): Name of the run
+
+    Returns:
+        report (dictionary): Last report of the run, None if there is no report yet
+    """
+
+    last_report = None
+
+    if os.path.exists(path):
+        with open(path, "r", encoding = "utf-8") as file:
+            for line in file:
+                report = json.loads(line)
+                if report.get("Run") == run:
+                    last_report = report
+
+    return last_report
+
+
+def log_comparison(report, last_report, threshold = 1.5):
+    """This function logs all stages which became slower than threshold times the last run.
+
+    Args:
+        report (dictionary): Report of the current run
+        last_report (dictionary): Report of the last run, can be None
+        threshold (float, optional): Factor from which a stage counts as regression. Defaults to 1.5.
+    """
+
+    for stage, values in report["Stages"].items():
+        logging.info("Stage " + stage + ": " + str(values["calls"]) + " calls, " + str(round(values["seconds"], 3)) + " s")
+
+        if last_report is not None and stage in last_report["Stages"]:
+            last_seconds = last_report["Stages"][stage]["seconds"]
+
+            if last_seconds > 0 and values["seconds"] > threshold * last_seconds:
+                logging.warning("Stage " + stage + " is " + str(round(values["seconds"] / last_seconds, 2)) +
+                                " times slower than in the last run")
+
+
+def write_report(path, run, report_format = "jsonl", report = None):
+    """This function writes the report of the run. JSON lines are appended, so that the history is kept.
+       The Prometheus textfile is overwritten, it is read by the node exporter.
+
+    Args:
+        path (string): File of the report
+        run (string): Name of the run
+        report_format (string, optional): "jsonl" or "prometheus". Defaults to "jsonl".
+        report (dictionary, optional): Report of create_report. Defaults to None, then the global state is reported.
+
+    Returns:
+        report (dictionary): Report of the run
+    """
+
+    report = get_report(run) if report is None else report
+    directory = os.path.dirname(path)
+    if directory != "":
+        os.makedirs(directory, exist_ok = True)
+
+    if report_format == "jsonl":
+        log_comparison(report, read_last_report(path, run))
+
+        with open(path, "a", encoding = "utf-8") as file:
+            file.write(json.dumps(report, ensure_ascii = False) + "\n")
+
+    elif report_format == "prometheus":
+        log_comparison(report, None)
+        label = 'run="' + run + '"'
+        lines = []
+
+        for stage, values in report["Stages"].items():
+            lines.append('pipeline_stage_seconds_total{' + label + ',stage="' + stage + '"} ' + str(values["seconds"]))
+            lines.append('pipeline_stage_calls_total{' + label + ',stage="' + stage + '"} ' + str(values["calls"]))
+        for counter, value in report["Counters"].items():
+            lines.append('pipeline_counter_total{' + label + ',counter="' + counter + '"} ' + str(value))
+        for name, value in report.get("Gauges", {}).items():
+            lines.append('pipeline_gauge{' + label + ',gauge="' + name + '"} ' + str(value))
+        if report["Peak_memory_mb"] is not None:
+            lines.append('pipeline_peak_memory_mb{' + label + '} ' + str(report["Peak_memory_mb"]))
+
+        # Write atomically, the exporter may read at any time
+        with open(path + ".tmp", "w", encoding = "utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(path + ".tmp", path)
+
+    else:
+        raise ValueError("Unknown report format: " + report_format)
+
+    return report
@@ -0,0 +1,464 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: main.py                                                                                #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides the command line interface for webscraping, dataset and machine      #
+#          learning. The heavy modules are only imported by the subcommand that needs them.         #
+#---------------------------------------------------------------------------------------------------#
+
+
+import argparse
+import logging
+import os
+import sys
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+# Exit codes for schedulers (cron, systemd)
+EXIT_OK = 0             # everything done
+EXIT_ERROR = 1          # run failed, e.g. network error while scraping
+EXIT_USAGE = 2          # wrong arguments, same as argparse
+EXIT_MISSING_INPUT = 3  # a required input file does not exist yet
+
+URL = "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?start=0"
+URL_FEED = "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?format=feed&type=rss&start=0"
+CLASSES = ["Technische Hilfe", "Brand"]
+MODEL_PATH = "./Models/text_clf.joblib"
+REPORT_PATH = "./Reports/run_report.jsonl"
+DATASET_PATH = "./Dataset/einsätze_erweitert.csv"
+
+
+def command_scrape(args):
+    """This function executes the scrape subcommand.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import webscraping
+
+    if args.mode == "all":
+        success = webscraping.get_all_data(args.url, args.url_feed, args.last_page)
+    elif args.mode == "details":
+        import details
+        if not os.path.exists(args.dataset):
+            raise FileNotFoundError(args.dataset)
+        missing = details.update_dataset_details(args.dataset, url = args.url, workers = args.workers, rate = args.rate,
+                                                 limit = args.limit)
+        success = missing == 0 or args.limit is not None
+    elif args.mode == "images":
+        import pandas as pd
+        import images
+        from blobstore import STORE_PATH
+        df = pd.read_csv(args.dataset, usecols = lambda column: column in ["Nr", "Alarmierungszeit", "Bild", "Content"])
+        df_manifest = images.harvest_images(df, store_path = STORE_PATH, workers = args.workers, rate = args.rate,
+                                            thumbnails = not args.no_thumbnails)
+        logging.info("Downloaded images: " + str(len(df_manifest)))
+        success = True
+    elif args.mode == "sources":
+        import sources
+        known = sources.get_sources(args.sources_file)
+        names = list(known) if args.source is None else args.source
+        unknown = [name for name in names if name not in known]
+        if len(unknown) > 0:
+            logging.error("Unknown source: " + ", ".join(unknown) + ", known: " + ", ".join(known))
+            return EXIT_USAGE
+        results = webscraping.crawl_sources([known[name] for name in names])
+        success = all(results.values())
+    elif args.mode == "repair":
+        import repair
+        if not os.path.exists(args.dataset):
+            raise FileNotFoundError(args.dataset)
+        df_gaps = repair.repair_dataset(args.dataset, url = args.url)
+        success = df_gaps.empty
+    else:
+        nr = webscraping.get_last_nr(args.dataset)
+        success = webscraping.get_specific_data(args.url, args.url_feed, nr)
+
+    return EXIT_OK if success else EXIT_ERROR
+
+
+def command_dataset(args):
+    """This function executes the dataset subcommand.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import dataset
+
+    if args.mode == "create":
+        dataset.create_dataset()
+    elif args.mode == "migrate":
+        import blobstore
+        blobstore.migrate_dataset(args.dataset)
+    else:
+        dataset.extend_dataset()
+
+    return EXIT_OK
+
+
+def command_ml(args):
+    """This function executes the ml subcommand.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import text_classification_ml
+
+    if args.mode == "train":
+        text_classification_ml.train_model(args.classes, args.model)
+        logging.info("Model saved: " + args.model)
+    elif args.mode == "compare":
+        import pandas as pd
+        import model_comparison
+
+        df_reduced, _ = text_classification_ml.prepare_data_ml(args.classes)
+        df_leaderboard = model_comparison.compare_models(df_reduced["Kurzbericht"], df_reduced["Einsatztyp"].to_numpy(),
+                                                         args.models, args.folds, time_budget = args.budget,
+                                                         workers = args.workers)
+        with pd.option_context("display.width", 200, "display.max_columns", 20):
+            print(df_leaderboard)
+    else:
+        if len(args.kurzbericht) == 0:
+            logging.error("No Kurzbericht given")
+            return EXIT_USAGE
+
+        einsatztypen = text_classification_ml.predict_einsatztyp(args.kurzbericht, args.model)
+
+        for kurzbericht, einsatztyp in zip(args.kurzbericht, einsatztypen):
+            print(kurzbericht + "\t" + einsatztyp)
+
+    return EXIT_OK
+
+
+def command_bench(args):
+    """This function executes the bench subcommand.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import benchmark
+
+    df_results = benchmark.run_benchmarks(args.only, args.scale, args.pages, args.repeat, args.history)
+    print(df_results.to_string())
+
+    return EXIT_OK
+
+
+def command_simulate(args):
+    """This function executes the simulate subcommand. The server runs until it is interrupted.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import time
+    import pandas as pd
+    import simulator
+    from fixtures import generate_operations
+
+    df_corpus = pd.read_csv(args.corpus) if args.corpus else generate_operations(args.operations)
+    kfv_simulator = simulator.KfvSimulator(df_corpus, args.port, args.latency, args.jitter, args.error_rate, args.rate_limit,
+                                           args.shift_every)
+
+    with kfv_simulator:
+        if args.load_test:
+            print(simulator.load_test(kfv_simulator, args.load_test, args.workers))
+            return EXIT_OK
+
+        print("Archive: " + kfv_simulator.url)
+        print("Feed:    " + kfv_simulator.url_feed)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+    return EXIT_OK
+
+
+def command_serve(args):
+    """This function executes the serve subcommand. The API runs until it is interrupted.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import query_service
+
+    server = query_service.create_server(query_service.QueryService(args.dataset, args.cache_size, args.timeout), args.port)
+    print("API: http://127.0.0.1:" + str(server.server_address[1]) + "/health")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+    return EXIT_OK
+
+
+def command_anomalies(args):
+    """This function executes the anomalies subcommand.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import pandas as pd
+    import anomaly
+
+    if args.rebuild and os.path.exists(args.state):
+        os.remove(args.state)
+
+    df = pd.read_csv(args.dataset, usecols = ["Nr", "Alarmierungszeit", "Einsatztyp", "Einsatzort"])
+    anomaly.update_anomalies(df, args.state)
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(anomaly.AnomalyDetector.load(args.state).get_events().head(args.last))
+
+    return EXIT_OK
+
+
+def command_events(args):
+    """This function executes the events subcommand.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import pandas as pd
+    import events
+
+    if args.rebuild:
+        for path in [args.state, args.assignments]:
+            if os.path.exists(path):
+                os.remove(path)
+
+    df = pd.read_csv(args.dataset, usecols = ["Nr", "Alarmierungszeit", "Einsatztyp", "Längengrad", "Breitengrad"])
+    df_assigned = events.update_events(df, args.state, args.assignments)
+    logging.info("Operations with a new or changed Event_ID: " + str((df_assigned["Event_ID"] >= 0).sum()))
+
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(events.EventIndex.load(args.state).get_events().head(args.last))
+
+    return EXIT_OK
+
+
+def command_terms(args):
+    """This function executes the terms subcommand.
+
+    Args:
+        args (argparse Namespace): Parsed arguments
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    import pandas as pd
+    import term_stats
+
+    if (args.by is None) != (args.value is None):
+        logging.error("--by and --value must be given together")
+        return EXIT_USAGE
+
+    if args.rebuild:
+        for extension in [".json", "_terme.npz", "_kurzberichte.npz"]:
+            if os.path.exists(args.store + extension):
+                os.remove(args.store + extension)
+
+    df = pd.read_csv(args.dataset, usecols = ["Nr", "Alarmierungszeit", "Einsatztyp", "Einsatzort", "Kurzbericht"])
+    statistics = term_stats.update_term_stats(df, args.store)
+
+    with pd.option_context("display.width", 200, "display.max_rows", 200):
+        if len(args.trend) > 0:
+            print(statistics.trend(args.trend, args.relative))
+        else:
+            print(statistics.top_terms(args.top, args.by, args.value))
+
+    return EXIT_OK
+
+
+def create_parser():
+    """This function creates the argument parser with all subcommands.
+
+    Returns:
+        parser (argparse ArgumentParser): Argument parser
+    """
+
+    parser = argparse.ArgumentParser(prog = "main.py", description = "Firefighting operations Schweinfurt")
+    parser.add_argument("--report", default = REPORT_PATH, help = "file of the run report, empty to disable")
+    parser.add_argument("--report-format", choices = ["jsonl", "prometheus"], default = "jsonl",
+                        help = "JSON lines are appended, the Prometheus textfile is overwritten")
+    subparsers = parser.add_subparsers(dest = "command", required = True)
+
+    # python main.py scrape all|latest|repair|details|images|sources
+    parser_scrape = subparsers.add_parser("scrape", help = "scrape the operations from the KFV website")
+    parser_scrape.add_argument("mode", choices = ["all", "latest", "repair", "details", "images", "sources"],
+                               help = "sources scrapes several websites at the same time into ./Dataset/Quellen")
+    parser_scrape.add_argument("--url", default = URL, help = "first archive page")
+    parser_scrape.add_argument("--url-feed", default = URL_FEED, help = "first archive feed")
+    parser_scrape.add_argument("--last-page", type = int, default = None,
+                               help = "start number of the last archive page, detected from the pagination if not set")
+    parser_scrape.add_argument("--dataset", default = DATASET_PATH, help = "dataset for latest, repair, details and images")
+    parser_scrape.add_argument("--workers", type = int, default = 4, help = "parallel downloads of detail pages or images")
+    parser_scrape.add_argument("--rate", type = float, default = 1.0, help = "requests per second of all workers together")
+    parser_scrape.add_argument("--limit", type = int, default = None, help = "maximum number of detail pages in this run")
+    parser_scrape.add_argument("--no-thumbnails", action = "store_true", help = "download images without thumbnails")
+    parser_scrape.add_argument("--source", nargs = "+", default = None, help = "names of the sources, default all")
+    parser_scrape.add_argument("--sources-file", default = "./sources.json", help = "JSON list of further sources")
+    parser_scrape.set_defaults(function = command_scrape)
+
+    # python main.py dataset create|extend|migrate
+    parser_dataset = subparsers.add_parser("dataset", help = "create or extend the dataset")
+    parser_dataset.add_argument("mode", choices = ["create", "extend", "migrate"],
+                                help = "migrate moves the HTML columns of an existing dataset into the blob store")
+    parser_dataset.add_argument("--dataset", default = DATASET_PATH, help = "dataset to be migrated")
+    parser_dataset.set_defaults(function = command_dataset)
+
+    # python main.py ml train|predict|compare
+    parser_ml = subparsers.add_parser("ml", help = "train the text classifier, predict the Einsatztyp or compare models")
+    parser_ml.add_argument("mode", choices = ["train", "predict", "compare"])
+    parser_ml.add_argument("kurzbericht", nargs = "*", help = "Kurzberichte to predict")
+    parser_ml.add_argument("--model", default = MODEL_PATH, help = "file of the saved model")
+    parser_ml.add_argument("--classes", nargs = "+", default = CLASSES, help = "Einsatztypen to train")
+    parser_ml.add_argument("--models", nargs = "+", default = None, help = "classifiers to compare, default all")
+    parser_ml.add_argument("--folds", type = int, default = 5, help = "cross-validation folds of the comparison")
+    parser_ml.add_argument("--budget", type = float, default = 60.0, help = "maximum seconds per compared classifier, checked between the folds (a running fit is not interrupted)")
+    parser_ml.add_argument("--workers", type = int, default = None, help = "parallel processes, default number of CPUs")
+    parser_ml.set_defaults(function = command_ml)
+
+    # python main.py bench [--only extract_data webscraper ...]
+    parser_bench = subparsers.add_parser("bench", help = "run the offline benchmarks")
+    parser_bench.add_argument("--only", nargs = "+", default = None,
+                              choices = ["extract_data", "webscraper", "add_features", "create_dataset", "data_preprocessing",
+                                         "distribute_labels_equally", "model_training", "cluster_events"])
+    parser_bench.add_argument("--scale", type = int, default = 10000, help = "operations for the tabular benchmarks")
+    parser_bench.add_argument("--pages", type = int, default = 20, help = "archive pages for the HTML benchmarks")
+    parser_bench.add_argument("--repeat", type = int, default = 3, help = "timed runs per benchmark")
+    parser_bench.add_argument("--history", default = "./Reports/benchmark.jsonl", help = "file of the benchmark history")
+    parser_bench.set_defaults(function = command_bench)
+
+    # python main.py simulate [--latency 0.2 --error-rate 0.05 --rate-limit 5 --shift-every 50]
+    parser_simulate = subparsers.add_parser("simulate", help = "run a local stand-in of the KFV website")
+    parser_simulate.add_argument("--port", type = int, default = 8080)
+    parser_simulate.add_argument("--corpus", default = None, help = "CSV with operations, e.g. ./Dataset/einsätze.csv")
+    parser_simulate.add_argument("--operations", type = int, default = 15000, help = "synthetic operations without --corpus")
+    parser_simulate.add_argument("--latency", type = float, default = 0.0, help = "delay per response in seconds")
+    parser_simulate.add_argument("--jitter", type = float, default = 0.0, help = "additional random delay in seconds")
+    parser_simulate.add_argument("--error-rate", type = float, default = 0.0, help = "share of responses with status 500")
+    parser_simulate.add_argument("--rate-limit", type = float, default = None, help = "requests per second before 429")
+    parser_simulate.add_argument("--shift-every", type = int, default = None, help = "new operation after every N requests")
+    parser_simulate.add_argument("--load-test", type = int, default = None, metavar = "PAGES",
+                                 help = "crawl PAGES pages and print the throughput instead of serving")
+    parser_simulate.add_argument("--workers", type = int, default = 1, help = "parallel crawler threads of the load test")
+    parser_simulate.set_defaults(function = command_simulate)
+
+    # python main.py anomalies [--last 20]
+    parser_anomalies = subparsers.add_parser("anomalies", help = "update the surge detection and show the latest surges")
+    parser_anomalies.add_argument("--dataset", default = DATASET_PATH)
+    parser_anomalies.add_argument("--state", default = "./Dataset/anomalie_status.json", help = "saved statistics")
+    parser_anomalies.add_argument("--last", type = int, default = 20, help = "number of surges to show")
+    parser_anomalies.add_argument("--rebuild", action = "store_true", help = "compute the statistics again from the start")
+    parser_anomalies.set_defaults(function = command_anomalies)
+
+    # python main.py events [--last 20]
+    parser_events = subparsers.add_parser("events", help = "update the event clustering and show the latest events")
+    parser_events.add_argument("--dataset", default = DATASET_PATH)
+    parser_events.add_argument("--state", default = "./Dataset/ereignisse_status.json", help = "saved events")
+    parser_events.add_argument("--assignments", default = "./Dataset/ereignisse_einsätze.csv",
+                               help = "Event_ID of every operation in an event")
+    parser_events.add_argument("--last", type = int, default = 20, help = "number of events to show")
+    parser_events.add_argument("--rebuild", action = "store_true", help = "cluster the whole dataset again")
+    parser_events.set_defaults(function = command_events)
+
+    # python main.py terms [--top 20 --by Einsatztyp --value Brand | --trend unwetter]
+    parser_terms = subparsers.add_parser("terms", help = "update the term statistics and show top terms or trends")
+    parser_terms.add_argument("--dataset", default = DATASET_PATH)
+    parser_terms.add_argument("--store", default = "./Dataset/begriffe", help = "saved term statistics without extension")
+    parser_terms.add_argument("--top", type = int, default = 20, help = "number of terms to show")
+    parser_terms.add_argument("--by", choices = ["Jahr", "Einsatztyp", "Einsatzort"], default = None,
+                              help = "top terms of one group, together with --value")
+    parser_terms.add_argument("--value", default = None, help = "value of the group, e.g. Brand")
+    parser_terms.add_argument("--trend", nargs = "+", default = [], help = "operations per Jahr with these terms")
+    parser_terms.add_argument("--relative", action = "store_true", help = "trend as share of the operations of the year")
+    parser_terms.add_argument("--rebuild", action = "store_true", help = "count all Kurzberichte again")
+    parser_terms.set_defaults(function = command_terms)
+
+    # python main.py serve [--port 8050]
+    parser_serve = subparsers.add_parser("serve", help = "run the local query API on the dataset")
+    parser_serve.add_argument("--port", type = int, default = 8050)
+    parser_serve.add_argument("--dataset", default = DATASET_PATH, help = "dataset, reloaded when the file changes")
+    parser_serve.add_argument("--cache-size", type = int, default = 256, help = "maximum number of cached results")
+    parser_serve.add_argument("--timeout", type = float, default = 5.0, help = "maximum seconds of a query")
+    parser_serve.set_defaults(function = command_serve)
+
+    return parser
+
+
+def main(argv = None):
+    """This function parses the arguments and executes the subcommand.
+
+    Args:
+        argv (list, optional): Arguments without the program name. Defaults to None, then sys.argv is used.
+
+    Returns:
+        exit_code (integer): Exit code of the program
+    """
+
+    args = create_parser().parse_args(argv)
+
+    import instrumentation
+    instrumentation.reset()
+
+    try:
+        with instrumentation.timer("total"):
+            exit_code = args.function(args)
+    except FileNotFoundError as e:
+        logging.error(e)
+        exit_code = EXIT_MISSING_INPUT
+    except Exception as e:
+        logging.exception(e)
+        exit_code = EXIT_ERROR
+
+    # Report after every run, also after failed ones
+    if args.report:
+        instrumentation.count("exit_code_" + str(exit_code))
+        run = " ".join([args.command] + ([args.mode] if "mode" in args else []))
+        instrumentation.write_report(args.report, run, args.report_format)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+
+    sys.exit(main())
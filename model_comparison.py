@@ -0,0 +1,231 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: model_comparison.py                                                                    #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides a comparison of text classifiers on shared sparse TF-IDF features.    #
+#          The features are computed once per fold and cached, the models are trained in parallel.  #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+from sklearn.model_selection import StratifiedKFold
+from sklearn.linear_model import PassiveAggressiveClassifier, LogisticRegression, RidgeClassifier, SGDClassifier
+from sklearn.naive_bayes import MultinomialNB, ComplementNB
+from sklearn.svm import LinearSVC
+from sklearn.neighbors import KNeighborsClassifier, NearestCentroid
+from sklearn.ensemble import RandomForestClassifier
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import logging
+import os
+import pickle
+import time
+
+from instrumentation import timer, count
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+CACHE_DIR = "./Models/Features"
+LEADERBOARD_PATH = "./Reports/model_leaderboard.csv"
+# Candidates, all of them work on sparse features: name -> (class, parameters)
+CLASSIFIERS = {"PassiveAggressive": (PassiveAggressiveClassifier, {"random_state": 28}),
+               "MultinomialNB": (MultinomialNB, {}),
+               "ComplementNB": (ComplementNB, {}),
+               "LinearSVC": (LinearSVC, {"random_state": 28}),
+               "LogisticRegression": (LogisticRegression, {"max_iter": 1000}),
+               "Ridge": (RidgeClassifier, {}),
+               "SGD": (SGDClassifier, {"random_state": 28}),
+               "NearestCentroid": (NearestCentroid, {}),
+               "KNeighbors": (KNeighborsClassifier, {"n_neighbors": 5}),
+               "RandomForest": (RandomForestClassifier, {"n_estimators": 100, "random_state": 28, "n_jobs": 1})}
+LEADERBOARD_COLUMNS = ["Modell", "Accuracy", "Accuracy_Std", "Fit_Sekunden", "Predict_ms", "Größe_KB", "Folds",
+                       "Status"]
+
+
+def get_cache_key(x, y, n_splits, ngram_range):
+    """This function computes the key of the cached features, it changes with the data and the parameters.
+
+    Args:
+        x (pandas Series): Kurzberichte
+        y (numpy array): Labels
+        n_splits (integer): Number of folds
+        ngram_range (tuple): N-gram range of the CountVectorizer
+
+    Returns:
+        key (string): Hash of data and parameters
+    """
+
+    sha256 = hashlib.sha256(repr((n_splits, tuple(ngram_range))).encode("utf-8"))
+    sha256.update("\n".join(map(str, x)).encode("utf-8"))
+    sha256.update(np.asarray(y, dtype = np.int64).tobytes())
+
+    return sha256.hexdigest()[:16]
+
+
+def compute_features(x, y, n_splits = 5, ngram_range = (1, 1), cache_dir = CACHE_DIR):
+    """This function computes the sparse TF-IDF features of every fold once. The vectorizer is fitted on the training
+       part of the fold only. The folds are stored as .npz files and reused as long as data and parameters are equal.
+
+    Args:
+        x (pandas Series): Kurzberichte
+        y (numpy array): Labels
+        n_splits (integer, optional): Number of folds. Defaults to 5.
+        ngram_range (tuple, optional): N-gram range of the CountVectorizer. Defaults to (1, 1).
+        cache_dir (string, optional): Folder of the cached features. Defaults to "./Models/Features".
+
+    Returns:
+        fold_paths (list): Folder of every fold
+    """
+
+    x = pd.Series(x).astype(str).reset_index(drop = True)
+    y = np.asarray(y)
+    directory = os.path.join(cache_dir, get_cache_key(x, y, n_splits, ngram_range))
+    fold_paths = [os.path.join(directory, "fold_" + str(i)) for i in range(n_splits)]
+
+    if all(os.path.exists(os.path.join(path, "y_test.npy")) for path in fold_paths):
+        count("feature_cache_hits")
+        return fold_paths
+
+    folds = StratifiedKFold(n_splits = n_splits, shuffle = True, random_state = 28).split(x, y)
+
+    for path, (train, test) in zip(fold_paths, folds):
+        with timer("features"):
+            count_vect = CountVectorizer(ngram_range = ngram_range)
+            tfidf_transformer = TfidfTransformer()
+            X_train = tfidf_transformer.fit_transform(count_vect.fit_transform(x.iloc[train]))
+            X_test = tfidf_transformer.transform(count_vect.transform(x.iloc[test]))
+
+        # y_test.npy is written last, it marks a complete fold
+        os.makedirs(path, exist_ok = True)
+        sparse.save_npz(os.path.join(path, "X_train.npz"), X_train.tocsr())
+        sparse.save_npz(os.path.join(path, "X_test.npz"), X_test.tocsr())
+        np.save(os.path.join(path, "y_train.npy"), y[train])
+        np.save(os.path.join(path, "y_test.npy"), y[test])
+
+    logging.info("Features of " + str(n_splits) + " folds saved in " + directory)
+
+    return fold_paths
+
+
+def evaluate_model(name, fold_paths, time_budget = 60.0, latency_samples = 20):
+    """This function trains and tests one classifier on all folds. Runs in a process of the pool, so it is a
+       top-level function. The time budget is checked after every fold, a running fit is not interrupted.
+
+    Args:
+        name (string): Name of the classifier, key of CLASSIFIERS
+        fold_paths (list): Folder of every fold, see compute_features
+        time_budget (float, optional): Maximum time of the model in seconds. Defaults to 60.0.
+        latency_samples (integer, optional): Number of single predictions for the latency. Defaults to 20.
+
+    Returns:
+        result (dictionary): Row of the leaderboard
+    """
+
+    klasse, parameters = CLASSIFIERS[name]
+    accuracies, fit_times, latencies, sizes = [], [], [], []
+    start = time.perf_counter()
+    status = "ok"
+
+    for path in fold_paths:
+        if time.perf_counter() - start > time_budget:
+            status = "timeout"
+            break
+
+        X_train = sparse.load_npz(os.path.join(path, "X_train.npz"))
+        X_test = sparse.load_npz(os.path.join(path, "X_test.npz"))
+        y_train, y_test = np.load(os.path.join(path, "y_train.npy")), np.load(os.path.join(path, "y_test.npy"))
+
+        try:
+            model = klasse(**parameters)
+            fit_start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_times.append(time.perf_counter() - fit_start)
+            accuracies.append(np.mean(model.predict(X_test) == y_test))
+        except (ValueError, TypeError, MemoryError) as e:
+            status = "error: " + type(e).__name__
+            break
+
+        # Latency of a single Kurzbericht, as in predict_einsatztyp
+        single = []
+        for i in range(min(latency_samples, X_test.shape[0])):
+            predict_start = time.perf_counter()
+            model.predict(X_test[i])
+            single.append(time.perf_counter() - predict_start)
+        latencies.append(np.median(single))
+        sizes.append(len(pickle.dumps(model)))
+
+    folds = len(accuracies)
+
+    return {"Modell": name,
+            "Accuracy": np.mean(accuracies) if folds > 0 else np.nan,
+            "Accuracy_Std": np.std(accuracies) if folds > 0 else np.nan,
+            "Fit_Sekunden": np.mean(fit_times) if folds > 0 else np.nan,
+            "Predict_ms": np.mean(latencies) * 1000 if folds > 0 else np.nan,
+            "Größe_KB": np.mean(sizes) / 1024 if folds > 0 else np.nan,
+            "Folds": folds,
+            "Status": status}
+
+
+def compare_models(x, y, models = None, n_splits = 5, ngram_range = (1, 1), time_budget = 60.0, workers = None,
+                   cache_dir = CACHE_DIR, path = LEADERBOARD_PATH):
+    """This function compares classifiers on the same cached features, every classifier runs in its own process.
+
+    Args:
+        x (pandas Series): Kurzberichte
+        y (numpy array): Labels
+        models (list, optional): Names of the classifiers, keys of CLASSIFIERS. Defaults to None (all).
+        n_splits (integer, optional): Number of folds. Defaults to 5.
+        ngram_range (tuple, optional): N-gram range of the CountVectorizer. Defaults to (1, 1).
+        time_budget (float, optional): Maximum time per model in seconds, checked between the folds. A running fit is
+                                       not interrupted, so a model can exceed it by one fit. Defaults to 60.0.
+        workers (integer, optional): Number of processes. Defaults to None (number of CPUs).
+        cache_dir (string, optional): Folder of the cached features. Defaults to "./Models/Features".
+        path (string, optional): File of the leaderboard, None to not save it. Defaults to
+                                 "./Reports/model_leaderboard.csv".
+
+    Returns:
+        df_leaderboard (pandas DataFrame): One row per classifier, best accuracy first, faster fit for equal accuracy
+    """
+
+    models = list(CLASSIFIERS) if models is None else models
+    unknown = [name for name in models if name not in CLASSIFIERS]
+    if len(unknown) > 0:
+        raise ValueError("Unknown classifier: " + ", ".join(unknown) + ", allowed: " + ", ".join(CLASSIFIERS))
+
+    fold_paths = compute_features(x, y, n_splits, ngram_range, cache_dir)
+
+    with timer("model_comparison"), ProcessPoolExecutor(max_workers = workers) as executor:
+        futures = {name: executor.submit(evaluate_model, name, fold_paths, time_budget) for name in models}
+        results = []
+
+        # A crashed model, e.g. a broken cache or a killed process, is listed with its error instead of aborting
+        for name, future in futures.items():
+            try:
+                results.append(future.result())
+            except Exception as e:
+                logging.error("Model " + name + " failed: " + str(e))
+                results.append({"Modell": name, "Folds": 0, "Status": "error: " + type(e).__name__})
+    count("compared_models", len(results))
+
+    df_leaderboard = pd.DataFrame(results, columns = LEADERBOARD_COLUMNS)
+    df_leaderboard = df_leaderboard.sort_values(by = ["Accuracy", "Fit_Sekunden"], ascending = [False, True])
+    df_leaderboard = df_leaderboard.reset_index(drop = True)
+
+    if path is not None:
+        os.makedirs(os.path.dirname(path), exist_ok = True)
+        df_leaderboard.to_csv(path, index = False)
+
+    return df_leaderboard
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py ml compare"
+    from text_classification_ml import prepare_data_ml
+
+    df_reduced, _ = prepare_data_ml(["Technische Hilfe", "Brand"])
+    print(compare_models(df_reduced["Kurzbericht"], np.array(df_reduced["Einsatztyp"])))
@@ -0,0 +1,325 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: query_service.py                                                                       #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides a local HTTP/JSON API for analytical queries on the data set. The     #
+#          data is loaded once into SQLite, results are kept in an LRU cache.                       #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from instrumentation import timer, count
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+DATASET_PATH = "./Dataset/einsätze_erweitert.csv"
+COLUMNS = ["Nr", "Alarmierungszeit", "Wochentag", "Einsatztyp", "Einsatzort", "Kurzbericht", "Organisationen",
+           "Längengrad", "Breitengrad", "Einsatzdauer_Minuten"]
+GROUPS = {"Jahr": "e.Jahr", "Monat": "e.Monat", "Stunde": "e.Stunde", "Wochentag": "e.Wochentag",
+          "Einsatztyp": "e.Einsatztyp", "Einsatzort": "e.Einsatzort", "Organisation": "o.Organisation"}
+# Shortcuts for the common rollups, e.g. /einsatzorte is the same as /count?by=Einsatzort
+ROLLUPS = {"/jahre": "Jahr", "/einsatztypen": "Einsatztyp", "/einsatzorte": "Einsatzort",
+           "/organisationen": "Organisation"}
+# Ad-hoc SQL may only read
+ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+# Number of SQLite instructions between two checks of the deadline
+PROGRESS_STEPS = 10000
+
+
+class QueryError(ValueError):
+    """This class is raised for invalid queries, the API answers with status 400.
+    """
+
+
+class DataUnavailableError(Exception):
+    """This class is raised if the data set could not be loaded yet, the API answers with status 503.
+    """
+
+
+class QueryService():
+    """This class holds the data set in an in-memory SQLite database with the tables einsaetze (one row per operation)
+       and organisationen (one row per operation and organisation). The data set is reloaded and the cache is
+       cleared as soon as the file changes, e.g. after extend_dataset. A missing or half-written file does not stop
+       the service, the previous data set is kept until the file can be loaded.
+    """
+
+    def __init__(self, dataset_path = DATASET_PATH, cache_size = 256, timeout = 5.0):
+        """Initialisation of the class (constructor).
+
+        Args:
+            dataset_path (string, optional): Data set. Defaults to "./Dataset/einsätze_erweitert.csv".
+            cache_size (integer, optional): Maximum number of cached results. Defaults to 256.
+            timeout (float, optional): Maximum seconds of a query, then it is aborted. Defaults to 5.0.
+        """
+
+        self.dataset_path = dataset_path
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.deadline = None
+        self.cache = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "loads": 0}
+        self.lock = threading.RLock()
+        self.signature = None
+        self.failed_signature = None
+        self.error = None
+        self.connection = None
+        self.rows = 0
+
+        self.refresh()
+
+    def get_signature(self):
+        """This method determines the signature of the data set file, it changes with every write.
+
+        Returns:
+            signature (tuple): Modification time in ns and size in bytes
+        """
+
+        stat = os.stat(self.dataset_path)
+
+        return stat.st_mtime_ns, stat.st_size
+
+    def refresh(self):
+        """This method reloads the data set if the file has changed since the last load. If the file is missing or
+           can not be read, e.g. while extend_dataset writes it, the previous data set and signature are kept.
+
+        Returns:
+            reloaded (boolean): True if the data set was reloaded
+        """
+
+        with self.lock:
+            signature = None
+            try:
+                signature = self.get_signature()
+                if signature == self.signature or signature == self.failed_signature:
+                    return False
+                self.load()
+            except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+                # ValueError includes the ParserError of pandas, KeyError a missing column
+                self.error = "Data set can not be loaded: " + type(e).__name__ + ": " + str(e)
+                self.failed_signature = signature    # the same broken file is not read again
+                count("query_load_errors")
+                logging.error(self.error)
+                return False
+
+            self.signature = signature
+            self.failed_signature = None
+            self.error = None
+            self.cache.clear()
+
+        return True
+
+    def load(self):
+        """This method loads the data set into a new in-memory database. Only the small columns are read.
+        """
+
+        with timer("query_load"):
+            df = pd.read_csv(self.dataset_path, usecols = lambda column: column in COLUMNS)
+            zeit = pd.to_datetime(df["Alarmierungszeit"])
+            df["Jahr"], df["Monat"], df["Stunde"] = zeit.dt.year, zeit.dt.month, zeit.dt.hour
+            df["Alarmierungszeit"] = zeit.dt.strftime("%Y-%m-%d %H:%M:%S")
+            df["Id"] = range(len(df))
+
+            organisationen = df["Organisationen"].astype(str).str.split(";")
+            df_organisationen = pd.DataFrame({"Id": df["Id"], "Organisation": organisationen})
+            df_organisationen = df_organisationen.explode("Organisation")
+            df_organisationen["Organisation"] = df_organisationen["Organisation"].str.strip()
+
+            connection = sqlite3.connect(":memory:", check_same_thread = False)
+            df.to_sql("einsaetze", connection, index = False)
+            df_organisationen.to_sql("organisationen", connection, index = False)
+            for column in ["Jahr", "Einsatztyp", "Einsatzort"]:
+                connection.execute("CREATE INDEX index_" + column + " ON einsaetze (" + column + ")")
+            connection.execute("CREATE INDEX index_organisation ON organisationen (Organisation, Id)")
+            connection.set_authorizer(lambda action, *_args: sqlite3.SQLITE_OK if action in ALLOWED_ACTIONS
+                                      else sqlite3.SQLITE_DENY)
+            # A runaway query, e.g. a recursive CTE without end, must not hold the lock forever
+            connection.set_progress_handler(self.is_overdue, PROGRESS_STEPS)
+
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = connection
+        self.rows = len(df)
+        self.stats["loads"] += 1
+        logging.info("Data set loaded: " + str(self.rows) + " operations")
+
+    def is_overdue(self):
+        """This method is called by SQLite during a query, a true value aborts the query.
+
+        Returns:
+            overdue (boolean): True if the deadline of the running query has passed
+        """
+
+        return self.deadline is not None and time.perf_counter() > self.deadline
+
+    def query(self, sql, parameters = ()):
+        """This method executes a read-only query. Results are cached until the data set changes, queries longer than
+           the timeout are aborted.
+
+        Args:
+            sql (string): SQL query, only SELECT is allowed
+            parameters (tuple, optional): Parameters of the query. Defaults to ().
+
+        Returns:
+            result (dictionary): Columns and rows of the result
+        """
+
+        self.refresh()
+        key = (sql, tuple(parameters))
+
+        with self.lock:
+            if self.connection is None:
+                raise DataUnavailableError(self.error)
+
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.stats["hits"] += 1
+                count("query_cache_hits")
+                return self.cache[key]
+
+            self.stats["misses"] += 1
+            self.deadline = time.perf_counter() + self.timeout
+            try:
+                with timer("query"):
+                    cursor = self.connection.execute(sql, parameters)
+                    result = {"columns": [column[0] for column in cursor.description or []],
+                              "rows": [list(row) for row in cursor.fetchall()]}
+            except (sqlite3.DatabaseError, sqlite3.Warning) as e:
+                if self.is_overdue():
+                    count("query_timeouts")
+                    raise QueryError("Query aborted after " + str(self.timeout) + " seconds") from e
+                raise QueryError(str(e)) from e
+            finally:
+                self.deadline = None
+
+            self.cache[key] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last = False)
+
+        return result
+
+    def count_by(self, by, filters = None, limit = None):
+        """This method counts the operations per group, e.g. per Jahr and Einsatztyp.
+
+        Args:
+            by (list): Groups, keys of GROUPS
+            filters (dictionary, optional): Group -> value, e.g. {"Jahr": "2022"}. Defaults to None.
+            limit (integer, optional): Maximum number of rows. Defaults to None (all).
+
+        Returns:
+            result (dictionary): Columns and rows, largest group first
+        """
+
+        filters = {} if filters is None else filters
+        unknown = [group for group in list(by) + list(filters) if group not in GROUPS]
+        if len(by) == 0 or len(unknown) > 0:
+            raise QueryError("Unknown or missing group: " + ", ".join(unknown) + ", allowed: " + ", ".join(GROUPS))
+
+        # Group and filter columns are taken from GROUPS only, the values are parameters
+        join = " JOIN organisationen o ON o.Id = e.Id" if "Organisation" in list(by) + list(filters) else ""
+        where = " AND ".join("CAST(" + GROUPS[group] + " AS TEXT) = ?" for group in filters)
+        columns = ", ".join(GROUPS[group] + " AS " + group for group in by)
+        sql = ("SELECT " + columns + ", COUNT(DISTINCT e.Id) AS Anzahl FROM einsaetze e" + join +
+               (" WHERE " + where if where else "") + " GROUP BY " + ", ".join(by) + " ORDER BY Anzahl DESC, " +
+               ", ".join(by) + (" LIMIT " + str(int(limit)) if limit is not None else ""))
+
+        return self.query(sql, tuple(str(value) for value in filters.values()))
+
+    def handle(self, method, path, body = b""):
+        """This method answers one request of the API.
+
+        Args:
+            method (string): "GET" or "POST"
+            path (string): Path and query of the request
+            body (bytes, optional): Content of a POST request. Defaults to b"".
+
+        Returns:
+            status (integer): HTTP status code
+            result (dictionary): Content of the response
+        """
+
+        url = urlsplit(path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        start = time.perf_counter()
+
+        try:
+            if url.path == "/health":
+                self.refresh()
+                if self.connection is None:
+                    raise DataUnavailableError(self.error)
+                result = {"rows": self.rows, "signature": list(self.signature), "cache": dict(self.stats),
+                          "cache_entries": len(self.cache), "error": self.error}
+            elif url.path == "/count" or url.path in ROLLUPS:
+                by = [ROLLUPS[url.path]] if url.path in ROLLUPS else query.pop("by", "").split(",")
+                limit = query.pop("limit", None)
+                result = self.count_by([group for group in by if group != ""], query,
+                                       int(limit) if limit is not None else None)
+            elif url.path == "/sql":
+                sql = json.loads(body or b"{}").get("sql", "") if method == "POST" else query.get("q", "")
+                result = self.query(sql)
+            else:
+                return 404, {"error": "Unknown endpoint: " + url.path,
+                             "endpoints": ["/health", "/count", "/sql"] + list(ROLLUPS)}
+        except DataUnavailableError as e:
+            return 503, {"error": str(e)}
+        except (QueryError, ValueError) as e:
+            return 400, {"error": str(e)}
+
+        # The cached result itself is not changed
+        result = {**result, "milliseconds": round((time.perf_counter() - start) * 1000, 3)}
+
+        return 200, result
+
+
+def create_server(service, port = 8050):
+    """This function creates the HTTP server of the API, serve_forever starts it.
+
+    Args:
+        service (QueryService): Query service
+        port (integer, optional): Port of the server, 0 for a free port. Defaults to 8050.
+
+    Returns:
+        server (ThreadingHTTPServer): Server, only reachable from this computer
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def answer(self, method, body = b""):
+            status, result = service.handle(method, self.path, body)
+            content = json.dumps(result, ensure_ascii = False, default = str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_GET(self):
+            self.answer("GET")
+
+        def do_POST(self):
+            self.answer("POST", self.rfile.read(int(self.headers.get("Content-Length", 0))))
+
+        def log_message(self, *_args):
+            pass    # the timings are in the responses
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+    return server
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py serve"
+    server = create_server(QueryService())
+    print("http://127.0.0.1:" + str(server.server_address[1]) + "/einsatzorte")
+    server.serve_forever()
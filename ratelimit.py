@@ -0,0 +1,100 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: ratelimit.py                                                                           #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides a thread-safe request budget, which is shared by all workers that     #
+#          download from the same server.                                                           #
+#---------------------------------------------------------------------------------------------------#
+
+
+import threading
+import time
+
+from instrumentation import timer, count
+
+
+class RateBudget():
+    """This class is a token bucket. Every request takes one token, the tokens are refilled with rate per second up to
+       burst. All threads share the budget, so the server sees at most rate requests per second in total, no matter
+       how many workers are running.
+    """
+
+    def __init__(self, rate = 1.0, burst = 1):
+        """Initialisation of the class (constructor).
+
+        Args:
+            rate (float, optional): Requests per second. Defaults to 1.0.
+            burst (integer, optional): Maximum number of requests at once after a break. Defaults to 1.
+        """
+
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        """This method takes one token, if available.
+
+        Returns:
+            wait (float): 0.0 if a token was taken, otherwise the seconds until the next token
+        """
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """This method blocks until a token is available and takes it.
+        """
+
+        wait = self.try_acquire()
+
+        if wait > 0:
+            count("rate_waits")
+            with timer("rate_wait"):
+                while wait > 0:
+                    time.sleep(wait)
+                    wait = self.try_acquire()
+
+
+class RateLimitedSession():
+    """This class takes a token of the budget before every request and then passes the request on to the session.
+       Every website gets its own budget, so a slow website does not slow down the others.
+    """
+
+    def __init__(self, session, budget):
+        """Initialisation of the class (constructor).
+
+        Args:
+            session (requests Session): Object with a get method
+            budget (RateBudget): Budget of the website
+        """
+
+        self.session = session
+        self.budget = budget
+
+    def get(self, url, **kwargs):
+        """This method waits for the budget and downloads the page.
+
+        Args:
+            url (string): URL of the page
+            kwargs (dictionary): Arguments of requests get, e.g. proxies and timeout
+
+        Returns:
+            page (requests Response): Downloaded page
+        """
+
+        self.budget.acquire()
+
+        return self.session.get(url, **kwargs)
@@ -0,0 +1,327 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: repair.py                                                                              #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides the repair mode for the dataset. Gaps and duplicates in the Nr        #
+#          sequence are detected and only the archive websites containing them are fetched again.   #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+import logging
+import os
+import time
+from furl import furl
+
+from instrumentation import timer, count
+from blobstore import STORE_PATH, move_html_columns
+from webscraping import (PROXIES, get_next_website, get_feed_url, scrape_page, get_affected_pages,
+                         drop_duplicate_operations)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+PAGE_SIZE = 10
+
+
+def find_nr_gaps(df):
+    """This function finds gaps and duplicates in the Nr sequence. The Nr restarts with every year, so the sequence
+       is checked per year of the Alarmierungszeit, missing Nr at the start of a year are a gap too. The oldest year
+       is not checked at its start, the archive begins in the middle of it. Vectorized over the sorted Nr array.
+
+    Args:
+        df (pandas DataFrame): Data set with Nr and Alarmierungszeit, newest operation first
+
+    Returns:
+        df_gaps (pandas DataFrame): One row per gap with Jahr, Von_Nr, Bis_Nr (both missing), Anzahl and Position,
+                                    the position of the next newer operation in df
+        df_duplicates (pandas DataFrame): Rows of df whose Nr appears more than once in the same year
+    """
+
+    jahr = pd.to_datetime(df["Alarmierungszeit"]).dt.year.to_numpy()
+    nr = pd.to_numeric(df["Nr"]).to_numpy(dtype = np.int64)
+    position = np.arange(len(df))
+
+    # Sort by year and Nr descending, i.e. in the order of the archive
+    order = np.lexsort((-nr, -jahr))
+    jahr, nr, position = jahr[order], nr[order], position[order]
+
+    same_year = jahr[1:] == jahr[:-1]
+    diff = nr[:-1] - nr[1:]
+
+    # Gap between two neighbours of the same year
+    gap = same_year & (diff > 1)
+    df_gaps = pd.DataFrame({"Jahr": jahr[:-1][gap], "Von_Nr": nr[1:][gap] + 1, "Bis_Nr": nr[:-1][gap] - 1,
+                            "Anzahl": diff[gap] - 1, "Position": position[:-1][gap]})
+
+    # Gap before the smallest Nr of a year, the missing operations are behind its oldest operation
+    last_of_year = np.ones(len(nr), dtype = bool)
+    last_of_year[:-1] = ~same_year
+    oldest_year = jahr.min() if len(jahr) > 0 else 0
+    start = last_of_year & (nr > 1) & (jahr != oldest_year)
+    df_start = pd.DataFrame({"Jahr": jahr[start], "Von_Nr": 1, "Bis_Nr": nr[start] - 1, "Anzahl": nr[start] - 1,
+                             "Position": position[start]})
+    if not df_start.empty:
+        df_gaps = pd.concat([df_gaps, df_start], ignore_index = True).sort_values(by = "Position", kind = "stable")
+        df_gaps = df_gaps.reset_index(drop = True)
+
+    # Same Nr twice in the same year
+    duplicate = same_year & (diff == 0)
+    duplicate_positions = np.union1d(position[:-1][duplicate], position[1:][duplicate])
+    df_duplicates = df.iloc[duplicate_positions]
+
+    return df_gaps, df_duplicates
+
+
+def get_offsets(df_gaps, shift = 0, page_size = PAGE_SIZE):
+    """This function maps the gaps to the minimal set of archive websites (start numbers) containing them.
+       In the archive every missing operation is behind the next newer stored operation, shifted by the new
+       operations since the download and by the missing operations of all newer gaps.
+
+    Args:
+        df_gaps (pandas DataFrame): Gaps from find_nr_gaps
+        shift (integer, optional): Number of operations in the archive which are newer than the newest stored one.
+                                   Defaults to 0.
+        page_size (integer, optional): Operations per website. Defaults to 10.
+
+    Returns:
+        offsets (numpy array): Sorted unique start numbers of the websites
+    """
+
+    if df_gaps.empty:
+        return np.array([], dtype = np.int64)
+
+    df_gaps = df_gaps.sort_values(by = "Position")
+    anzahl = df_gaps["Anzahl"].to_numpy(dtype = np.int64)
+    missing_before = np.cumsum(anzahl) - anzahl
+
+    # Archive positions of the first and the last missing operation of every gap
+    first = df_gaps["Position"].to_numpy(dtype = np.int64) + 1 + shift + missing_before
+    last = first + anzahl - 1
+
+    # All websites from the first to the last position of every gap
+    first_page = first // page_size
+    anzahl_pages = last // page_size - first_page + 1
+    pages = np.repeat(first_page, anzahl_pages) + np.arange(anzahl_pages.sum())
+    pages -= np.repeat(np.cumsum(anzahl_pages) - anzahl_pages, anzahl_pages)
+    offsets = np.unique(pages) * page_size
+
+    return offsets
+
+
+def estimate_shift(df, url, url_feed, session = None, proxy = PROXIES[1], max_pages = 5):
+    """This function determines how many operations in the archive are newer than the newest stored operation.
+       A failed website or a missing newest operation would give wrong positions for the repair, so both raise.
+
+    Args:
+        df (pandas DataFrame): Stored data set, newest operation first
+        url (string): URL of the first archive website
+        url_feed (string): URL of the first feed website
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        max_pages (integer, optional): Maximum number of websites to search. Defaults to 5.
+
+    Returns:
+        shift (integer): Number of newer operations
+    """
+
+    newest = (int(df["Nr"].iloc[0]), pd.Timestamp(df["Alarmierungszeit"].iloc[0]))
+    shift = 0
+
+    for _ in range(max_pages):
+        df_page, _ = scrape_page(url, url_feed, None, session, proxy)
+        if df_page.empty:
+            raise RuntimeError("No operations on " + url + ", the shift of the archive can not be determined")
+        keys = list(zip(df_page["Nr"].astype(int), pd.to_datetime(df_page["Alarmierungszeit"])))
+
+        if newest in keys:
+            return shift + keys.index(newest)
+
+        shift += len(df_page)
+        url, _ = get_next_website(url)
+        url_feed, _ = get_next_website(url_feed)
+
+    raise RuntimeError("Newest stored operation not found on the first " + str(max_pages) + " websites")
+
+
+def add_missing_features(df_neu, df):
+    """This function adds the features of the extended data set to repaired operations. The coordinates are taken
+       from stored operations with the same Einsatzort, only unknown Einsatzorte are geocoded.
+
+    Args:
+        df_neu (pandas DataFrame): Repaired operations
+        df (pandas DataFrame): Stored extended data set
+
+    Returns:
+        df_neu (pandas DataFrame): Repaired operations with all features
+    """
+
+    from dataset import add_features, add_geodata_features
+
+    df_neu = add_features(df_neu)
+    df_orte = df[["Einsatzort", "Koordinaten_Einsatzort", "Längengrad", "Breitengrad"]].drop_duplicates(subset = "Einsatzort")
+    df_neu = df_neu.merge(df_orte, how = "left", on = "Einsatzort")
+    df_neu["Adresse_Einsatzort"] = "Germany, Bavaria, Schweinfurt, " + df_neu["Einsatzort"]
+
+    unknown = df_neu["Breitengrad"].isna()
+    count("geocode_cache_hits", int((~unknown).sum()))
+    if unknown.any():
+        df_neu.loc[unknown] = add_geodata_features(df_neu[unknown].copy())
+
+    return df_neu[[column for column in df.columns if column in df_neu.columns]]
+
+
+def get_check_offsets(df_check, shift = 0, page_size = PAGE_SIZE):
+    """This function maps the affected websites of the check data to the websites containing their operations now.
+       Since the crawl the operations have moved back by shift positions, so one website can cover two.
+
+    Args:
+        df_check (pandas DataFrame): Check data with URL, Erste_Nr and Letzte_Nr
+        shift (integer, optional): Number of operations in the archive which are newer than the newest stored one.
+                                   Defaults to 0.
+        page_size (integer, optional): Operations per website. Defaults to 10.
+
+    Returns:
+        offsets (numpy array): Sorted unique start numbers of the websites
+    """
+
+    urls = get_affected_pages(df_check)
+    start = np.array([int(furl(url).args.get("start", "0")) for url in urls], dtype = np.int64) + shift
+
+    first_page, last_page = start // page_size, (start + page_size - 1) // page_size
+    offsets = np.unique(np.concatenate([first_page, last_page])) * page_size
+
+    return offsets
+
+
+def get_page_url(url, offset):
+    """This function creates the URL of the archive website with the given start number.
+
+    Args:
+        url (string): URL of any archive website
+        offset (integer): Start number
+
+    Returns:
+        url (string): URL of the website
+    """
+
+    url = furl(url)
+    url.args["start"] = str(offset)
+
+    return url.url
+
+
+def merge_operations(df, df_neu, store_path = STORE_PATH):
+    """This function merges the refetched operations which are not stored yet into the data set.
+
+    Args:
+        df (pandas DataFrame): Stored data set
+        df_neu (pandas DataFrame): Refetched operations
+        store_path (string, optional): Blob store for the HTML columns, if the data set does not contain them.
+                                       Defaults to "./Dataset/einsätze_html".
+
+    Returns:
+        df (pandas DataFrame): Data set with the missing operations, without duplicates, newest operation first
+        anzahl (integer): Number of added operations
+    """
+
+    keys = set(zip(df["Nr"].astype(int), pd.to_datetime(df["Alarmierungszeit"])))
+    neu = [key not in keys for key in zip(df_neu["Nr"].astype(int), pd.to_datetime(df_neu["Alarmierungszeit"]))]
+    df_neu = df_neu[neu].copy()
+
+    if df_neu.empty:
+        return drop_duplicate_operations(df), 0
+
+    # Same format as in the stored csv file
+    df_neu["Alarmierungszeit"] = pd.to_datetime(df_neu["Alarmierungszeit"]).dt.strftime("%Y-%m-%d %H:%M:%S")
+    if "Content" not in df.columns:
+        df_neu = move_html_columns(df_neu, store_path)
+    if "Jahr" in df.columns:
+        df_neu = add_missing_features(df_neu, df)
+
+    df = drop_duplicate_operations(pd.concat([df, df_neu], ignore_index = True))
+
+    return df, len(df_neu)
+
+
+def repair_dataset(path = "./Dataset/einsätze_erweitert.csv", check_path = "./Dataset/check.csv", url = None,
+                   session = None, proxy = PROXIES[1], wait = (1, 5), max_rounds = 2):
+    """This function repairs the stored data set. Only the websites with gaps in the Nr sequence and the affected
+       websites of the check data are fetched again, the missing operations are merged and duplicates are removed.
+       A gap close to the border of a website may need a second round with the corrected positions. If the shift of
+       the archive can not be determined, a RuntimeError is raised and the data set is not changed.
+
+    Args:
+        path (string, optional): Stored data set. Defaults to "./Dataset/einsätze_erweitert.csv".
+        check_path (string, optional): Check data of the crawl, ignored if it does not exist.
+                                       Defaults to "./Dataset/check.csv".
+        url (string, optional): URL of the first archive website. Defaults to None, then the KFV website is used.
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        wait (tuple, optional): Minimum and maximum wait time in seconds between two websites. Defaults to (1, 5).
+        max_rounds (integer, optional): Maximum number of refetch rounds. Defaults to 2.
+
+    Returns:
+        df_gaps (pandas DataFrame): Gaps which are still open after the repair
+    """
+
+    url = "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?start=0" if url is None else url
+
+    with timer("csv_read"):
+        df = pd.read_csv(path)
+    df = drop_duplicate_operations(df)
+    df_gaps, df_duplicates = find_nr_gaps(df)
+    logging.info("Gaps: " + str(len(df_gaps)) + " (" + str(df_gaps["Anzahl"].sum()) + " operations), duplicates: " +
+                 str(len(df_duplicates)))
+    count("gaps", len(df_gaps))
+
+    df_check = pd.read_csv(check_path) if os.path.exists(check_path) else None
+    if df_gaps.empty and (df_check is None or len(get_affected_pages(df_check)) == 0):
+        return df_gaps
+
+    shift = estimate_shift(df, url, get_feed_url(url), session, proxy)
+    offsets = get_offsets(df_gaps, shift)
+    if df_check is not None:
+        offsets = np.union1d(offsets, get_check_offsets(df_check, shift))
+    fetched = set()
+
+    for _ in range(max_rounds):
+        offsets = [offset for offset in offsets if offset not in fetched]
+        if len(offsets) == 0:
+            break
+
+        list_df = []
+        for offset in offsets:
+            page = get_page_url(url, offset)
+            logging.info("Repair website: " + page)
+            df_page, _ = scrape_page(page, get_feed_url(page), None, session, proxy)
+            list_df.append(df_page)
+            fetched.add(offset)
+
+            with timer("sleep"):
+                time.sleep(np.random.uniform(wait[0], wait[1]))
+
+        df, anzahl = merge_operations(df, pd.concat(list_df, ignore_index = True),
+                                      os.path.join(os.path.dirname(path), os.path.basename(STORE_PATH)))
+        count("repaired_rows", anzahl)
+        logging.info("Repaired operations: " + str(anzahl))
+
+        # Positions of the remaining gaps are exact now, the missing operations before them are merged
+        df_gaps, _ = find_nr_gaps(df)
+        offsets = get_offsets(df_gaps, shift)
+
+    with timer("csv_write"):
+        df.to_csv(path, index = False)
+
+    if not df_gaps.empty:
+        logging.warning("Still open gaps: " + str(len(df_gaps)) + " (" + str(df_gaps["Anzahl"].sum()) + " operations)")
+
+    return df_gaps
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py scrape repair"
+    df_gaps = repair_dataset()
+    print(df_gaps)
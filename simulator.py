@@ -0,0 +1,261 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: simulator.py                                                                           #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides a local stand-in for the KFV website. It serves the archive pages    #
+#          and the RSS feed from a corpus with configurable latency, errors, rate limit and new     #
+#          operations arriving during a crawl.                                                      #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import logging
+import threading
+import time
+
+from fixtures import generate_operations, create_archive_page, create_feed_page, create_detail_page, PAGE_SIZE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+ARCHIVE_PATH = "/index.php/einsaetze/einsatzarchiv"
+DETAIL_PATH = "/index.php/einsaetze/einsatzbericht/"
+
+
+class KfvSimulator():
+    """This class runs a local HTTP server with the archive pages (einsaetze/einsatzarchiv?start=N), the feed
+       (format=feed&type=rss) and the detail pages (einsaetze/einsatzbericht/ID) of the KFV website.
+    """
+
+    def __init__(self, df_corpus = None, port = 0, latency = 0.0, jitter = 0.0, error_rate = 0.0, rate_limit = None,
+                 shift_every = None, seed = 28):
+        """Initialisation of the class (constructor).
+
+        Args:
+            df_corpus (pandas DataFrame, optional): Operations, newest first. Defaults to None, then 1000 synthetic
+                                                    operations are generated.
+            port (integer, optional): Port of the server, 0 for a free port. Defaults to 0.
+            latency (float, optional): Delay of every response in seconds. Defaults to 0.0.
+            jitter (float, optional): Additional random delay in seconds, uniform between 0 and jitter. Defaults to 0.0.
+            error_rate (float, optional): Share of requests answered with status 500. Defaults to 0.0.
+            rate_limit (float, optional): Allowed requests per second, further requests get status 429.
+                                          Defaults to None (no limit).
+            shift_every (integer, optional): A new operation arrives after every shift_every requests, all pages
+                                             shift by one. Defaults to None (no new operations).
+            seed (integer, optional): Seed for errors, jitter and new operations. Defaults to 28.
+        """
+
+        self.df_corpus = generate_operations(1000, seed) if df_corpus is None else df_corpus.reset_index(drop = True)
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.shift_every = shift_every
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "new_operations": 0}
+        self.request_times = []     # start times of the requests within the last second
+        self.server = None
+        self.thread = None
+
+    def __enter__(self):
+        """This method starts the server for a with block.
+
+        Returns:
+            simulator (KfvSimulator): Started simulator
+        """
+
+        self.start()
+
+        return self
+
+    def __exit__(self, *_args):
+        """This method stops the server at the end of a with block.
+        """
+
+        self.stop()
+
+    @property
+    def url(self):
+        """This method returns the URL of the first archive page.
+
+        Returns:
+            url (string): URL of the first archive page
+        """
+
+        return "http://127.0.0.1:" + str(self.port) + ARCHIVE_PATH + "?start=0"
+
+    @property
+    def url_feed(self):
+        """This method returns the URL of the first feed page.
+
+        Returns:
+            url_feed (string): URL of the first feed page
+        """
+
+        return "http://127.0.0.1:" + str(self.port) + ARCHIVE_PATH + "?format=feed&type=rss&start=0"
+
+    def start(self):
+        """This method starts the server in a background thread.
+        """
+
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                status, body, headers = simulator.handle(self.path)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *_args):
+                pass    # the statistics are collected in the simulator
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target = self.server.serve_forever, daemon = True)
+        self.thread.start()
+        logging.info("Simulator running: " + self.url)
+
+    def stop(self):
+        """This method stops the server.
+        """
+
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.thread.join()
+            self.server = None
+
+    def add_operation(self):
+        """This method adds a new operation at the top of the archive, like a new operation during a crawl.
+           Must be called with the lock held.
+        """
+
+        newest = pd.Timestamp(self.df_corpus["Alarmierungszeit"].iloc[0]) + pd.Timedelta(minutes = 30)
+        df_neu = generate_operations(1, int(self.rng.integers(0, 2 ** 31)), newest = str(newest))
+        df_neu["Nr"] = int(self.df_corpus["Nr"].max()) + 1
+        df_neu["Link_einsatz"] = "/index.php/einsaetze/einsatzbericht/" + str(100000 + df_neu["Nr"].iloc[0])
+        self.df_corpus = pd.concat([df_neu, self.df_corpus], ignore_index = True)
+        self.stats["new_operations"] += 1
+
+    def handle(self, path):
+        """This method answers one request. Called by the server threads.
+
+        Args:
+            path (string): Path and query of the request
+
+        Returns:
+            status (integer): HTTP status code
+            body (bytes): Content of the response
+            headers (dictionary): Additional headers
+        """
+
+        with self.lock:
+            now = time.monotonic()
+            self.stats["requests"] += 1
+
+            if self.shift_every is not None and self.stats["requests"] % self.shift_every == 0:
+                self.add_operation()
+
+            # Sliding window of one second for the rate limit
+            self.request_times = [t for t in self.request_times if now - t < 1.0]
+            if self.rate_limit is not None and len(self.request_times) >= self.rate_limit:
+                self.stats["rate_limited"] += 1
+                return 429, b"Too Many Requests", {"Retry-After": "1"}
+            self.request_times.append(now)
+
+            error = self.rng.random() < self.error_rate
+            delay = self.latency + (self.rng.random() * self.jitter if self.jitter > 0 else 0.0)
+            df_corpus = self.df_corpus
+
+        time.sleep(delay)
+
+        if error:
+            with self.lock:
+                self.stats["errors"] += 1
+            return 500, b"Internal Server Error", {}
+
+        url = urlsplit(path)
+        if url.path.startswith(DETAIL_PATH):
+            df_einsatz = df_corpus[df_corpus["Link_einsatz"] == url.path]
+            if df_einsatz.empty:
+                return 404, b"Not Found", {}
+            body = create_detail_page(next(df_einsatz.itertuples(index = False))).encode("utf-8")
+            return 200, body, {"Content-Type": "text/html; charset=utf-8"}
+
+        if url.path != ARCHIVE_PATH:
+            return 404, b"Not Found", {}
+
+        query = parse_qs(url.query)
+        start = int(query.get("start", ["0"])[0])
+        df_page = df_corpus.iloc[start:start + PAGE_SIZE]
+
+        if query.get("format", [""])[0] == "feed":
+            return 200, create_feed_page(df_page).encode("utf-8"), {"Content-Type": "application/rss+xml; charset=utf-8"}
+
+        last_start = max(len(df_corpus) - 1, 0) // PAGE_SIZE * PAGE_SIZE
+        body = create_archive_page(df_page, start, last_start).encode("utf-8")
+
+        return 200, body, {"Content-Type": "text/html; charset=utf-8"}
+
+
+def load_test(simulator, pages = 50, workers = 1):
+    """This function crawls the simulator with the webscraper and measures the throughput. Errors and rate limits
+       are retried by the webscraper, pages which still fail are counted.
+
+    Args:
+        simulator (KfvSimulator): Started simulator
+        pages (integer, optional): Number of archive pages. Defaults to 50.
+        workers (integer, optional): Number of parallel crawler threads. Defaults to 1.
+
+    Returns:
+        result (dictionary): Pages, rows, failed pages, seconds, pages per second and the server statistics
+    """
+
+    import requests
+    from webscraping import webscraper, get_next_website
+
+    def scrape(number):
+        session = requests.Session()
+        url, url_feed = simulator.url, simulator.url_feed
+        for _ in range(number // PAGE_SIZE):
+            url, _ = get_next_website(url)
+            url_feed, _ = get_next_website(url_feed)
+
+        return webscraper(url, url_feed, session, {})
+
+    start = time.perf_counter()
+    rows, failed = 0, 0
+
+    with ThreadPoolExecutor(max_workers = workers) as executor:
+        for future in [executor.submit(scrape, number * PAGE_SIZE) for number in range(pages)]:
+            try:
+                rows += len(future.result())
+            except Exception as e:
+                logging.warning(e)
+                failed += 1
+
+    seconds = time.perf_counter() - start
+    result = {"pages": pages, "rows": rows, "failed": failed, "seconds": seconds,
+              "pages_per_second": pages / seconds, **simulator.stats}
+
+    return result
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py simulate"
+    with KfvSimulator(generate_operations(15000), port = 8080, latency = 0.2, error_rate = 0.02, rate_limit = 5) as simulator:
+        print(simulator.url)
+        while True:
+            time.sleep(1)
@@ -0,0 +1,183 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: sources.py                                                                             #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides the description of the websites (sources) with the same operations    #
+#          archive as the KFV Schweinfurt: URLs, table layout, page size and politeness.            #
+#---------------------------------------------------------------------------------------------------#
+
+
+from datetime import datetime
+import json
+import os
+
+
+SOURCES_PATH = "./sources.json"
+ARCHIVE_PATH = "/index.php/einsaetze/einsatzarchiv"
+# Line of the values in the text of a table row, the Kurzbericht slides to the next line for long locations
+LINES = {"Alarmierungszeit": 2, "Einsatztyp": 6, "Einsatzort": 9, "Kurzbericht": 23}
+
+
+class Source():
+    """This class describes one website with an operations archive. The defaults are those of the KFV Schweinfurt,
+       other associations with the same archive component usually only need a name and a base URL. A website with
+       other line positions only needs lines, a completely different layout overrides parse_row.
+    """
+
+    def __init__(self, name, base_url, archive_path = ARCHIVE_PATH, table_id = "einsatzberichtList",
+                 images_path = "/images/", page_size = 10, rate = 0.2, header_rows = 1, footer_rows = 2, lines = None):
+        """Initialisation of the class (constructor).
+
+        Args:
+            name (string): Short name, value of the Quelle column and name of the partition
+            base_url (string): Scheme and host, e.g. "https://www.kfv-schweinfurt.de"
+            archive_path (string, optional): Path of the archive. Defaults to "/index.php/einsaetze/einsatzarchiv".
+            table_id (string, optional): Id of the table with the operations. Defaults to "einsatzberichtList".
+            images_path (string, optional): Path of the images, the image name follows it. Defaults to "/images/".
+            page_size (integer, optional): Operations per archive page. Defaults to 10.
+            rate (float, optional): Requests per second to this website. Defaults to 0.2.
+            header_rows (integer, optional): Rows of the table before the operations. Defaults to 1.
+            footer_rows (integer, optional): Rows of the table after the operations (pagination). Defaults to 2.
+            lines (dictionary, optional): Line of Alarmierungszeit, Einsatztyp, Einsatzort and Kurzbericht in the text
+                                          of a row, missing keys keep the default. Defaults to None (LINES).
+        """
+
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.archive_path = archive_path
+        self.table_id = table_id
+        self.images_path = images_path
+        self.page_size = page_size
+        self.rate = rate
+        self.header_rows = header_rows
+        self.footer_rows = footer_rows
+        self.lines = {**LINES, **(lines or {})}
+
+    @property
+    def url(self):
+        """This method returns the URL of the first archive page.
+
+        Returns:
+            url (string): URL of the first archive page
+        """
+
+        return self.base_url + self.archive_path + "?start=0"
+
+    @property
+    def url_feed(self):
+        """This method returns the URL of the first feed page.
+
+        Returns:
+            url_feed (string): URL of the first feed page
+        """
+
+        return self.base_url + self.archive_path + "?format=feed&type=rss&start=0"
+
+    @property
+    def images_url(self):
+        """This method returns the URL in front of the image names.
+
+        Returns:
+            images_url (string): URL of the image folder
+        """
+
+        return self.base_url + self.images_path
+
+    def get_rows(self, rows):
+        """This method removes the header and footer rows of the table.
+
+        Args:
+            rows (list): All rows of the table
+
+        Returns:
+            rows (list): Rows with operations
+        """
+
+        return rows[self.header_rows:len(rows) - self.footer_rows]
+
+    def parse_row(self, einsatz):
+        """This method extracts the data of one operation from a row of the table.
+
+        Args:
+            einsatz (BeautifulSoup Tag): HTML code of the operation
+
+        Returns:
+            dict_einsatz (dictionary): Contains all extracted data
+        """
+
+        # Split text into list
+        einsatz_list = einsatz.get_text().split("\n")
+
+        # Extract Alarmierungszeit
+        einsatz_datum_zeit = einsatz_list[self.lines["Alarmierungszeit"]].split(" ")
+        datum = einsatz_datum_zeit[1]
+        zeit = einsatz_datum_zeit[-1].split("Uhr")[0]
+        alarmierungszeit = datetime.strptime(datum + " " + zeit, "%d.%m.%Y %H:%M")  # parse date and time
+
+        # Weekday
+        wochentag = alarmierungszeit.strftime("%A")
+
+        # Extract Einsatztyp
+        einsatztyp = einsatz_list[self.lines["Einsatztyp"]]
+
+        # Extract Einsatzort
+        einsatzort = einsatz_list[self.lines["Einsatzort"]].split("\t")[0][1:]    # remove first space
+
+        # Link to operation, link is in the first element and from this the link is extracted
+        link_einsatz = str(einsatz).split('<a href="')[1].split('">')[0]
+
+        # Image name, image name is in the first element and from this the name is extracted
+        bild_name = str(einsatz).split(self.images_url)[1].split('"')[0].split("/")[-1]
+
+        # Extract Kurzbericht
+        zeile = self.lines["Kurzbericht"]
+        kurzbericht = einsatz_list[zeile].split("\t")
+
+        # check length of kurzbericht
+        if len(kurzbericht) > 5:
+            kurzbericht = kurzbericht[5]
+        elif len(einsatz_list[zeile + 1].split("\t")) > 5:   # if long location, then it slides to the next line
+            kurzbericht = einsatz_list[zeile + 1].split("\t")[5]
+        else:   # no kurzbericht available
+            kurzbericht = ""
+
+        # Extract Organisationen
+        einsatz_string = str(einsatz).split('<!-- <span class="label label-info"> --!>')[1:]  # first one is useless
+
+        # add all organisations to a string seperated by ;
+        organisationen = ";".join([organisation.split("<!-- </span>--!>")[0].lstrip()
+                                    for organisation in einsatz_string])
+
+        # Data to dictionary
+        dict_einsatz = {"Nr": None, "Alarmierungszeit": alarmierungszeit, "Wochentag": wochentag,
+                        "Einsatztyp": einsatztyp, "Einsatzort": einsatzort, "Link_einsatz": link_einsatz,
+                        "Bild": bild_name, "Kurzbericht": kurzbericht, "Organisationen": organisationen,
+                        "Content": str(einsatz), "Text": einsatz.get_text()}
+
+        return dict_einsatz
+
+
+KFV_SCHWEINFURT = Source("kfv-schweinfurt", "https://www.kfv-schweinfurt.de")
+
+
+def get_sources(path = SOURCES_PATH):
+    """This function returns all known sources, the KFV Schweinfurt and the sources of the configuration file.
+       The file is a JSON list with the arguments of Source, e.g. [{"name": "kfv-xy", "base_url": "https://..."}],
+       a different layout of the rows can be described with "lines", e.g. {"Einsatzort": 10, "Kurzbericht": 24}.
+
+    Args:
+        path (string, optional): Configuration file. Defaults to "./sources.json".
+
+    Returns:
+        sources (dictionary): Name -> Source
+    """
+
+    sources = {KFV_SCHWEINFURT.name: KFV_SCHWEINFURT}
+
+    if os.path.exists(path):
+        with open(path, "r", encoding = "utf-8") as file:
+            for parameters in json.load(file):
+                source = Source(**parameters)
+                sources[source.name] = source
+
+    return sources
@@ -0,0 +1,178 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: station_coverage.py                                                                    #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides a vectorized distance engine between organisations (fire stations)   #
+#          and Einsatzorte and derives coverage statistics from it.                                 #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0088     # mean earth radius
+
+
+def haversine_matrix(lat_a, lon_a, lat_b, lon_b):
+    """This function calculates the haversine distance between every point of a and every point of b.
+
+    Args:
+        lat_a (numpy array): Latitudes of the points a in degrees, shape (n,)
+        lon_a (numpy array): Longitudes of the points a in degrees, shape (n,)
+        lat_b (numpy array): Latitudes of the points b in degrees, shape (m,)
+        lon_b (numpy array): Longitudes of the points b in degrees, shape (m,)
+
+    Returns:
+        distances (numpy array): Distances in km, shape (n, m), NaN if a coordinate is missing
+    """
+
+    lat_a = np.radians(np.asarray(lat_a, dtype = np.float64))[:, np.newaxis]
+    lon_a = np.radians(np.asarray(lon_a, dtype = np.float64))[:, np.newaxis]
+    lat_b = np.radians(np.asarray(lat_b, dtype = np.float64))[np.newaxis, :]
+    lon_b = np.radians(np.asarray(lon_b, dtype = np.float64))[np.newaxis, :]
+
+    # Broadcasting (n, 1) against (1, m) results in (n, m)
+    a = np.sin((lat_b - lat_a) / 2) ** 2 + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+    return distances
+
+
+def iter_distance_blocks(lat_a, lon_a, lat_b, lon_b, block_size = 1024):
+    """This function calculates the distance matrix in blocks of columns, so that the memory stays bounded.
+
+    Args:
+        lat_a (numpy array): Latitudes of the points a in degrees, shape (n,)
+        lon_a (numpy array): Longitudes of the points a in degrees, shape (n,)
+        lat_b (numpy array): Latitudes of the points b in degrees, shape (m,)
+        lon_b (numpy array): Longitudes of the points b in degrees, shape (m,)
+        block_size (integer, optional): Number of points b per block. Defaults to 1024.
+
+    Yields:
+        start (integer): First index of the block in b
+        stop (integer): Last index (exclusive) of the block in b
+        distances (numpy array): Distances in km, shape (n, stop - start)
+    """
+
+    lat_b = np.asarray(lat_b, dtype = np.float64)
+    lon_b = np.asarray(lon_b, dtype = np.float64)
+
+    for start in range(0, len(lat_b), block_size):
+        stop = min(start + block_size, len(lat_b))
+        yield start, stop, haversine_matrix(lat_a, lon_a, lat_b[start:stop], lon_b[start:stop])
+
+
+def get_station_coordinates(df):
+    """This function determines the coordinates of all organisations. The location is the second word of the
+       organisation (e.g. "FF Gochsheim" -> "Gochsheim") and the coordinates are taken from the Einsatzort.
+
+    Args:
+        df (pandas DataFrame): Extended data set, contains Organisationen, Einsatzort, Breitengrad and Längengrad
+
+    Returns:
+        df_stationen (pandas DataFrame): One row per organisation with Organisationstyp, Ort, Breitengrad and Längengrad
+    """
+
+    organisationen = df["Organisationen"].astype(str).str.split(";").explode().str.strip()
+    df_stationen = pd.DataFrame(organisationen[organisationen != ""].unique(), columns = ["Organisation"])
+    df_stationen["Organisationstyp"] = df_stationen["Organisation"].str.split(" ").str[0]
+    df_stationen["Ort"] = df_stationen["Organisation"].str.split(" ").str[1]
+
+    # Coordinates of the Einsatzort with the same name, first match
+    df_orte = df[["Einsatzort", "Breitengrad", "Längengrad"]].dropna().drop_duplicates(subset = "Einsatzort")
+    df_stationen = df_stationen.merge(df_orte, how = "left", left_on = "Ort", right_on = "Einsatzort")
+    df_stationen = df_stationen.drop(columns = "Einsatzort")
+
+    return df_stationen
+
+
+def coverage_analysis(df, df_stationen = None, radius_km = 10.0, block_size = 1024, quantile = 0.9):
+    """This function relates all organisations to all Einsatzorte in one batched pass. The distance matrix is
+       calculated between the organisations and the unique Einsatzorte only, block by block.
+
+    Args:
+        df (pandas DataFrame): Extended data set, contains Organisationen, Einsatzort, Breitengrad and Längengrad
+        df_stationen (pandas DataFrame, optional): Coordinates of the organisations. Defaults to None, then
+                                                   get_station_coordinates is used.
+        radius_km (float, optional): Responders further away than this are counted. Defaults to 10.0.
+        block_size (integer, optional): Number of Einsatzorte per block. Defaults to 1024.
+        quantile (float, optional): Quantile of the response distances used as coverage radius. Defaults to 0.9.
+
+    Returns:
+        df (pandas DataFrame): Data set with the nearest organisation, its distance and the number of
+                               responders beyond radius_km per operation
+        df_stationen (pandas DataFrame): Organisations with number of operations, coverage radius and number of
+                                         operations beyond radius_km
+    """
+
+    df = df.copy()
+
+    if df_stationen is None:
+        df_stationen = get_station_coordinates(df)
+    df_stationen = df_stationen.reset_index(drop = True)
+
+    # Unique Einsatzorte, every operation points to one of them
+    df_orte = df[["Einsatzort", "Breitengrad", "Längengrad"]].drop_duplicates(subset = "Einsatzort").reset_index(drop = True)
+    ort_index = df["Einsatzort"].map(pd.Series(df_orte.index, index = df_orte["Einsatzort"])).to_numpy()
+
+    # Pairs of (operation, organisation, Einsatzort) for all responding organisations
+    organisationen = df["Organisationen"].astype(str).str.split(";").explode().str.strip()
+    station_index = organisationen.map(pd.Series(df_stationen.index, index = df_stationen["Organisation"]))
+    valid = station_index.notna().to_numpy()
+    pair_einsatz = np.repeat(np.arange(len(df)), df["Organisationen"].astype(str).str.count(";").to_numpy() + 1)[valid]
+    pair_station = station_index.to_numpy()[valid].astype(np.int64)
+    pair_ort = ort_index[pair_einsatz]
+
+    # Sort pairs by Einsatzort, so that every block only has to look at a contiguous slice
+    order = np.argsort(pair_ort, kind = "stable")
+    pair_einsatz, pair_station, pair_ort = pair_einsatz[order], pair_station[order], pair_ort[order]
+    pair_distanz = np.full(len(pair_ort), np.nan)
+
+    nächste_station = np.full(len(df_orte), -1, dtype = np.int64)
+    nächste_distanz = np.full(len(df_orte), np.nan)
+
+    for start, stop, distances in iter_distance_blocks(df_stationen["Breitengrad"], df_stationen["Längengrad"],
+                                                       df_orte["Breitengrad"], df_orte["Längengrad"], block_size):
+        # Nearest organisation per Einsatzort, missing coordinates never win
+        if len(df_stationen) > 0:
+            distances_filled = np.where(np.isnan(distances), np.inf, distances)
+            argmin = distances_filled.argmin(axis = 0)
+            minimum = distances_filled[argmin, np.arange(stop - start)]
+            found = np.isfinite(minimum)
+            nächste_station[start:stop] = np.where(found, argmin, -1)
+            nächste_distanz[start:stop] = np.where(found, minimum, np.nan)
+
+        # Distances of the responding organisations
+        left, right = np.searchsorted(pair_ort, [start, stop])
+        pair_distanz[left:right] = distances[pair_station[left:right], pair_ort[left:right] - start]
+
+    # Per operation
+    organisation_namen = np.append(df_stationen["Organisation"].to_numpy(dtype = object), None)
+    df["Nächste_Organisation"] = organisation_namen[nächste_station[ort_index]]
+    df["Distanz_nächste_Organisation"] = nächste_distanz[ort_index]
+    beyond = np.nan_to_num(pair_distanz, nan = 0.0) > radius_km
+    df["Anzahl_Organisationen_über_Radius"] = np.bincount(pair_einsatz[beyond], minlength = len(df))
+
+    # Per organisation
+    df_pairs = pd.DataFrame({"Station": pair_station, "Distanz": pair_distanz})
+    grouped = df_pairs.groupby("Station")["Distanz"]
+    df_stationen["Anzahl_Einsätze"] = grouped.size().reindex(df_stationen.index, fill_value = 0).to_numpy()
+    df_stationen["Abdeckungsradius"] = grouped.quantile(quantile).reindex(df_stationen.index).to_numpy()
+    df_stationen["Einsätze_über_Radius"] = np.bincount(pair_station[beyond], minlength = len(df_stationen))
+    df_stationen["Nächste_Organisation_Anzahl"] = np.bincount(nächste_station[ort_index][nächste_station[ort_index] >= 0],
+                                                              minlength = len(df_stationen))
+
+    return df, df_stationen
+
+
+if __name__ == "__main__":
+
+    # Read data
+    df = pd.read_csv("./Dataset/einsätze_erweitert.csv")
+
+    df, df_stationen = coverage_analysis(df, radius_km = 10.0)
+    df_stationen.to_csv("./Dataset/abdeckung_organisationen.csv", index = False)
+
+    print(df_stationen.sort_values(by = "Einsätze_über_Radius", ascending = False).head(10))
+    print("Operations with responders beyond 10 km:", (df["Anzahl_Organisationen_über_Radius"] > 0).sum())
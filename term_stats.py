@@ -0,0 +1,355 @@
+#---------------------------------------------------------------------------------------------------#
+# File name: term_stats.py                                                                          #
+# Autor: Chrissi2802                                                                                #
+# Created on: 19.10.2026                                                                            #
+# Content: This file provides persistent frequencies of the terms and n-grams of the Kurzberichte   #
+#          per Jahr, Einsatztyp and Einsatzort. New operations are counted incrementally.           #
+#---------------------------------------------------------------------------------------------------#
+
+
+import pandas as pd
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+import glob
+import json
+import logging
+import os
+
+from instrumentation import timer, count
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
+
+
+STORE_PATH = "./Dataset/begriffe"
+DIMENSIONS = ["Jahr", "Einsatztyp", "Einsatzort"]
+# Frequent words without meaning, only left out of the word cloud
+STOPWORDS = {"am", "an", "auf", "aus", "bei", "das", "dem", "den", "der", "die", "ein", "eine", "einer", "für", "im",
+             "in", "mit", "nach", "und", "von", "vor", "zu", "zum", "zur"}
+
+
+def normalize_kurzbericht(kurzberichte):
+    """This function normalizes the Kurzberichte like the analysis: lower case, without spaces at the start and end.
+
+    Args:
+        kurzberichte (pandas Series): Kurzberichte
+
+    Returns:
+        kurzberichte (pandas Series): Normalized Kurzberichte
+    """
+
+    return kurzberichte.fillna("").astype(str).str.lower().str.strip()
+
+
+class TermStatistics():
+    """This class counts in how many operations a term (words and word pairs) or a whole Kurzbericht occurs, per
+       Jahr, per Einsatztyp and per Einsatzort. The counts are sparse matrices with one row per group (e.g.
+       Einsatztyp Brand) and one column per term. Already counted operations are remembered, so the whole data set
+       can be passed and only new operations are counted.
+    """
+
+    def __init__(self, ngram_range = (1, 2)):
+        """Initialisation of the class (constructor).
+
+        Args:
+            ngram_range (tuple, optional): Length of the counted n-grams. Defaults to (1, 2).
+        """
+
+        self.ngram_range = tuple(ngram_range)
+        self.terms = {}             # term -> column
+        self.kurzberichte = {}      # Kurzbericht -> column
+        self.groups = {}            # "Dimension|Value" -> row
+        self.term_counts = sparse.csr_matrix((0, 0), dtype = np.int64)
+        self.kurzbericht_counts = sparse.csr_matrix((0, 0), dtype = np.int64)
+        self.operations = np.zeros(0, dtype = np.int64)     # operations per group
+        self.keys = set()
+        self.version = 0            # version of the saved .npz files
+
+    def get_rows(self, dimension, values):
+        """This method returns the row of every group, new groups get a new row.
+
+        Args:
+            dimension (string): Jahr, Einsatztyp or Einsatzort
+            values (pandas Series): Value per operation
+
+        Returns:
+            rows (numpy array): Row per operation
+        """
+
+        groups = (dimension + "|" + values.astype(str)).to_numpy()
+        for group in pd.unique(groups):
+            self.groups.setdefault(group, len(self.groups))
+
+        return np.array([self.groups[group] for group in groups], dtype = np.int64)
+
+    def add_counts(self, counts, batch_vocabulary, matrix, vocabulary, rows):
+        """This method adds the counts of new operations to a count matrix.
+
+        Args:
+            counts (scipy sparse matrix): Operations x batch vocabulary, 1 if the term occurs
+            batch_vocabulary (dictionary): Term -> column of counts
+            matrix (scipy sparse matrix): Groups x vocabulary, saved counts
+            vocabulary (dictionary): Term -> column of the saved counts, is extended by the new terms
+            rows (numpy array): Row of every operation per dimension, shape (dimensions, operations)
+
+        Returns:
+            matrix (scipy sparse matrix): Updated counts
+        """
+
+        columns = np.empty(len(batch_vocabulary), dtype = np.int64)
+        for term, batch_column in batch_vocabulary.items():
+            columns[batch_column] = vocabulary.setdefault(term, len(vocabulary))
+
+        # Indicator groups x operations, every operation is in one group per dimension
+        n = counts.shape[0]
+        indicator = sparse.csr_matrix((np.ones(rows.size, dtype = np.int64),
+                                       (rows.ravel(), np.tile(np.arange(n), len(rows)))), shape = (len(self.groups), n))
+        batch = (indicator @ counts).tocoo()
+
+        matrix = matrix.tocoo()
+        data = np.concatenate([matrix.data, batch.data])
+        row = np.concatenate([matrix.row, batch.row])
+        column = np.concatenate([matrix.col, columns[batch.col]])
+
+        # Duplicate entries are summed up
+        return sparse.csr_matrix((data, (row, column)), shape = (len(self.groups), len(vocabulary)))
+
+    def update(self, df):
+        """This method counts the new operations.
+
+        Args:
+            df (pandas DataFrame): Operations with Nr, Alarmierungszeit, Kurzbericht, Einsatztyp and Einsatzort
+
+        Returns:
+            new (integer): Number of counted operations
+        """
+
+        zeit = pd.to_datetime(df["Alarmierungszeit"])
+        keys = df["Nr"].astype(int).astype(str) + "|" + zeit.dt.strftime("%Y-%m-%d %H:%M:%S")
+        neu = ~keys.isin(self.keys) & ~keys.duplicated()
+        df, zeit, keys = df[neu], zeit[neu], keys[neu]
+
+        if df.empty:
+            return 0
+
+        with timer("term_counting"):
+            kurzberichte = normalize_kurzbericht(df["Kurzbericht"])
+            rows = np.vstack([self.get_rows("Jahr", zeit.dt.year), self.get_rows("Einsatztyp", df["Einsatztyp"]),
+                              self.get_rows("Einsatzort", df["Einsatzort"])])
+            self.operations = np.concatenate([self.operations, np.zeros(len(self.groups) - len(self.operations),
+                                                                        dtype = np.int64)])
+            np.add.at(self.operations, rows.ravel(), 1)
+
+            # Words and word pairs, every term counts once per operation
+            vectorizer = CountVectorizer(ngram_range = self.ngram_range, binary = True)
+            try:
+                matrix, vocabulary = vectorizer.fit_transform(kurzberichte), vectorizer.vocabulary_
+            except ValueError:
+                matrix, vocabulary = sparse.csr_matrix((len(df), 0), dtype = np.int64), {}     # only empty Kurzberichte
+            self.term_counts = self.add_counts(matrix, vocabulary, self.term_counts, self.terms, rows)
+
+            # Whole Kurzberichte
+            codes, uniques = pd.factorize(kurzberichte)
+            matrix = sparse.csr_matrix((np.ones(len(codes), dtype = np.int64), (np.arange(len(codes)), codes)),
+                                       shape = (len(codes), len(uniques)))
+            self.kurzbericht_counts = self.add_counts(matrix, dict(zip(uniques, range(len(uniques)))),
+                                                      self.kurzbericht_counts, self.kurzberichte, rows)
+
+        self.keys.update(keys)
+        count("counted_kurzberichte", len(df))
+
+        return len(df)
+
+    def get_counts(self, matrix, vocabulary, dimension = None, value = None):
+        """This method returns the counts of one group or of all operations.
+
+        Args:
+            matrix (scipy sparse matrix): Groups x vocabulary
+            vocabulary (dictionary): Term -> column
+            dimension (string, optional): Jahr, Einsatztyp or Einsatzort. Defaults to None (all operations).
+            value (string, optional): Value of the group, e.g. "Brand". Defaults to None.
+
+        Returns:
+            counts (pandas Series): Number of operations per term, largest first
+        """
+
+        if dimension is None:
+            # Every operation has exactly one Jahr
+            rows = [row for group, row in self.groups.items() if group.startswith("Jahr|")]
+        else:
+            if dimension not in DIMENSIONS:
+                raise ValueError("Unknown dimension: " + str(dimension) + ", allowed: " + ", ".join(DIMENSIONS))
+            rows = [self.groups[dimension + "|" + str(value)]] if dimension + "|" + str(value) in self.groups else []
+
+        values = np.asarray(matrix[rows].sum(axis = 0)).ravel() if len(rows) > 0 else np.zeros(len(vocabulary))
+        counts = pd.Series(values.astype(np.int64), index = list(vocabulary), name = "Anzahl")
+
+        return counts[counts > 0].sort_values(ascending = False, kind = "stable")
+
+    def top_terms(self, n = 20, dimension = None, value = None, ngram = None):
+        """This method returns the most frequent terms.
+
+        Args:
+            n (integer, optional): Number of terms. Defaults to 20.
+            dimension (string, optional): Jahr, Einsatztyp or Einsatzort. Defaults to None (all operations).
+            value (string, optional): Value of the group, e.g. "Brand". Defaults to None.
+            ngram (integer, optional): Only terms with this number of words. Defaults to None (all).
+
+        Returns:
+            counts (pandas Series): Number of operations per term
+        """
+
+        counts = self.get_counts(self.term_counts, self.terms, dimension, value)
+        if ngram is not None:
+            counts = counts[counts.index.str.count(" ") == ngram - 1]
+
+        return counts.head(n)
+
+    def top_kurzberichte(self, min_count = 50, dimension = None, value = None):
+        """This method returns the frequent Kurzberichte, e.g. the Kurzberichte with more than 50 operations.
+
+        Args:
+            min_count (integer, optional): Only Kurzberichte with more operations. Defaults to 50.
+            dimension (string, optional): Jahr, Einsatztyp or Einsatzort. Defaults to None (all operations).
+            value (string, optional): Value of the group. Defaults to None.
+
+        Returns:
+            counts (pandas Series): Number of operations per Kurzbericht
+        """
+
+        counts = self.get_counts(self.kurzbericht_counts, self.kurzberichte, dimension, value)
+
+        return counts[(counts > min_count) & (counts.index != "")]
+
+    def wordcloud_weights(self, n = 200, dimension = None, value = None):
+        """This method returns the weights for a word cloud, e.g. WordCloud().generate_from_frequencies(weights).
+
+        Args:
+            n (integer, optional): Number of terms. Defaults to 200.
+            dimension (string, optional): Jahr, Einsatztyp or Einsatzort. Defaults to None (all operations).
+            value (string, optional): Value of the group. Defaults to None.
+
+        Returns:
+            weights (dictionary): Term -> weight, the most frequent term has weight 1
+        """
+
+        counts = self.get_counts(self.term_counts, self.terms, dimension, value)
+        counts = counts[[not set(term.split()) & STOPWORDS for term in counts.index]].head(n)
+
+        return (counts / counts.max()).to_dict() if len(counts) > 0 else {}
+
+    def trend(self, terms, relative = False):
+        """This method returns the number of operations with a term per Jahr.
+
+        Args:
+            terms (list): Terms, e.g. ["unwetter", "baum"]
+            relative (boolean, optional): Share of all operations of the year instead of the number. Defaults to False.
+
+        Returns:
+            df_trend (pandas DataFrame): One row per Jahr, one column per term
+        """
+
+        jahre = sorted((group.split("|", 1)[1], row) for group, row in self.groups.items() if group.startswith("Jahr|"))
+        rows = [row for _, row in jahre]
+        df_trend = pd.DataFrame(index = pd.Index([int(jahr) for jahr, _ in jahre], name = "Jahr"))
+
+        for term in terms:
+            column = self.terms.get(str(term).lower())
+            values = (self.term_counts[rows, column].toarray().ravel() if column is not None and len(rows) > 0
+                      else np.zeros(len(rows), dtype = np.int64))
+            df_trend[term] = values / self.operations[rows] if relative else values
+
+        return df_trend
+
+    def save(self, path = STORE_PATH):
+        """This method saves the counts as .npz files and the vocabularies as JSON, atomically. Every save writes
+           new versions of the .npz files, the JSON file references them and is replaced last. An interrupted save
+           leaves the previous state complete, the files of the previous version are removed afterwards.
+
+        Args:
+            path (string, optional): Path of the files without extension. Defaults to "./Dataset/begriffe".
+        """
+
+        directory, name = os.path.split(path)
+        version = self.version + 1
+        files = {"term_counts": name + "_terme." + str(version) + ".npz",
+                 "kurzbericht_counts": name + "_kurzberichte." + str(version) + ".npz"}
+
+        for key, matrix in [("term_counts", self.term_counts), ("kurzbericht_counts", self.kurzbericht_counts)]:
+            sparse.save_npz(os.path.join(directory, files[key]), matrix.tocsr())
+
+        state = {"ngram_range": self.ngram_range, "terms": list(self.terms), "kurzberichte": list(self.kurzberichte),
+                 "groups": list(self.groups), "operations": self.operations.tolist(), "keys": sorted(self.keys),
+                 "version": version, "files": files}
+
+        with open(path + ".json.tmp", "w", encoding = "utf-8") as file:
+            json.dump(state, file, ensure_ascii = False)
+        os.replace(path + ".json.tmp", path + ".json")
+
+        # Older versions and files of interrupted saves are not referenced any more
+        for old in glob.glob(glob.escape(path) + "_terme.*.npz") + glob.glob(glob.escape(path) + "_kurzberichte.*.npz"):
+            if os.path.basename(old) not in files.values():
+                os.remove(old)
+        self.version = version
+
+    @classmethod
+    def load(cls, path = STORE_PATH):
+        """This method loads the saved counts, new statistics are created if nothing is saved yet.
+
+        Args:
+            path (string, optional): Path of the files without extension. Defaults to "./Dataset/begriffe".
+
+        Returns:
+            statistics (TermStatistics): Term statistics
+        """
+
+        if not os.path.exists(path + ".json"):
+            return cls()
+
+        with open(path + ".json", "r", encoding = "utf-8") as file:
+            state = json.load(file)
+
+        # States of the first version without versioned files
+        directory, name = os.path.split(path)
+        files = state.get("files", {"term_counts": name + "_terme.npz", "kurzbericht_counts": name + "_kurzberichte.npz"})
+
+        statistics = cls(state["ngram_range"])
+        statistics.terms = {term: i for i, term in enumerate(state["terms"])}
+        statistics.kurzberichte = {kurzbericht: i for i, kurzbericht in enumerate(state["kurzberichte"])}
+        statistics.groups = {group: i for i, group in enumerate(state["groups"])}
+        statistics.operations = np.array(state["operations"], dtype = np.int64)
+        statistics.keys = set(state["keys"])
+        statistics.version = state.get("version", 0)
+        statistics.term_counts = sparse.load_npz(os.path.join(directory, files["term_counts"])).tocsr()
+        statistics.kurzbericht_counts = sparse.load_npz(os.path.join(directory, files["kurzbericht_counts"])).tocsr()
+
+        return statistics
+
+
+def update_term_stats(df, path = STORE_PATH):
+    """This function counts the new operations and saves the statistics. The first call counts the whole history.
+
+    Args:
+        df (pandas DataFrame): Data set or new operations
+        path (string, optional): Path of the files without extension. Defaults to "./Dataset/begriffe".
+
+    Returns:
+        statistics (TermStatistics): Updated term statistics
+    """
+
+    statistics = TermStatistics.load(path)
+    new = statistics.update(df)
+
+    if new > 0:
+        statistics.save(path)
+        logging.info("Kurzberichte counted: " + str(new))
+
+    return statistics
+
+
+if __name__ == "__main__":
+
+    # Same as "python main.py terms"
+    statistics = update_term_stats(pd.read_csv("./Dataset/einsätze_erweitert.csv"))
+    print(statistics.top_terms())
+    print(statistics.top_kurzberichte())
@@ -7,12 +7,47 @@
 
 
 import pandas as pd
+import numpy as np
 import unittest
+import json
+import os
+import tempfile
+import glob
+import subprocess
+import sys
+import io
+import importlib.util
+import unittest.mock
+from urllib.parse import urlsplit
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from bs4 import BeautifulSoup
 
 from selftest import Selftest
-from webscraping import create_empty_df, get_next_website, get_last_nr, webscraper
+from webscraping import create_empty_df, get_next_website, get_last_nr, webscraper, extract_last_page, extract_data
 from dataset import add_features, add_geodata_features
 from text_classification_ml import data_preprocessing
+from fixtures import generate_operations, create_row, FakeSession, FakeGeocoder
+from benchmark import run_benchmark, run_benchmarks
+from simulator import KfvSimulator, load_test
+from webscraping import get_all_data, reconcile, get_affected_pages, get_feed_url, get_page, get_retry_after
+from webscraping import get_last_page, PROXIES
+from repair import find_nr_gaps, get_offsets, repair_dataset, estimate_shift
+from blobstore import BlobStore, migrate_dataset
+from details import parse_detail, scrape_details, add_details, fetch_detail
+from ratelimit import RateBudget
+from fixtures import create_detail_page, FakeResponse
+from images import get_image_urls, harvest_images, create_thumbnails
+from query_service import QueryService, QueryError, create_server
+from anomaly import RollingMean, AnomalyDetector, update_anomalies
+from events import EventIndex, cluster_events, update_events
+from model_comparison import compute_features, compare_models, LEADERBOARD_COLUMNS
+from term_stats import TermStatistics, update_term_stats, normalize_kurzbericht
+from sources import Source, get_sources
+from webscraping import crawl_sources, load_sources_dataset
+from main import create_parser, main, EXIT_MISSING_INPUT
+import instrumentation
+from station_coverage import haversine_matrix, iter_distance_blocks, coverage_analysis
 
 
 class Test_webscraping(unittest.TestCase):
@@ -65,6 +100,110 @@ class Test_webscraping(unittest.TestCase):
         self.assertTrue(isinstance(nr, int))    # check if the nr is an integer
         self.assertEqual(nr, 1352)   # check if the nr is correct
 
+    def test_get_last_page(self):
+        """This method tests that get_last_page uses the given proxy and get_last_nr the given data set.
+        """
+
+        class ProxySession():
+            def __init__(self):
+                self.proxies = []
+
+            def get(self, url, **kwargs):
+                self.proxies.append(kwargs["proxies"])
+                return FakeResponse(example_pagination.encode())
+
+        session = ProxySession()
+        self.assertEqual(get_last_page("/seite", session, PROXIES[0]), 15670)
+        self.assertEqual(session.proxies, [PROXIES[0]])     # check if the proxy was passed through
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "einsätze_erweitert.csv")
+            pd.DataFrame({"Nr": [42, 41]}).to_csv(path, index=False)
+            self.assertEqual(get_last_nr(path), 42)
+
+    def test_extract_last_page(self):
+        """This method tests the extract_last_page function.
+        """
+
+        soup = BeautifulSoup(example_pagination, "html.parser")
+        last_number = extract_last_page(soup)
+
+        self.assertTrue(isinstance(last_number, int))   # check if the number is an integer
+        self.assertEqual(last_number, 15670)            # check if the number is correct
+
+    def test_extract_data(self):
+        """This method tests the extract_data function with a synthetic row.
+        """
+
+        df = generate_operations(1)
+        einsatz = BeautifulSoup("<table>" + create_row(df.iloc[0]) + "</table>", "html.parser").find("tr")
+        dict_einsatz = extract_data(einsatz)
+
+        # check if all values are extracted correctly
+        for column in ["Einsatztyp", "Einsatzort", "Link_einsatz", "Bild", "Kurzbericht", "Organisationen"]:
+            self.assertEqual(dict_einsatz[column], df[column].iloc[0])
+        self.assertEqual(str(dict_einsatz["Alarmierungszeit"]), df["Alarmierungszeit"].iloc[0])
+
+    def test_webscraper_offline(self):
+        """This method tests the webscraper function with a recorded session.
+        """
+
+        df_corpus = generate_operations(25)
+        df = webscraper(url_0, url_1, FakeSession(df_corpus))
+
+        self.assertEqual(df.shape, (10, 11))    # check if the shape is correct
+        self.assertEqual(df["Nr"].tolist(), df_corpus["Nr"].iloc[:10].tolist())    # check if the Nr are correct
+
+    def test_reconcile(self):
+        """This method tests the reconcile function with a feed which is shifted by one operation.
+        """
+
+        list_einsatz = [{"Nr": None, "Alarmierungszeit": i, "Link_einsatz": "/einsatzbericht/" + str(i)} for i in range(5)]
+        list_einsatz_feed = [{"Nr": 100 + i, "Alarmierungszeit": i, "Link_einsatz": "/einsatzbericht/" + str(i)}
+                             for i in range(1, 6)]
+        list_matched = reconcile(list_einsatz, list_einsatz_feed)
+
+        self.assertEqual([einsatz["Nr"] for einsatz in list_matched], [101, 102, 103, 104])   # first one has no match
+
+    def test_get_affected_pages(self):
+        """This method tests the get_affected_pages and get_feed_url functions.
+        """
+
+        df_check = pd.DataFrame({"URL": ["u0", "u1", "u2", "u3", "u4"], "Erste_Nr": [50, 40, 25, None, 10], 
+                                 "Letzte_Nr": [41, 31, 16, None, 1], "IO": [1, 1, 0, 0, 0]})
+
+        self.assertEqual(get_affected_pages(df_check), ["u1", "u2", "u3"])  # gap between u1 and u2, u3 failed
+        self.assertEqual(get_feed_url(url_0), url_1)
+
+    def test_get_page(self):
+        """This method tests the get_page and get_retry_after functions, only rate limits and server errors are retried.
+        """
+
+        class QueueSession():
+            def __init__(self, status_codes):
+                self.status_codes, self.calls = list(status_codes), 0
+
+            def get(self, url, **kwargs):
+                self.calls += 1
+                page = FakeResponse(b"page", self.status_codes.pop(0))
+                page.headers = {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"} if page.status_code == 429 else {}
+                return page
+
+        session = QueueSession([503, 429, 200])
+        self.assertEqual(get_page("/seite", session, {}, backoff=0).content, b"page")
+        self.assertEqual(session.calls, 3)          # check if server error and rate limit were retried
+
+        session = QueueSession([404, 200])
+        with self.assertRaises(Exception):
+            get_page("/seite", session, {}, backoff=0)
+        self.assertEqual(session.calls, 1)          # check if the client error was not retried
+
+        self.assertEqual(get_retry_after("2"), 2.0)                                  # seconds
+        self.assertEqual(get_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)     # HTTP date in the past
+        retry_date = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+        self.assertTrue(50 < get_retry_after(retry_date) <= 60)                     # HTTP date in the future
+        self.assertIsNone(get_retry_after("morgen"))                                 # invalid, backoff is used
+
     def test_webscraper(self):
         """This method tests the webscraper function.
         """
@@ -103,6 +242,17 @@ class Test_dataset(unittest.TestCase):
         self.assertEqual(df.shape, (1, 15))             # check if the shape is correct
 
 
+    def test_add_geodata_features_offline(self):
+        """This method tests the add_geodata_features function with a fake geocoder.
+        """
+
+        df = pd.DataFrame(data=[example_data], columns=example_columns)
+        df = add_geodata_features(df, FakeGeocoder(), 0)
+
+        self.assertEqual(df.shape, (1, 15))             # check if the shape is correct
+        self.assertTrue(df["Breitengrad"].notna().all())    # check if every Einsatzort has coordinates
+
+
 class Test_machine_learning(unittest.TestCase):
     """This class tests the functions of the text_classification_ml.py file.
 
@@ -123,6 +273,913 @@ class Test_machine_learning(unittest.TestCase):
         self.assertTrue(df["Kurzbericht"].str.islower().all() == True)  # check if all characters in colum Kurzbericht are lower case
 
 
+class Test_benchmark(unittest.TestCase):
+    """This class tests the functions of the benchmark.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_generate_operations(self):
+        """This method tests the generate_operations function.
+        """
+
+        df = generate_operations(1000)
+
+        self.assertEqual(df.shape, (1000, 11))      # check if the shape is correct
+        self.assertTrue(df["Nr"].is_monotonic_decreasing)   # check if the newest operation is first
+        self.assertTrue(pd.to_datetime(df["Alarmierungszeit"]).is_monotonic_decreasing)
+
+    def test_run_benchmark(self):
+        """This method tests the run_benchmark function.
+        """
+
+        result = run_benchmark("add_features", scale=100, pages=1, repeat=1)
+
+        self.assertEqual(result["rows"], 100)       # check if all rows were processed
+        self.assertTrue(result["seconds"] > 0)      # check if the time was measured
+
+    def test_run_benchmark_create_dataset(self):
+        """This method tests that every run of the create_dataset benchmark starts with a fresh folder.
+        """
+
+        list_directories, list_files = [], []
+
+        def create_dataset(*args):
+            list_directories.append(args[2])                    # folder is the third argument
+            list_files.append(sorted(os.listdir(args[2])))
+
+        with unittest.mock.patch("dataset.create_dataset", create_dataset):
+            result = run_benchmark("create_dataset", scale=10, pages=1, repeat=2)
+
+        self.assertEqual(result["rows"], 10)
+        self.assertEqual(len(set(list_directories)), 3)        # two timed runs and the traced run
+        self.assertEqual(list_files, [["einsätze.csv"]] * 3)   # check if no run sees the store of another
+
+    def test_run_benchmarks(self):
+        """This method tests the run_benchmarks function, the timings and counters of the caller must be kept.
+        """
+
+        instrumentation.reset()
+        instrumentation.count("pages", 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "benchmark.jsonl")
+            df_results = run_benchmarks(["add_features"], scale=100, pages=1, repeat=1, path=path)
+
+            with open(path, "r", encoding="utf-8") as file:
+                report = json.loads(file.readline())
+
+        self.assertEqual(df_results.loc["add_features", "rows"], 100)   # check if the result is returned
+        self.assertEqual(report["Counters"], {"add_features_rows": 100}) # check if only the benchmark is reported
+        self.assertIn("add_features_peak_kb", report["Gauges"])         # check if the memory is a gauge
+        self.assertEqual(instrumentation.get_report("test")["Counters"]["pages"], 3)   # check if nothing was reset
+
+
+class Test_simulator(unittest.TestCase):
+    """This class tests the functions of the simulator.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_load_test(self):
+        """This method tests the load_test function with errors and rate limits, which must be retried.
+        """
+
+        with KfvSimulator(generate_operations(100), error_rate=0.2, rate_limit=50) as simulator:
+            result = load_test(simulator, pages=5, workers=2)
+
+        self.assertEqual(result["failed"], 0)       # check if all pages were scraped
+        self.assertEqual(result["rows"], 50)        # check if all rows were scraped
+        self.assertTrue(result["errors"] > 0)       # check if errors were simulated
+
+    def test_get_all_data(self):
+        """This method tests the get_all_data function against the simulator, new operations arrive during the crawl.
+        """
+
+        with tempfile.TemporaryDirectory() as directory, KfvSimulator(generate_operations(50), shift_every=4) as simulator:
+            path, check_path = os.path.join(directory, "einsätze.csv"), os.path.join(directory, "check.csv")
+            success = get_all_data(simulator.url, simulator.url_feed, session=None, proxy={}, wait=(0, 0), path=path,
+                                   check_path=check_path)
+            df_check = pd.read_csv(check_path)
+            df = pd.read_csv(path)
+
+        self.assertTrue(success)                    # check if the crawl was successful
+        self.assertTrue(simulator.stats["new_operations"] > 0)     # check if new operations arrived
+        self.assertTrue((df_check["IO"] == 0).any())    # check if the shift was detected
+        self.assertFalse(df["Nr"].duplicated().any())   # check if the duplicates of the shift were removed
+        self.assertEqual(set(range(1, 51)) - set(df["Nr"]), set())  # check if no operation is missing
+
+
+class Test_repair(unittest.TestCase):
+    """This class tests the functions of the repair.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_find_nr_gaps(self):
+        """This method tests the find_nr_gaps and get_offsets functions.
+        """
+
+        df = generate_operations(100)
+        df = pd.concat([df.iloc[:10], df.iloc[30:], df.iloc[[50]]], ignore_index=True)
+        df_gaps, df_duplicates = find_nr_gaps(df)
+
+        self.assertEqual(df_gaps[["Von_Nr", "Bis_Nr", "Anzahl", "Position"]].values.tolist(), [[71, 90, 20, 9]])
+        self.assertEqual(df_duplicates["Nr"].tolist(), [50, 50])    # check if the duplicate was found
+        self.assertEqual(get_offsets(df_gaps).tolist(), [10, 20])   # positions 10 to 29
+        self.assertEqual(get_offsets(df_gaps, 5).tolist(), [10, 20, 30])  # shifted by new operations
+
+    def test_find_nr_gaps_start_of_year(self):
+        """This method tests missing operations at the start of a year, the Nr restarts with every year.
+        """
+
+        df = pd.DataFrame({"Nr": [3, 2, 1, 5, 4, 3],
+                           "Alarmierungszeit": ["2023-01-03 10:00:00", "2023-01-02 10:00:00", "2023-01-01 10:00:00",
+                                                "2022-12-31 10:00:00", "2022-12-30 10:00:00", "2022-12-29 10:00:00"]})
+        df_gaps, _ = find_nr_gaps(df.iloc[[0, 3, 4, 5]])     # Nr 1 and 2 of 2023 are missing
+
+        # the oldest year starts in the middle of the archive, Nr 1 and 2 of 2022 are no gap
+        self.assertEqual(df_gaps[["Jahr", "Von_Nr", "Bis_Nr", "Anzahl", "Position"]].values.tolist(), [[2023, 1, 2, 2, 0]])
+        self.assertEqual(get_offsets(df_gaps, page_size=2).tolist(), [0, 2])    # positions 1 and 2
+
+    def test_estimate_shift(self):
+        """This method tests that estimate_shift raises instead of returning a wrong shift.
+        """
+
+        df = generate_operations(30)
+
+        with KfvSimulator(df.iloc[5:]) as simulator:
+            self.assertEqual(estimate_shift(df.iloc[5:], simulator.url, simulator.url_feed, proxy={}), 0)
+            with self.assertRaises(RuntimeError):       # the newest stored operation is not in the archive
+                estimate_shift(df, simulator.url, simulator.url_feed, proxy={}, max_pages=3)
+
+        with KfvSimulator(df, error_rate=1.0) as simulator, unittest.mock.patch("webscraping.time.sleep"):
+            with self.assertRaises(RuntimeError):       # failed website
+                estimate_shift(df, simulator.url, simulator.url_feed, proxy={})
+
+    def test_repair_dataset(self):
+        """This method tests the repair_dataset function against the simulator, with new operations since the download.
+        """
+
+        df_corpus = generate_operations(205)
+
+        with tempfile.TemporaryDirectory() as directory, KfvSimulator(df_corpus) as simulator:
+            path = os.path.join(directory, "einsätze.csv")
+            # hole of 20 operations, 5 new operations since the download
+            df = pd.concat([df_corpus.iloc[5:105], df_corpus.iloc[125:]])
+            df.to_csv(path, index=False)
+
+            df_gaps = repair_dataset(path, "", simulator.url, proxy={}, wait=(0, 0))
+            df = pd.read_csv(path)
+
+        self.assertTrue(df_gaps.empty)                              # check if the hole was closed
+        self.assertEqual(sorted(df["Nr"]), list(range(1, 201)))     # check if no operation is missing or duplicated
+        self.assertTrue(simulator.stats["requests"] <= 8)           # check if only the affected websites were fetched
+
+
+class Test_blobstore(unittest.TestCase):
+    """This class tests the functions of the blobstore.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_blobstore(self):
+        """This method tests the append, get and get_column methods, also after reopening the store.
+        """
+
+        df = generate_operations(50, with_html=True)
+        df["Alarmierungszeit"] = df["Alarmierungszeit"].astype(str)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "einsätze_html")
+            with BlobStore(path) as store:
+                df_klein = store.append(df.iloc[10:])
+                store.append(df.iloc[:20])      # only the first 10 operations are new
+
+            with BlobStore(path) as store:
+                self.assertEqual(len(store), 50)     # check if every operation is stored once
+                self.assertEqual(store.get(df["Nr"].iloc[3]), df["Content"].iloc[3])    # check the newest with Nr
+                self.assertEqual(store.get(df["Nr"].iloc[30], "Text", df["Alarmierungszeit"].iloc[30]), df["Text"].iloc[30])
+                self.assertEqual(store.get_column(df).tolist(), df["Content"].tolist())
+
+        self.assertFalse("Content" in df_klein.columns)     # check if the HTML columns were removed
+
+    def test_blobstore_nr_per_year(self):
+        """This method tests a Nr of two years, get without Alarmierungszeit must return the newer one after reopening.
+        """
+
+        df = pd.DataFrame({"Nr": [7, 7], "Alarmierungszeit": ["2021-03-01 10:00:00", "2022-03-01 10:00:00"],
+                           "Content": ["alt", "neu"], "Text": ["alt", "neu"]})
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "einsätze_html")
+            with BlobStore(path) as store:
+                store.append(df.iloc[:1])       # the older operation is stored first
+                store.append(df.iloc[1:])
+                self.assertEqual(store.get(7), "neu")
+
+            with BlobStore(path) as store:
+                self.assertEqual(store.get(7), "neu")       # check if the newest operation is used after reopening
+                self.assertEqual(store.get(7, alarmierungszeit="2021-03-01 10:00:00"), "alt")
+
+    def test_migrate_dataset(self):
+        """This method tests the migrate_dataset function.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "einsätze_erweitert.csv")
+            generate_operations(50, with_html=True).to_csv(path, index=False)
+            size = os.path.getsize(path)
+
+            self.assertTrue(migrate_dataset(path, os.path.join(directory, "einsätze_html")))
+            self.assertFalse(migrate_dataset(path, os.path.join(directory, "einsätze_html")))   # already migrated
+            self.assertTrue(os.path.getsize(path) < size)   # check if the data set shrinks
+            self.assertEqual(len(BlobStore(os.path.join(directory, "einsätze_html"))), 50)
+
+
+class Test_details(unittest.TestCase):
+    """This class tests the functions of the details.py and ratelimit.py files.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_parse_detail(self):
+        """This method tests the parse_detail function.
+        """
+
+        einsatz = next(generate_operations(1).itertuples(index=False))
+        dict_detail = parse_detail(create_detail_page(einsatz))
+
+        self.assertTrue(dict_detail["Einsatzende"] > einsatz.Alarmierungszeit)    # check if the end is after the alarm
+        self.assertEqual(len(dict_detail["Fahrzeuge"].split(";")), len(einsatz.Organisationen.split(";")))
+        self.assertTrue(dict_detail["Einsatzbericht"].startswith(einsatz.Kurzbericht))
+
+    def test_scrape_details(self):
+        """This method tests the scrape_details and add_details functions, incremental runs and the page cache.
+        """
+
+        df = generate_operations(30)
+        session = FakeSession(df)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "einsätze_details.csv")
+            cache_dir = os.path.join(directory, "Details")
+
+            df_details = scrape_details(df, path, cache_dir, session=session, workers=4, rate=1000, limit=10)
+            self.assertEqual(df_details["Nr"].tolist(), list(range(30, 20, -1)))   # check if newest first
+
+            df_details = scrape_details(df, path, cache_dir, session=session, workers=4, rate=1000)
+            self.assertEqual(session.requests, 30)      # check if only missing operations were fetched
+
+            os.remove(path)
+            df_details = scrape_details(df, path, cache_dir, session=session, workers=4, rate=1000)
+            self.assertEqual(session.requests, 30)      # check if the cached pages were used
+
+        df = add_details(df, df_details)
+        self.assertFalse(df["Fahrzeuge"].isna().any())              # check if every operation got details
+        self.assertNotIn("Einsatzbericht", df.columns)              # the full report stays in the details file
+        self.assertTrue((df["Einsatzdauer_Minuten"] >= 10).all())   # check the duration
+
+    def test_fetch_detail_retry(self):
+        """This method tests that every attempt of fetch_detail takes a token of the budget, also the retries.
+        """
+
+        class CountingBudget(RateBudget):
+            def acquire(self):
+                self.tokens_taken = getattr(self, "tokens_taken", 0) + 1
+                super().acquire()
+
+        class FlakySession():
+            def __init__(self):
+                self.status_codes = [503, 200]
+
+            def get(self, url, **kwargs):
+                return FakeResponse(b"<html></html>", self.status_codes.pop(0))
+
+        budget = CountingBudget(rate=1000)
+        with unittest.mock.patch("webscraping.time.sleep"):
+            page = fetch_detail("/einsatzbericht/1", cache_dir=None, session=FlakySession(), proxy={}, budget=budget)
+
+        self.assertEqual(page, "<html></html>")
+        self.assertEqual(budget.tokens_taken, 2)    # check if the retry took its own token
+
+    def test_rate_budget(self):
+        """This method tests the RateBudget class with several threads.
+        """
+
+        from concurrent.futures import ThreadPoolExecutor
+        import time
+
+        budget = RateBudget(rate=50, burst=1)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: budget.acquire(), range(11)))
+
+        self.assertTrue(time.perf_counter() - start >= 0.19)   # 10 tokens after the first at 50 per second
+
+
+class Test_images(unittest.TestCase):
+    """This class tests the functions of the images.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_get_image_urls(self):
+        """This method tests the get_image_urls function with and without the HTML code.
+        """
+
+        df = generate_operations(100, with_html=True)
+        df_urls = get_image_urls(df)
+        df_urls_ohne = get_image_urls(df.drop(columns=["Content", "Text"]))
+
+        self.assertEqual(len(df_urls), (df["Bild"] != "nopic.png").sum())      # check if nopic.png is skipped
+        self.assertEqual(df_urls["URL"].tolist(), df_urls_ohne["URL"].tolist())
+        self.assertTrue(df_urls["URL"].iloc[0].startswith("https://www.kfv-schweinfurt.de/images/einsatzbilder/2022/"))
+
+        source = Source("kfv-a", "https://kfv-a.de", images_path="/bilder/")
+        df_urls = get_image_urls(df.drop(columns=["Content", "Text"]), source=source)
+        self.assertTrue(df_urls["URL"].iloc[0].startswith("https://kfv-a.de/bilder/einsatzbilder/2022/"))  # other source
+
+    def test_harvest_images(self):
+        """This method tests the harvest_images function, deduplication and incremental runs.
+        """
+
+        df = generate_operations(200)
+        session = FakeSession(df)
+        anzahl = (df["Bild"] != "nopic.png").sum()
+
+        with tempfile.TemporaryDirectory() as directory:
+            manifest_path = os.path.join(directory, "bilder.csv")
+            harvest_images(df.iloc[50:], directory, manifest_path, session=session, rate=1000, thumbnails=False)
+            df_manifest = harvest_images(df, directory, manifest_path, session=session, rate=1000, thumbnails=False)
+            dateien = [datei for datei in os.listdir(directory) if not datei.endswith(".csv")]
+
+        self.assertEqual(session.requests, anzahl)              # check if every image was downloaded once
+        self.assertEqual(len(df_manifest), anzahl)
+        self.assertEqual(len(dateien), df_manifest["Sha256"].nunique())    # check if equal content is stored once
+        self.assertTrue(df_manifest["Sha256"].nunique() < anzahl)
+
+    @unittest.skipUnless(importlib.util.find_spec("PIL") is not None, "Pillow is not installed")
+    def test_create_thumbnails(self):
+        """This method tests the thumbnails of a PNG image in the process pool, a broken image must be skipped.
+        """
+
+        from PIL import Image
+
+        png = io.BytesIO()
+        Image.new("RGB", (600, 400), (200, 30, 30)).save(png, "PNG")
+        df = generate_operations(2).assign(Bild = ["bild.png", "kaputt.png"])
+
+        class PngSession():
+            def get(self, url, **_kwargs):
+                return FakeResponse(png.getvalue() if url.endswith("/bild.png") else b"no image")
+
+        with tempfile.TemporaryDirectory() as directory:
+            manifest_path = os.path.join(directory, "bilder.csv")
+            df_manifest = harvest_images(df, directory, manifest_path, session=PngSession(), rate=1000, thumbnails=True)
+
+            with Image.open(os.path.join(directory, "Thumbnails", "bild.jpg")) as thumbnail:
+                self.assertEqual(thumbnail.size[0], 256)    # check if the thumbnail was scaled down
+                self.assertTrue(170 <= thumbnail.size[1] <= 171)   # and keeps the aspect ratio
+            self.assertFalse(os.path.exists(os.path.join(directory, "Thumbnails", "kaputt.jpg")))
+            self.assertEqual(sorted(pd.read_csv(manifest_path)["Bild"]), ["bild.png", "kaputt.png"])
+            self.assertEqual(len(df_manifest), 2)
+
+            # Without Pillow the images are kept and no thumbnails are created
+            with unittest.mock.patch.dict(sys.modules, {"PIL.Image": None}):
+                self.assertEqual(create_thumbnails(df_manifest, os.path.join(directory, "ohne")), 0)
+
+
+class Test_query_service(unittest.TestCase):
+    """This class tests the functions of the query_service.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_query_service(self):
+        """This method tests the rollups, the cache and the reload after the data set has changed.
+        """
+
+        df = generate_operations(300)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "einsätze_erweitert.csv")
+            df.iloc[100:].to_csv(path, index=False)
+            service = QueryService(path)
+
+            result = service.count_by(["Einsatzort"])
+            self.assertEqual(sum(row[-1] for row in result["rows"]), 200)
+            service.count_by(["Einsatzort"])
+            self.assertEqual(service.stats["hits"], 1)      # check if the second query was cached
+
+            # Organisationen are counted per organisation, every operation has the local fire brigade
+            result = service.count_by(["Organisation"], {"Jahr": "2022"}, limit=1)
+            self.assertEqual(result["columns"], ["Organisation", "Anzahl"])
+
+            df.to_csv(path, index=False)    # like extend_dataset
+            result = service.count_by(["Einsatzort"])
+            self.assertEqual(sum(row[-1] for row in result["rows"]), 300)   # check if the cache was invalidated
+
+            status, result = service.handle("GET", "/sql?q=SELECT COUNT(*) FROM einsaetze WHERE Jahr = 2022")
+            self.assertEqual(status, 200)
+            self.assertEqual(result["rows"][0][0], (pd.to_datetime(df["Alarmierungszeit"]).dt.year == 2022).sum())
+
+            self.assertEqual(service.handle("GET", "/sql?q=DELETE FROM einsaetze")[0], 400)    # read-only
+            self.assertEqual(service.handle("GET", "/count?by=Unbekannt")[0], 400)
+
+            # A query without end is aborted after the timeout, the service stays usable
+            service.timeout = 0.2
+            endless = "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) SELECT COUNT(*) FROM n"
+            with self.assertRaisesRegex(QueryError, "aborted"):
+                service.query(endless)
+            self.assertEqual(service.query("SELECT COUNT(*) FROM einsaetze")["rows"], [[300]])
+
+    def test_broken_dataset(self):
+        """This method tests a data set which is half-written or missing, the service must keep answering with JSON.
+        """
+
+        df = generate_operations(100)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "einsätze_erweitert.csv")
+            df.to_csv(path, index=False)
+            service = QueryService(path)
+            self.assertEqual(service.handle("GET", "/health")[1]["rows"], 100)
+
+            with open(path, "r+", encoding="utf-8") as file:    # like an interrupted to_csv
+                file.truncate(25)
+            status, result = service.handle("GET", "/sql?q=SELECT COUNT(*) FROM einsaetze")
+            self.assertEqual(status, 200)
+            self.assertEqual(result["rows"], [[100]])       # check if the previous data set is kept
+            self.assertIsNotNone(service.handle("GET", "/health")[1]["error"])
+
+            df.to_csv(path, index=False)
+            self.assertIsNone(service.handle("GET", "/health")[1]["error"])     # check if the file is loaded again
+
+            service = QueryService(os.path.join(directory, "fehlt.csv"))   # no crash at startup
+            status, result = service.handle("GET", "/einsatzorte")
+
+        self.assertEqual(status, 503)
+        self.assertIn("error", result)
+
+    def test_create_server(self):
+        """This method tests the HTTP API.
+        """
+
+        import threading
+        import urllib.request
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "einsätze_erweitert.csv")
+            generate_operations(100).to_csv(path, index=False)
+            server = create_server(QueryService(path), 0)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+
+            try:
+                url = "http://127.0.0.1:" + str(server.server_address[1])
+                with urllib.request.urlopen(url + "/einsatztypen") as response:
+                    result = json.loads(response.read())
+            finally:
+                server.shutdown()
+                server.server_close()
+
+        self.assertEqual(result["columns"], ["Einsatztyp", "Anzahl"])
+        self.assertEqual(sum(row[1] for row in result["rows"]), 100)
+
+
+class Test_anomaly(unittest.TestCase):
+    """This class tests the functions of the anomaly.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_rolling_mean(self):
+        """This method tests the RollingMean class.
+        """
+
+        rolling = RollingMean(3)
+        for value in [1, 2, 3, 4, 5]:
+            rolling.add(value)
+
+        self.assertEqual(rolling.mean, 4)    # mean of 3, 4 and 5
+
+    def test_update_anomalies(self):
+        """This method tests the incremental update, a surge day must be flagged and old rows must be ignored.
+        """
+
+        df = generate_operations(2000)
+        df_surge = generate_operations(60, seed=3)
+        df_surge["Nr"] += 10000
+        df_surge["Alarmierungszeit"] = pd.date_range("2022-12-31 10:00", periods=60, freq="min").astype(str)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "anomalie_status.json")
+            update_anomalies(df.iloc[100:], path)
+            detector = AnomalyDetector.load(path)
+            days = detector.series["Gesamt"].days
+            df_events = update_anomalies(pd.concat([df_surge, df]), path)      # whole data set with the new rows
+            detector = AnomalyDetector.load(path)
+
+        gesamt = df_events[df_events["Serie"] == "Gesamt"]
+        self.assertEqual(gesamt["Datum"].tolist(), ["2022-12-31"])     # check if the surge was flagged
+        self.assertTrue(gesamt["Anzahl"].iloc[0] >= 60)
+        neue_tage = (pd.Timestamp("2022-12-31") - pd.Timestamp(df["Alarmierungszeit"].iloc[100][:10])).days
+        self.assertEqual(detector.series["Gesamt"].days - days, neue_tage)     # check if only the new days were added
+
+
+class Test_events(unittest.TestCase):
+    """This class tests the functions of the events.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def create_storm(self, start, nr, längengrad = 10.2, n = 12):
+        """This method creates n operations within 2 hours and 2 km.
+        """
+
+        return pd.DataFrame({"Nr": np.arange(nr, nr + n),
+                             "Alarmierungszeit": pd.date_range(start, periods = n, freq = "10min").astype(str),
+                             "Längengrad": längengrad + np.linspace(0, 0.02, n),
+                             "Breitengrad": 50.0 + np.linspace(0, 0.01, n), "Einsatztyp": "Technische Hilfe"})
+
+    def test_cluster_events(self):
+        """This method tests the clustering of the whole archive, the storm must be one event and scattered
+           operations must be noise.
+        """
+
+        df = generate_operations(2000)
+        df["Längengrad"] = 9.95 + np.arange(2000) % 50 * 0.2     # at least 14 km apart
+        df["Breitengrad"] = 50.0
+        df_storm = self.create_storm("2023-06-01 18:00", 10000)
+
+        df_assigned, df_events = cluster_events(pd.concat([df, df_storm]))
+
+        self.assertEqual(len(df_events), 1)
+        self.assertEqual(df_events["Anzahl"].iloc[0], 12)
+        self.assertEqual(df_assigned.loc[df_assigned["Nr"] >= 10000, "Event_ID"].unique().tolist(), [0])
+        self.assertTrue((df_assigned.loc[df_assigned["Nr"] < 10000, "Event_ID"] == -1).all())
+
+    def test_update_events(self):
+        """This method tests the incremental assignment: new operations join the open event, a later storm gets a
+           new ID and a storm connecting two events merges them into the smaller ID.
+        """
+
+        df_storm = self.create_storm("2023-06-01 18:00", 10000)
+        df_later = self.create_storm("2023-06-02 18:00", 20000, n = 6)
+        df_other = self.create_storm("2023-06-02 18:00", 30000, längengrad = 10.4, n = 6)
+        df_bridge = self.create_storm("2023-06-02 19:00", 40000, längengrad = 10.3, n = 6)
+        df_bridge["Längengrad"] = np.linspace(10.22, 10.4, 6)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "ereignisse_status.json")
+            assignments_path = os.path.join(directory, "ereignisse_einsätze.csv")
+            update_events(df_storm.iloc[:8], path, assignments_path)
+            df_assigned = update_events(df_storm, path, assignments_path)     # whole data set with the new rows
+            self.assertEqual(len(df_assigned), 4)
+            self.assertEqual(df_assigned["Event_ID"].unique().tolist(), [0])     # check if they joined the event
+
+            df_assigned = update_events(pd.concat([df_later, df_other]), path, assignments_path)
+            self.assertEqual(sorted(df_assigned["Event_ID"].unique().tolist()), [1, 2])     # check the new IDs
+
+            df_assigned = update_events(df_bridge, path, assignments_path)
+            df_events = EventIndex.load(path).get_events()
+            df_assignments = pd.read_csv(assignments_path)
+
+        self.assertEqual(df_assigned["Event_ID"].unique().tolist(), [1])
+        self.assertEqual(df_events["Event_ID"].tolist(), [1, 0])     # check if event 2 was merged into event 1
+        self.assertEqual(df_events["Anzahl"].tolist(), [18, 12])
+        # check if every operation keeps its Event_ID, also the operations of the merged event
+        self.assertEqual(df_assignments.groupby("Event_ID").size().to_dict(), {0: 12, 1: 18})
+
+    def test_add_one_by_one(self):
+        """This method tests that a slow chain of operations forms the same event one at a time as in the batch
+           clustering, and that the earlier operations are reported with the Event_ID later.
+        """
+
+        df = pd.DataFrame({"Nr": np.arange(1, 9),
+                           "Alarmierungszeit": pd.date_range("2023-06-01 00:00", periods = 8, freq = "150min").astype(str),
+                           "Längengrad": 10.2, "Breitengrad": 50.0, "Einsatztyp": "Technische Hilfe"})
+
+        df_batch, df_events_batch = cluster_events(df)
+
+        index = EventIndex()
+        list_assigned = [index.add(df.iloc[[i]]) for i in range(len(df))]
+        df_events = index.get_events()
+
+        self.assertEqual(df_events_batch["Anzahl"].tolist(), [8])
+        pd.testing.assert_frame_equal(df_events, df_events_batch)   # check if both ways give the same events
+        self.assertEqual(len(list_assigned[4]), 5)      # check if the earlier operations got the Event_ID too
+        self.assertTrue((df_batch["Event_ID"] == 0).all())
+
+
+class Test_model_comparison(unittest.TestCase):
+    """This class tests the functions of the model_comparison.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_compare_models(self):
+        """This method tests the cached features and the leaderboard, a model without time budget must stop early.
+        """
+
+        df = data_preprocessing(generate_operations(1000), ["Technische Hilfe", "Brand"])
+        x, y = df["Kurzbericht"], df["Einsatztyp"].to_numpy()
+
+        with tempfile.TemporaryDirectory() as directory:
+            fold_paths = compute_features(x, y, 3, cache_dir = directory)
+            modified = os.path.getmtime(os.path.join(fold_paths[0], "X_train.npz"))
+            df_leaderboard = compare_models(x, y, ["MultinomialNB", "Ridge"], 3, workers = 2, cache_dir = directory,
+                                            path = os.path.join(directory, "leaderboard.csv"))
+            self.assertEqual(os.path.getmtime(os.path.join(fold_paths[0], "X_train.npz")), modified)   # cache reused
+            self.assertTrue(os.path.exists(os.path.join(directory, "leaderboard.csv")))
+
+            df_timeout = compare_models(x, y, ["LinearSVC"], 3, time_budget = -1, workers = 1, cache_dir = directory,
+                                        path = None)
+
+            # A broken cache lets the models fail in their processes
+            os.remove(os.path.join(fold_paths[0], "X_train.npz"))
+            df_error = compare_models(x, y, ["MultinomialNB", "Ridge"], 3, workers = 2, cache_dir = directory, path = None)
+
+        self.assertEqual(df_leaderboard.columns.tolist(), LEADERBOARD_COLUMNS)
+        self.assertEqual(df_leaderboard["Folds"].tolist(), [3, 3])
+        self.assertTrue(df_leaderboard["Accuracy"].is_monotonic_decreasing)     # check if the best model is first
+        self.assertTrue((df_leaderboard["Predict_ms"] > 0).all())
+        self.assertEqual(df_timeout["Status"].tolist(), ["timeout"])
+        self.assertEqual(df_error["Status"].tolist(), ["error: FileNotFoundError"] * 2)   # check if every model is listed
+        self.assertTrue(df_error["Accuracy"].isna().all())
+        with self.assertRaises(ValueError):
+            compare_models(x, y, ["GPT"])
+
+
+class Test_term_stats(unittest.TestCase):
+    """This class tests the functions of the term_stats.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_update_term_stats(self):
+        """This method tests the incremental counting, it must give the same result as counting everything at once.
+        """
+
+        df = generate_operations(3000)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "begriffe")
+            update_term_stats(df.iloc[500:], path)
+            statistics = update_term_stats(df, path)     # whole data set with the new rows
+            statistics = TermStatistics.load(path)
+
+        kurzberichte = normalize_kurzbericht(df["Kurzbericht"]).value_counts()
+        top = statistics.top_kurzberichte(50)
+        self.assertEqual(top.to_dict(), kurzberichte[kurzberichte > 50].to_dict())     # same as the analysis
+        self.assertEqual(statistics.operations.sum(), 3 * len(df))      # every operation in 3 groups
+
+        brand = df[df["Einsatztyp"] == "Brand"]
+        self.assertEqual(statistics.top_terms(1, "Einsatztyp", "Brand").to_dict(),
+                         {"brand": normalize_kurzbericht(brand["Kurzbericht"]).str.contains(r"\bbrand\b").sum()})
+        self.assertEqual(max(statistics.wordcloud_weights(10).values()), 1.0)
+
+        df_trend = statistics.trend(["brand"])
+        jahre = pd.to_datetime(df["Alarmierungszeit"]).dt.year
+        self.assertEqual(df_trend.index.tolist(), sorted(jahre.unique()))
+        self.assertEqual(df_trend["brand"].sum(), statistics.top_terms(1).iloc[0])
+
+    def test_interrupted_save(self):
+        """This method tests a save which is interrupted after the matrices, the previous state must stay complete.
+        """
+
+        df = generate_operations(500)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "begriffe")
+            update_term_stats(df.iloc[200:], path)
+
+            statistics = TermStatistics.load(path)
+            statistics.update(df)
+            with unittest.mock.patch("term_stats.json.dump", side_effect=OSError("disk full")):
+                with self.assertRaises(OSError):
+                    statistics.save(path)
+
+            statistics = TermStatistics.load(path)
+            self.assertEqual(statistics.operations.sum(), 3 * 300)     # check if the previous state was loaded
+            self.assertEqual(statistics.term_counts.shape[1], len(statistics.terms))
+
+            update_term_stats(df, path)     # the new operations are counted once
+            self.assertEqual(TermStatistics.load(path).operations.sum(), 3 * 500)
+            self.assertEqual(len(glob.glob(path + "_*.npz")), 2)     # check if older versions were removed
+
+
+class Test_sources(unittest.TestCase):
+    """This class tests the functions of the sources.py file and the scraping of several sources.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_get_sources(self):
+        """This method tests the sources of the configuration file.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sources.json")
+            with open(path, "w", encoding = "utf-8") as file:
+                json.dump([{"name": "kfv-test", "base_url": "https://kfv-test.de/", "page_size": 20}], file)
+            sources = get_sources(path)
+
+        self.assertEqual(list(sources), ["kfv-schweinfurt", "kfv-test"])
+        self.assertEqual(sources["kfv-test"].url, "https://kfv-test.de/index.php/einsaetze/einsatzarchiv?start=0")
+        self.assertEqual(sources["kfv-test"].images_url, "https://kfv-test.de/images/")
+        self.assertEqual(get_next_website(sources["kfv-test"].url, sources["kfv-test"].page_size)[1], 20)
+
+    def test_parse_row(self):
+        """This method tests a source with a different layout, every value is one line further down.
+        """
+
+        df = generate_operations(1)
+        row = create_row(df.iloc[0]).replace('<tr class="row">', '<tr class="row">\nNeu', 1)
+        einsatz = BeautifulSoup("<table>" + row + "</table>", "html.parser").find("tr")
+        source = Source("kfv-neu", "https://www.kfv-schweinfurt.de",
+                        lines = {"Alarmierungszeit": 3, "Einsatztyp": 7, "Einsatzort": 10, "Kurzbericht": 24})
+        dict_einsatz = extract_data(einsatz, source)
+
+        for column in ["Einsatztyp", "Einsatzort", "Kurzbericht"]:
+            self.assertEqual(dict_einsatz[column], df[column].iloc[0])
+        self.assertEqual(str(dict_einsatz["Alarmierungszeit"]), df["Alarmierungszeit"].iloc[0])
+
+    def test_crawl_sources(self):
+        """This method tests the concurrent scraping of two websites into one partitioned data set.
+        """
+
+        sources = [Source("kfv-a", "https://kfv-a.de", rate = 100), Source("kfv-b", "https://kfv-b.de", rate = 100)]
+        sessions = {"kfv-a.de": FakeSession(generate_operations(25), base_url = "https://kfv-a.de"),
+                    "kfv-b.de": FakeSession(generate_operations(12, seed = 3), base_url = "https://kfv-b.de")}
+
+        class Router():
+            def get(self, url, **kwargs):
+                return sessions[urlsplit(url).hostname].get(url, **kwargs)
+
+        with tempfile.TemporaryDirectory() as directory:
+            results = crawl_sources(sources, directory, Router(), {})
+            df = load_sources_dataset(directory)
+            df_partition = pd.read_csv(os.path.join(directory, "Quelle=kfv-b", "einsätze.csv"))
+
+        self.assertEqual(results, {"kfv-a": True, "kfv-b": True})
+        self.assertEqual(df["Quelle"].value_counts().to_dict(), {"kfv-a": 25, "kfv-b": 12})
+        self.assertEqual(df.columns[0], "Quelle")
+        self.assertEqual(df_partition["Quelle"].unique().tolist(), ["kfv-b"])  # check if the partition has its Quelle
+        self.assertTrue(df["Alarmierungszeit"].is_monotonic_decreasing)     # check if the newest operation is first
+
+
+class Test_main(unittest.TestCase):
+    """This class tests the functions of the main.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_create_parser(self):
+        """This method tests the create_parser function.
+        """
+
+        args = create_parser().parse_args(["scrape", "all", "--last-page", "20"])
+
+        self.assertEqual(args.command, "scrape")
+        self.assertEqual(args.mode, "all")
+        self.assertEqual(args.last_page, 20)
+
+        # wrong arguments end with exit code 2
+        with self.assertRaises(SystemExit) as context:
+            create_parser().parse_args(["scrape", "everything"])
+        self.assertEqual(context.exception.code, 2)
+
+    def test_main(self):
+        """This method tests the main function.
+        """
+
+        # missing model file
+        with tempfile.TemporaryDirectory() as directory:
+            report = os.path.join(directory, "run_report.jsonl")
+            exit_code = main(["--report", report, "ml", "predict", "Wohnung öffnen akut", 
+                              "--model", "./Models/does_not_exist.joblib"])
+
+            self.assertEqual(exit_code, EXIT_MISSING_INPUT)
+            self.assertTrue(os.path.exists(report))     # check if the run report was written
+
+    def test_lazy_imports(self):
+        """This method tests that --help does not import the heavy modules.
+        """
+
+        code = "import sys, main\ntry:\n    main.main(['--help'])\nexcept SystemExit:\n    pass\nprint('pandas' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True).stdout
+
+        self.assertEqual(output.strip().split("\n")[-1], "False")
+
+
+class Test_instrumentation(unittest.TestCase):
+    """This class tests the functions of the instrumentation.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_timer_and_count(self):
+        """This method tests the timer, timed and count functions.
+        """
+
+        instrumentation.reset()
+
+        with instrumentation.timer("stage"):
+            instrumentation.count("rows", 5)
+
+        instrumentation.timed("stage")(lambda: None)()
+        instrumentation.gauge("rows_per_second", 10.0)
+        instrumentation.gauge("rows_per_second", 20.0)
+        report = instrumentation.get_report("test")
+
+        self.assertEqual(report["Stages"]["stage"]["calls"], 2)     # check if both calls were recorded
+        self.assertEqual(report["Counters"]["rows"], 5)             # check if the counter is correct
+        self.assertEqual(report["Gauges"]["rows_per_second"], 20.0) # check if the gauge was replaced
+
+    def test_write_report(self):
+        """This method tests the write_report function.
+        """
+
+        instrumentation.reset()
+        instrumentation.count("pages", 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run_report.jsonl")
+            instrumentation.write_report(path, "test")
+            instrumentation.write_report(path, "test")
+
+            with open(path, "r", encoding="utf-8") as file:
+                lines = file.readlines()
+
+            self.assertEqual(len(lines), 2)     # check if the reports are appended
+            self.assertEqual(json.loads(lines[-1])["Counters"]["pages"], 3)
+
+            path = os.path.join(directory, "run_report.prom")
+            instrumentation.write_report(path, "test", "prometheus")
+
+            with open(path, "r", encoding="utf-8") as file:
+                self.assertIn('pipeline_counter_total{run="test",counter="pages"} 3', file.read())
+
+
+class Test_station_coverage(unittest.TestCase):
+    """This class tests the functions of the station_coverage.py file.
+
+    Args:
+        unittest (unittest TestCase): Unittest TestCase
+    """
+
+    def test_haversine_matrix(self):
+        """This method tests the haversine_matrix function.
+        """
+
+        distances = haversine_matrix([50.0, 51.0], [10.0, 10.0], [50.0, 50.0, 51.0], [10.0, 11.0, 10.0])
+
+        self.assertEqual(distances.shape, (2, 3))   # check if the shape is correct
+        self.assertAlmostEqual(distances[0, 0], 0.0)
+        self.assertAlmostEqual(distances[0, 2], 111.2, places = 1)    # one degree latitude
+        self.assertAlmostEqual(distances[1, 0], distances[0, 2])
+
+    def test_iter_distance_blocks(self):
+        """This method tests the iter_distance_blocks function.
+        """
+
+        lat_b, lon_b = np.linspace(49.9, 50.2, 25), np.linspace(10.0, 10.5, 25)
+        distances = haversine_matrix([50.0, 50.1], [10.1, 10.2], lat_b, lon_b)
+        blocks = np.hstack([block for _, _, block in iter_distance_blocks([50.0, 50.1], [10.1, 10.2], lat_b, lon_b, 7)])
+
+        self.assertTrue(np.allclose(distances, blocks))  # check if the blocks are equal to the full matrix
+
+    def test_coverage_analysis(self):
+        """This method tests the coverage_analysis function.
+        """
+
+        df = pd.DataFrame(data=example_data_coverage, columns=["Einsatzort", "Organisationen", "Breitengrad", "Längengrad"])
+        df, df_stationen = coverage_analysis(df, radius_km=5.0, block_size=1)
+
+        self.assertEqual(df["Nächste_Organisation"].tolist(), ["FF Gochsheim", "FF Röthlein", "FF Gochsheim"])
+        self.assertEqual(df["Anzahl_Organisationen_über_Radius"].tolist(), [0, 1, 0])
+        self.assertEqual(df_stationen.set_index("Organisation")["Anzahl_Einsätze"].to_dict(), 
+                         {"FF Gochsheim": 3, "FF Röthlein": 1, "FL Schweinfurt-Land 1": 1})
+        self.assertEqual(df_stationen.set_index("Organisation")["Einsätze_über_Radius"].to_dict(), 
+                         {"FF Gochsheim": 1, "FF Röthlein": 0, "FL Schweinfurt-Land 1": 0})
+
+
 if __name__ == "__main__":
 
     url_0 = "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?start=0"
@@ -135,6 +1192,11 @@ if __name__ == "__main__":
     example_columns = ["Nr", "Alarmierungszeit", "Wochentag", "Einsatztyp", "Einsatzort", "Link_einsatz", 
                        "Bild", "Kurzbericht", "Organisationen", "Content", "Text"]
     classes = ["Technische Hilfe", "Brand"]
+    example_pagination = '''<ul class="pagination"><li><a href="/index.php/einsaetze/einsatzarchiv?start=10">2</a></li>
+                            <li><a title="Ende" href="/index.php/einsaetze/einsatzarchiv?start=15670">Ende</a></li></ul>'''
+    example_data_coverage = [["Gochsheim", "FF Gochsheim", 50.019, 10.281],
+                             ["Röthlein", "FF Röthlein;FF Gochsheim;FL Schweinfurt-Land 1", 49.982, 10.218],
+                             ["Gochsheim", "FF Gochsheim", 50.019, 10.281]]
 
     Selftest()
     unittest.main()
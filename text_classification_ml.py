@@ -15,6 +15,11 @@ from sklearn.model_selection import train_test_split, GridSearchCV, RepeatedStra
 from sklearn.linear_model import PassiveAggressiveClassifier
 from sklearn import metrics
 from sklearn.pipeline import Pipeline
+import joblib
+import os
+
+from instrumentation import timer, count
+from blobstore import COLUMNS as HTML_COLUMNS, TEXT_COLUMNS as DETAIL_TEXT_COLUMNS
 
 
 def data_preprocessing(df, classes):
@@ -89,7 +94,11 @@ def prepare_data_ml(classes):
     """
 
     # Read data
-    df = pd.read_csv("./Dataset/einsätze_erweitert.csv")
+    # The HTML columns and the Einsatzbericht are not needed, also if a data set still contains them
+    with timer("csv_read"):
+        df = pd.read_csv("./Dataset/einsätze_erweitert.csv",
+                         usecols = lambda column: column not in HTML_COLUMNS + DETAIL_TEXT_COLUMNS)
+    count("rows", len(df))
 
     # Interpret Organisationen_Liste column as a list
     df["Organisationen_Liste"] = df["Organisationen"].apply(lambda x: str(x).split(";"))
@@ -182,6 +191,53 @@ def grid_search_text_clf(x, y):
     return search.best_params_
 
 
+def train_model(classes, path = "./Models/text_clf.joblib"):
+    """This function trains the text classifier on all equally distributed data and saves it.
+
+    Args:
+        classes (list): Einsatztypen, to be used
+        path (string, optional): File where the model is saved. Defaults to "./Models/text_clf.joblib".
+
+    Returns:
+        text_clf (sklearn Pipeline): Trained text classifier
+    """
+
+    df_reduced, _ = prepare_data_ml(classes)
+
+    text_clf = Pipeline([("vect", CountVectorizer()),
+                         ("tfidf", TfidfTransformer()),
+                         ("clf", PassiveAggressiveClassifier())])
+    with timer("model_fit"):
+        text_clf.fit(df_reduced["Kurzbericht"], np.array(df_reduced["Einsatztyp"]))
+
+    # Save the model together with the classes, so that predictions can be decoded
+    os.makedirs(os.path.dirname(path), exist_ok = True)
+    joblib.dump({"model": text_clf, "classes": classes}, path)
+
+    return text_clf
+
+
+def predict_einsatztyp(kurzberichte, path = "./Models/text_clf.joblib"):
+    """This function predicts the Einsatztyp of Kurzberichte with a saved text classifier.
+
+    Args:
+        kurzberichte (list): Kurzberichte as strings
+        path (string, optional): File where the model is saved. Defaults to "./Models/text_clf.joblib".
+
+    Returns:
+        einsatztypen (list): Predicted Einsatztypen
+    """
+
+    saved = joblib.load(path)
+
+    # Same preprocessing as for the training data
+    df = pd.DataFrame({"Kurzbericht": kurzberichte, "Einsatztyp": saved["classes"][0]})
+    df = data_preprocessing(df, saved["classes"])
+    predicted = saved["model"].predict(df["Kurzbericht"])
+
+    return [saved["classes"][i] for i in predicted]
+
+
 if __name__ == "__main__":
     
     # List of classes to be used
@@ -203,7 +259,8 @@ if __name__ == "__main__":
                          ("clf", PassiveAggressiveClassifier())])
 
     # Train the classifier
-    text_clf.fit(X_train, y_train)
+    with timer("model_fit"):
+        text_clf.fit(X_train, y_train)
 
     # Predict the test data and print the classification report
     predicted = text_clf.predict(X_test)
@@ -11,14 +11,29 @@ import pandas as pd
 import numpy as np
 import requests
 from bs4 import BeautifulSoup
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import time
 from furl import furl
+import glob
 import logging
+import os
 import pytz
+import sys
+
+from instrumentation import timer, timed, count
+from ratelimit import RateBudget, RateLimitedSession
+from sources import KFV_SCHWEINFURT
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(process)d - %(funcName)s - %(levelname)s - %(message)s')
 
+# https://hidemy.name/de/proxy-list/
+# Use a proxy to avoid getting blocked
+PROXIES = [{"http": "http://161.35.39.82:3128"},    # United Kingdom London, HTTPS, hoch
+           {"http": "http://169.55.89.6:80"}]       # United States, Ashburn, HTTPS, hoch
+SOURCES_DIR = "./Dataset/Quellen"
+
 
 def create_empty_df():
     """This function creates two empty DataFrames. One for the scraped data and one for the check data.
@@ -35,11 +50,12 @@ def create_empty_df():
     return df_gesamt, df_check
 
 
-def get_next_website(old_url):
-    """This function creates a new URL from an old one by adding 10.
+def get_next_website(old_url, page_size = 10):
+    """This function creates a new URL from an old one by adding the page size.
 
     Args:
         old_url (string): Old URL; e.g. "https://www.kfv-schweinfurt.de/index.php/einsaetze?start=0"
+        page_size (integer, optional): Operations per page. Defaults to 10.
 
     Returns:
         url (string): New URL
@@ -47,83 +63,166 @@ def get_next_website(old_url):
     """
 
     url = furl(old_url)
-    url.args["start"] = int(url.args["start"]) + 10
+    url.args["start"] = int(url.args["start"]) + page_size
     new_number = int(url.args["start"])
 
     return url.url, new_number
 
 
-def get_last_nr():
+def extract_last_page(soup):
+    """This function determines the number of the last archive page from the pagination.
+
+    Args:
+        soup (BeautifulSoup): Parsed HTML code of an archive page
+
+    Returns:
+        last_number (integer): Number of the last website, e.g. 15670 for "?start=15670"
+    """
+
+    last_number = 0
+
+    # All pagination links contain the start parameter, the highest one is the last page
+    for link in soup.find_all("a", href = True):
+        start = furl(link["href"]).args.get("start")
+
+        if start is not None and start.isdigit():
+            last_number = max(last_number, int(start))
+
+    return last_number
+
+
+def get_last_page(url, session = None, proxy = PROXIES[1]):
+    """This function downloads an archive page and determines the number of the last archive page.
+
+    Args:
+        url (string): URL of an archive page
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+
+    Returns:
+        last_number (integer): Number of the last website
+    """
+
+    page = get_page(url, session, proxy)
+    soup = BeautifulSoup(page.content, "html.parser")
+    last_number = extract_last_page(soup)
+    logging.info("Last Website: " + str(last_number))
+
+    return last_number
+
+
+def get_last_nr(path = "./Dataset/einsätze_erweitert.csv"):
     """This function determines the last number of the last saved operation.
 
+    Args:
+        path (string, optional): File of the data set. Defaults to "./Dataset/einsätze_erweitert.csv".
+
     Returns:
         nr (integer): Number of the last saved operation
     """
 
-    df = pd.read_csv("./Dataset/einsätze_erweitert.csv")
+    # Only the first row of the Nr column is needed
+    with timer("csv_read"):
+        df = pd.read_csv(path, usecols = ["Nr"], nrows = 1)
     nr = int(df["Nr"].iloc[0])
 
     return nr
 
 
-def extract_data(einsatz):
-    """This function extracts the data from the HTML code.
+def get_retry_after(value):
+    """This function converts the Retry-After header of the server into seconds. The header contains either seconds
+       or an HTTP date.
 
     Args:
-        einsatz (BeautifulSoup Tag): HTML code of the operation 
+        value (string): Value of the header, can be None
 
     Returns:
-        dict_einsatz (dictionary): Contains all extracted data
+        seconds (float): Wait time in seconds, None if the header is missing or invalid
     """
 
-    # Split text into list
-    einsatz_list = einsatz.get_text().split("\n")
+    if value is None:
+        return None
 
-    # Extract Alarmierungszeit
-    einsatz_datum_zeit = einsatz_list[2].split(" ")
-    datum = einsatz_datum_zeit[1]
-    zeit = einsatz_datum_zeit[-1].split("Uhr")[0]      
-    alarmierungszeit = datetime.strptime(datum + " " + zeit, "%d.%m.%Y %H:%M")  # pares date and time to datetime object
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
 
-    # Weekday
-    wochentag = alarmierungszeit.strftime("%A")
-    
-    # Extract Einsatztyp
-    einsatztyp = einsatz_list[6]
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo = timezone.utc)
+
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
 
-    # Extract Einsatzort
-    einsatzort = einsatz_list[9].split("\t")[0][1:]    # remove first space
 
-    # Link to operation, link is in the first element and from this the link is extracted
-    link_einsatz = str(einsatz).split('<a href="')[1].split('">')[0]
+def get_page(url, session = None, proxy = PROXIES[1], retries = 3, backoff = 1.0):
+    """This function downloads a page. Server errors (5xx), rate limits (429) and connection errors are retried with
+       an exponential backoff, a Retry-After header of the server is respected. Other client errors, e.g. 404, are
+       raised immediately.
 
-    # Image name, image name is in the first element and from this the name is extracted
-    bild_name = str(einsatz).split("https://www.kfv-schweinfurt.de/images/")[1].split('"')[0].split("/")[-1]
+    Args:
+        url (string): URL of the page
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        retries (integer, optional): Number of retries. Defaults to 3.
+        backoff (float, optional): Wait time in seconds before the first retry, doubled for each retry. Defaults to 1.0.
 
-    # Extract Kurzbericht
-    kurzbericht = einsatz_list[23].split("\t")
+    Returns:
+        page (requests Response): Downloaded page
+    """
 
-    # check length of kurzbericht
-    if len(kurzbericht) > 5:
-        kurzbericht = kurzbericht[5]
-    elif len(einsatz_list[24].split("\t")) > 5:   # if long location, then it slides to the next line
-        kurzbericht = einsatz_list[24].split("\t")[5]
-    else:   # no kurzbericht available
-        kurzbericht = ""
+    session = requests if session is None else session
 
-    # Extract Organisationen
-    einsatz_string = str(einsatz).split('<!-- <span class="label label-info"> --!>')[1:]    # first element is useless
+    for attempt in range(retries + 1):
+        try:
+            with timer("request"):
+                page = session.get(url, proxies = proxy, timeout = 60)
+            logging.debug("Page status code: " + str(page.status_code))
 
-    # add all organisations to a string seperated by ;
-    organisationen = ";".join([organisation.split("<!-- </span>--!>")[0].lstrip()
-                                for organisation in einsatz_string])
+            if page.status_code < 400:
+                count("pages")
+                count("bytes", len(page.content))
+                return page
 
-    # Data to dictionary
-    dict_einsatz = {"Nr": None, "Alarmierungszeit": alarmierungszeit, "Wochentag": wochentag, "Einsatztyp": einsatztyp,
-                    "Einsatzort": einsatzort, "Link_einsatz": link_einsatz, "Bild": bild_name, "Kurzbericht": kurzbericht,
-                    "Organisationen": organisationen, "Content": str(einsatz), "Text": einsatz.get_text()}
-            
-    return dict_einsatz
+            error = "Status code " + str(page.status_code) + " for " + url
+            if page.status_code != 429 and page.status_code < 500:
+                raise Exception(error)
+            retry_after = get_retry_after(getattr(page, "headers", {}).get("Retry-After"))
+
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+            retry_after = None
+
+        if attempt == retries:
+            break
+
+        # wait before the next attempt
+        count("retries")
+        logging.warning(error + ", retry " + str(attempt + 1) + " of " + str(retries))
+        with timer("sleep"):
+            time.sleep(retry_after if retry_after is not None else backoff * 2 ** attempt)
+
+    raise Exception(error)
+
+
+@timed("extract_data")
+def extract_data(einsatz, source = KFV_SCHWEINFURT):
+    """This function extracts the data from the HTML code. The layout of the row is described by the source, see
+       Source.parse_row.
+
+    Args:
+        einsatz (BeautifulSoup Tag): HTML code of the operation 
+        source (Source, optional): Website of the operation. Defaults to KFV_SCHWEINFURT.
+
+    Returns:
+        dict_einsatz (dictionary): Contains all extracted data
+    """
+
+    return source.parse_row(einsatz)
 
 
 def extract_data_feed(einsatz_feed):
@@ -145,18 +244,71 @@ def extract_data_feed(einsatz_feed):
     alarmierungszeit_feed = datetime.strptime(alarmierungszeit_feed, "%a, %d %b %Y %H:%M:%S %z")
     alarmierungszeit_feed = alarmierungszeit_feed.astimezone(pytz.utc).replace(tzinfo = None)
 
+    # Extract link to operation from feed, only the path like in the table
+    link_feed = einsatz_feed.find("link")
+    link_feed = str(furl(link_feed.get_text().strip()).path) if link_feed is not None else None
+
     # Data from feed to dictionary
-    dict_einsatz_feed = {"Nr": nr_feed, "Alarmierungszeit": alarmierungszeit_feed}
+    dict_einsatz_feed = {"Nr": nr_feed, "Alarmierungszeit": alarmierungszeit_feed, "Link_einsatz": link_feed}
 
     return dict_einsatz_feed
 
 
-def webscraper(url, url_feed):
-    """This function scraps all desired data from the KFV website.
+def reconcile(list_einsatz, list_einsatz_feed):
+    """This function matches the operations of the website with the operations of the feed by key instead of position.
+       The link to the operation and the Alarmierungszeit are the key, the link alone or the Alarmierungszeit alone
+       are used if the other one does not match. Operations without a match are dropped and logged.
+
+    Args:
+        list_einsatz (list): Dictionaries from extract_data
+        list_einsatz_feed (list): Dictionaries from extract_data_feed
+
+    Returns:
+        list_matched (list): Dictionaries from extract_data with Nr
+    """
+
+    by_key = {(feed["Link_einsatz"], feed["Alarmierungszeit"]): feed for feed in list_einsatz_feed}
+    by_link = {feed["Link_einsatz"]: feed for feed in list_einsatz_feed if feed["Link_einsatz"] is not None}
+
+    # The Alarmierungszeit alone is only a key if it is unique
+    by_time = {}
+    for feed in list_einsatz_feed:
+        by_time.setdefault(feed["Alarmierungszeit"], []).append(feed)
+
+    list_matched = []
+
+    for dict_einsatz in list_einsatz:
+        feed = by_key.get((dict_einsatz["Link_einsatz"], dict_einsatz["Alarmierungszeit"]))
+
+        if feed is None and dict_einsatz["Link_einsatz"] in by_link:
+            feed = by_link[dict_einsatz["Link_einsatz"]]
+            logging.warning("Alarmierungszeit is not the same for " + dict_einsatz["Link_einsatz"] + ", matched by link")
+
+        if feed is None and len(by_time.get(dict_einsatz["Alarmierungszeit"], [])) == 1:
+            feed = by_time[dict_einsatz["Alarmierungszeit"]][0]
+
+        if feed is None:
+            logging.warning("No feed entry for " + str(dict_einsatz["Link_einsatz"]) + ", operation is skipped")
+            count("unmatched")
+            continue
+
+        dict_einsatz["Nr"] = feed["Nr"]
+        list_matched.append(dict_einsatz)
+
+    return list_matched
+
+
+@timed("webscraper")
+def webscraper(url, url_feed, session = None, proxy = PROXIES[1], source = KFV_SCHWEINFURT):
+    """This function scraps all desired data from the KFV website or another source with the same archive.
 
     Args:
         url (string): URL where the data should be scraped
         url_feed (string): URL of the feed where the data should be scraped
+        session (requests Session, optional): Object with a get method, e.g. a recorded session for offline tests. 
+                                              Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        source (Source, optional): Layout of the website. Defaults to KFV_SCHWEINFURT.
 
     Returns:
         df (pandas DataFrame): Contains all scraped data
@@ -164,175 +316,410 @@ def webscraper(url, url_feed):
     
     # crate df with columns
     df, _ = create_empty_df()
-
-    # https://hidemy.name/de/proxy-list/
-    # Use a proxy to avoid getting blocked
-    proxies = [{"http": "http://161.35.39.82:3128"},    # United Kingdom London, HTTPS, hoch
-               {"http": "http://169.55.89.6:80"}]       # United States, Ashburn, HTTPS, hoch
     
     # Website
-    page = requests.get(url, proxies = proxies[1])
-    logging.debug("Page status code: " + str(page.status_code))
+    page = get_page(url, session, proxy)
 
-    soup = BeautifulSoup(page.content, "html.parser")
-    table = soup.find(id = "einsatzberichtList")
-    einsätze = table.find_all("tr")
+    with timer("parse"):
+        soup = BeautifulSoup(page.content, "html.parser")
+        table = soup.find(id = source.table_id)
+        einsätze = table.find_all("tr")
 
     # Feed website
-    page_feed = requests.get(url_feed, proxies = proxies[1])
-    logging.debug("Page feed status code: " + str(page_feed.status_code))
+    page_feed = get_page(url_feed, session, proxy)
 
-    soup_feed = BeautifulSoup(page_feed.content, "xml")
-    einsätze_feed = soup_feed.find_all("item")
+    with timer("parse"):
+        soup_feed = BeautifulSoup(page_feed.content, "xml")
+        einsätze_feed = soup_feed.find_all("item")
 
-    for einsatz, einsatz_feed in zip(einsätze[1:-2], einsätze_feed):  # exclude first element and last two elements of the list
+    # Extract necessary data, exclude the header row and the two footer rows of the table
+    list_einsatz = [extract_data(einsatz, source) for einsatz in source.get_rows(einsätze)]
+    list_einsatz_feed = [extract_data_feed(einsatz_feed) for einsatz_feed in einsätze_feed]
 
-        # Extract necessary data
-        dict_einsatz = extract_data(einsatz)
-        dict_einsatz_feed = extract_data_feed(einsatz_feed)
+    # The website and the feed are two requests, new operations in between shift them against each other
+    list_einsatz = reconcile(list_einsatz, list_einsatz_feed)
 
-        # check if Alarmierungszeit is the same
-        if dict_einsatz["Alarmierungszeit"] == dict_einsatz_feed["Alarmierungszeit"]:
-            dict_einsatz["Nr"] = dict_einsatz_feed["Nr"]
-        else:
-            raise Exception("Alarmierungszeit is not the same!")
+    if len(list_einsatz) > 0:
+        df = pd.concat([df, pd.DataFrame(list_einsatz)], ignore_index = True)
 
-        # concat new row to df
-        df = pd.concat([df, pd.DataFrame(dict_einsatz, index = [0])], ignore_index = True)
+    count("rows", len(df))
 
     return df
 
 
-def get_all_data(url, url_feed):
-    """This function scraps all data from the website.
+def get_feed_url(url):
+    """This function creates the URL of the feed from the URL of an archive page.
+
+    Args:
+        url (string): URL of an archive page, e.g. "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?start=10"
+
+    Returns:
+        url_feed (string): URL of the feed with the same start number
+    """
+
+    url = furl(url)
+    start = url.args.get("start", "0")
+    url.args.clear()
+    url.args["format"] = "feed"
+    url.args["type"] = "rss"
+    url.args["start"] = start
+
+    return url.url
+
+
+def scrape_page(url, url_feed, letzte_nr, session = None, proxy = PROXIES[1], source = KFV_SCHWEINFURT):
+    """This function scraps one website and creates the entry for the check data. A website which can not be scraped
+       does not stop the crawl, it gets an entry without Erste_Nr and Letzte_Nr and is fetched again later.
 
     Args:
         url (string): URL where the data should be scraped
         url_feed (string): URL of the feed where the data should be scraped
-    """
+        letzte_nr (integer): Last Nr of the previous website, None for the first website
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        source (Source, optional): Layout of the website. Defaults to KFV_SCHWEINFURT.
 
-    new_number = 0  # number of the current website
-    letzte_nr = -1  # number of the last website, -1 because first website is nr 0
-    df_gesamt, df_check = create_empty_df()
+    Returns:
+        df (pandas DataFrame): Contains all scraped data of the website
+        dict_check (dictionary): Entry for the check data
+    """
 
     try:
-        # Last website: https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?start=15670
-        while new_number <= 15670:    # TODO: Please change this number to the last website
-            logging.info("Current Website: " + str(new_number))
+        df = webscraper(url, url_feed, session, proxy, source)
+    except Exception as e:
+        logging.error(str(e) + ", website is fetched again later")
+        count("failed_pages")
+        df, _ = create_empty_df()
+
+    dict_check = {"Datetime": datetime.now().strftime("%Y.%m.%d %H:%M:%S"), "URL": url, "Erste_Nr": None, 
+                  "Letzte_Nr": None, "IO": 0}
+
+    if not df.empty:
+        # first and last element in column Nr
+        dict_check["Erste_Nr"] = df["Nr"].iloc[0]
+        dict_check["Letzte_Nr"] = df["Nr"].iloc[-1]
+
+        # check if first_nr now and last_nr - 1 before are equal
+        dict_check["IO"] = int(letzte_nr is None or dict_check["Erste_Nr"] == letzte_nr - 1)
+
+    return df, dict_check
+
+
+def get_affected_pages(df_check):
+    """This function determines the websites which have to be fetched again from the continuity of the check data.
+       Failed websites are affected. If numbers are missing between two websites (Erste_Nr < previous Letzte_Nr - 1),
+       the operations have moved to the previous website, so both websites are affected. Overlapping websites only
+       contain duplicates and are not affected.
 
-            df = webscraper(url, url_feed)
+    Args:
+        df_check (pandas DataFrame): Check data with URL, Erste_Nr and Letzte_Nr
+
+    Returns:
+        urls (list): URLs of the affected websites, in the order of the check data
+    """
+
+    erste_nr = pd.to_numeric(df_check["Erste_Nr"], errors = "coerce")
+    letzte_nr_vorher = pd.to_numeric(df_check["Letzte_Nr"], errors = "coerce").shift()
+
+    failed = erste_nr.isna()
+    gap = erste_nr < letzte_nr_vorher - 1
+
+    affected = failed | gap | gap.shift(-1, fill_value = False)
+    urls = df_check.loc[affected, "URL"].drop_duplicates().tolist()
+
+    return urls
+
+
+def drop_duplicate_operations(df):
+    """This function removes operations which were scraped twice because the websites shifted during the crawl.
+       The Nr together with the Alarmierungszeit identifies an operation. Newest operation first.
+
+    Args:
+        df (pandas DataFrame): Scraped data
+
+    Returns:
+        df (pandas DataFrame): Scraped data without duplicates
+    """
+
+    anzahl = len(df)
+    df = df.drop_duplicates(subset = ["Nr", "Alarmierungszeit"], keep = "first")
+    df = df.sort_values(by = ["Alarmierungszeit", "Nr"], ascending = False, kind = "stable").reset_index(drop = True)
+    count("duplicates", anzahl - len(df))
+
+    return df
+
+
+def refetch_affected_pages(df_gesamt, df_check, session = None, proxy = PROXIES[1], wait = (1, 30),
+                           source = KFV_SCHWEINFURT):
+    """This function fetches the affected websites again, merges the data and removes duplicates.
+       The entries of the check data are updated for websites which could be fetched.
+
+    Args:
+        df_gesamt (pandas DataFrame): Scraped data
+        df_check (pandas DataFrame): Check data
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        wait (tuple, optional): Minimum and maximum wait time in seconds between two websites. Defaults to (1, 30).
+        source (Source, optional): Layout of the website. Defaults to KFV_SCHWEINFURT.
+
+    Returns:
+        df_gesamt (pandas DataFrame): Scraped data without duplicates
+        df_check (pandas DataFrame): Updated check data
+        failed (integer): Number of websites which could still not be fetched
+    """
 
-            # first element in column Nr
-            erste_nr = df["Nr"].iloc[0]
-            io = 1
+    urls = get_affected_pages(df_check)
+    failed = 0
 
-            # check if first_nr now and last_nr - 1 before are equal
-            if new_number != 0:
-                if erste_nr != letzte_nr - 1:
-                    io = 0
+    for url in urls:
+        logging.info("Fetch again: " + url)
+        count("refetched_pages")
 
-            # last element in column Nr
-            letzte_nr = df["Nr"].iloc[-1]
+        df, dict_check = scrape_page(url, get_feed_url(url), None, session, proxy, source)
 
-            # concat df_gesamt with df (new data)
+        if df.empty:
+            failed += 1
+        else:
             df_gesamt = pd.concat([df_gesamt, df], ignore_index = True)
+            rows = df_check["URL"] == url
+            for column in ["Datetime", "Erste_Nr", "Letzte_Nr", "IO"]:
+                df_check.loc[rows, column] = dict_check[column]
+
+        with timer("sleep"):
+            time.sleep(np.random.uniform(wait[0], wait[1]))
+
+    df_gesamt = drop_duplicate_operations(df_gesamt)
+
+    return df_gesamt, df_check, failed
+
+
+def get_all_data(url, url_feed, last_number = None, session = None, proxy = PROXIES[1], wait = (1, 30),
+                 source = KFV_SCHWEINFURT, path = "./Dataset/einsätze.csv", check_path = "./Dataset/check.csv"):
+    """This function scraps all data from the website. New operations during the crawl shift the websites, the
+       duplicates are removed and websites with missing operations are fetched again at the end.
+
+    Args:
+        url (string): URL where the data should be scraped
+        url_feed (string): URL of the feed where the data should be scraped
+        last_number (integer, optional): Number of the last website. Defaults to None, then it is determined
+                                         from the pagination.
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        wait (tuple, optional): Minimum and maximum wait time in seconds between two websites. Defaults to (1, 30).
+        source (Source, optional): Layout of the website. Defaults to KFV_SCHWEINFURT.
+        path (string, optional): File of the scraped data. Defaults to "./Dataset/einsätze.csv".
+        check_path (string, optional): File of the check data. Defaults to "./Dataset/check.csv".
+
+    Returns:
+        success (boolean): True if all websites were scraped without an error
+    """
+
+    new_number = 0  # number of the current website
+    letzte_nr = None  # last Nr of the previous website, None because there is no previous website
+    df_gesamt, df_check = create_empty_df()
+    list_df, list_check = [], []
+    success = False
+
+    try:
+        detect_last_number = last_number is None
+        url_start = url
+        if detect_last_number:
+            last_number = get_last_page(url_start, session, proxy)
+
+        while new_number <= last_number:
+            logging.info("Current Website: " + str(new_number))
+
+            df, dict_check = scrape_page(url, url_feed, letzte_nr, session, proxy, source)
+            list_df.append(df)
+            list_check.append(dict_check)
 
-            # concat df_check with new data
-            df_check = pd.concat([df_check, pd.DataFrame({"Datetime": datetime.now().strftime("%Y.%m.%d %H:%M:%S"), 
-                                "URL": url, "Erste_Nr": erste_nr, "Letzte_Nr": letzte_nr, "IO": io}, 
-                                index = [0])], ignore_index = True)
+            if not df.empty:
+                letzte_nr = dict_check["Letzte_Nr"]
 
             # create new url and get new number for next website
-            url, new_number = get_next_website(url)
-            url_feed, _ = get_next_website(url_feed)
+            url, new_number = get_next_website(url, source.page_size)
+            url_feed, _ = get_next_website(url_feed, source.page_size)
 
             # wait for random time between 1 and 30 seconds
-            time.sleep(np.random.randint(1, 30))
+            with timer("sleep"):
+                time.sleep(np.random.uniform(wait[0], wait[1]))
+
+            # New operations during the crawl push the oldest ones to additional websites at the end
+            if detect_last_number and new_number > last_number:
+                last_number = get_last_page(url_start, session, proxy)
+
+        # concat all websites at once
+        df_gesamt = pd.concat([df_gesamt] + list_df, ignore_index = True)
+        df_check = pd.DataFrame(list_check, columns = df_check.columns)
+
+        df_gesamt, df_check, failed = refetch_affected_pages(df_gesamt, df_check, session, proxy, wait, source)
+        success = failed == 0
 
     except Exception as e:
         logging.error(e)
     finally:
+        if df_gesamt.empty and len(list_df) > 0:
+            df_gesamt = pd.concat(list_df, ignore_index = True)
+            df_check = pd.DataFrame(list_check, columns = df_check.columns)
+
         # save df as csv
-        df_gesamt.to_csv("./Dataset/einsätze.csv", index = False)
+        with timer("csv_write"):
+            df_gesamt.to_csv(path, index = False)
 
         # save df_check as csv
-        df_check.to_csv("./Dataset/check.csv", index = False)
+        with timer("csv_write"):
+            df_check.to_csv(check_path, index = False)
+
+    return success
 
 
-def get_specific_data(url, url_feed, nr):
+def get_specific_data(url, url_feed, nr, session = None, proxy = PROXIES[1], wait = (1, 30), source = KFV_SCHWEINFURT):
     """This function scraps the latest data which has not been downloaded yet.
 
     Args:
         url (string): URL where the data should be scraped
         url_feed (string): URL of the feed where the data should be scraped
         nr (integer): Number of the last saved operation
+        session (requests Session, optional): Object with a get method. Defaults to None, then requests is used.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+        wait (tuple, optional): Minimum and maximum wait time in seconds between two websites. Defaults to (1, 30).
+        source (Source, optional): Layout of the website. Defaults to KFV_SCHWEINFURT.
+
+    Returns:
+        success (boolean): True if all new operations were scraped without an error
     """
 
     new_number = 0  # number of the current website
-    letzte_nr = nr + 1  # number of the last website
+    letzte_nr = None  # last Nr of the previous website, None because there is no previous website
     df_gesamt, df_check = create_empty_df()
+    list_df, list_check = [], []
+    success = False
     
     try:
-        while nr < letzte_nr:
+        while letzte_nr is None or nr < letzte_nr:
             logging.info("Current Website: " + str(new_number))
 
-            df = webscraper(url, url_feed)
-
-            # first element in column Nr
-            erste_nr = df["Nr"].iloc[0]
-            io = 1
-
-            # check if first_nr now and last_nr - 1 before are equal
-            if new_number != 0:
-                if erste_nr != letzte_nr - 1:
-                    io = 0
-
-            # last element in column Nr
-            letzte_nr = df["Nr"].iloc[-1]
-
-            # concat df_gesamt with df (new data)
-            df_gesamt = pd.concat([df_gesamt, df], ignore_index = True)
+            df, dict_check = scrape_page(url, url_feed, letzte_nr, session, proxy, source)
+            list_df.append(df)
+            list_check.append(dict_check)
 
-            # concat df_check with new data
-            df_check = pd.concat([df_check, pd.DataFrame({"Datetime": datetime.now().strftime("%Y.%m.%d %H:%M:%S"), 
-                                "URL": url, "Erste_Nr": erste_nr, "Letzte_Nr": letzte_nr, "IO": io}, 
-                                index = [0])], ignore_index = True)
+            if not df.empty:
+                letzte_nr = dict_check["Letzte_Nr"]
+            elif len(list_check) >= 3 and all(check["Erste_Nr"] is None for check in list_check[-3:]):
+                raise Exception("Three websites in a row could not be scraped")
 
             # create new url and get new number for next website
-            url, new_number = get_next_website(url)
-            url_feed, _ = get_next_website(url_feed)
+            url, new_number = get_next_website(url, source.page_size)
+            url_feed, _ = get_next_website(url_feed, source.page_size)
 
             # wait for random time between 1 and 30 seconds
-            time.sleep(np.random.randint(1, 30))
+            with timer("sleep"):
+                time.sleep(np.random.uniform(wait[0], wait[1]))
+
+        # concat all websites at once
+        df_gesamt = pd.concat([df_gesamt] + list_df, ignore_index = True)
+        df_check = pd.DataFrame(list_check, columns = df_check.columns)
+
+        df_gesamt, df_check, failed = refetch_affected_pages(df_gesamt, df_check, session, proxy, wait, source)
+        success = failed == 0
 
     except Exception as e:
         logging.error(e)
     finally:
+        if df_gesamt.empty and len(list_df) > 0:
+            df_gesamt = pd.concat(list_df, ignore_index = True)
+            df_check = pd.DataFrame(list_check, columns = df_check.columns)
+
         # cut off df_total so that only the missing data is still in it
         df_gesamt = df_gesamt[df_gesamt["Nr"] > nr]
 
         # save df as csv
-        df_gesamt.to_csv("./Dataset/einsätze_fehlend.csv", index = False)
+        with timer("csv_write"):
+            df_gesamt.to_csv("./Dataset/einsätze_fehlend.csv", index = False)
 
         # save df_check as csv
-        df_check.to_csv("./Dataset/check_fehlend.csv", index = False)
+        with timer("csv_write"):
+            df_check.to_csv("./Dataset/check_fehlend.csv", index = False)
 
+    return success
 
-if __name__ == "__main__":
-    
-    # General webpage: https://www.kfv-schweinfurt.de/index.php/einsaetze
-    # Current last webpage: https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?start=15670
 
-    url = "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?start=0"
-    url_feed = "https://www.kfv-schweinfurt.de/index.php/einsaetze/einsatzarchiv?format=feed&type=rss&start=0"
+def crawl_sources(sources, directory = SOURCES_DIR, session = None, proxy = PROXIES[1]):
+    """This function scraps several websites at the same time, one thread per website. Every website has its own
+       request budget (Source.rate) instead of the random wait time, so the websites do not slow each other down.
+       Every website is written to its own partition directory/Quelle=<name> with the column Quelle, see
+       load_sources_dataset.
+
+    Args:
+        sources (list): Sources to be scraped
+        directory (string, optional): Folder of the partitioned data set. Defaults to "./Dataset/Quellen".
+        session (requests Session, optional): Object with a get method. Defaults to None, then every website uses its
+                                              own requests Session.
+        proxy (dictionary, optional): Proxy for requests, {} for none. Defaults to PROXIES[1].
+
+    Returns:
+        results (dictionary): Name of the source -> True if all its websites were scraped without an error
+    """
 
-    # User input
-    user_input = input("Do you want to get all data or only the latest data? (all/latest): ")
+    def crawl(source):
+        partition = os.path.join(directory, "Quelle=" + source.name)
+        path = os.path.join(partition, "einsätze.csv")
+        os.makedirs(partition, exist_ok = True)
+        source_session = RateLimitedSession(requests.Session() if session is None else session, RateBudget(source.rate))
 
-    if user_input == "all":
-        get_all_data(url, url_feed)
-    elif user_input == "latest":
-        nr = get_last_nr()
-        get_specific_data(url, url_feed, nr)
+        logging.info("Scrape source: " + source.name)
+        success = get_all_data(source.url, source.url_feed, None, source_session, proxy, (0, 0), source, path,
+                               os.path.join(partition, "check.csv"))
+
+        # The file keeps its Quelle also when it is copied out of the partition
+        with timer("csv_write"):
+            df = pd.read_csv(path)
+            df.insert(0, "Quelle", source.name)
+            df.to_csv(path, index = False)
+
+        return success
+
+    if len(sources) == 0:
+        return {}
+
+    with timer("crawl_sources"), ThreadPoolExecutor(max_workers = len(sources)) as executor:
+        results = dict(zip([source.name for source in sources], executor.map(crawl, sources)))
+
+    return results
+
+
+def load_sources_dataset(directory = SOURCES_DIR):
+    """This function reads all partitions of the scraped websites into one DataFrame with the column Quelle.
+
+    Args:
+        directory (string, optional): Folder of the partitioned data set. Defaults to "./Dataset/Quellen".
+
+    Returns:
+        df (pandas DataFrame): Operations of all websites, newest first
+    """
+
+    list_df = []
+
+    for path in sorted(glob.glob(os.path.join(directory, "Quelle=*", "einsätze.csv"))):
+        df = pd.read_csv(path)
+        if "Quelle" not in df.columns:  # partition written before the column was added
+            df.insert(0, "Quelle", os.path.basename(os.path.dirname(path)).split("=", 1)[1])
+        list_df.append(df)
+
+    if len(list_df) == 0:
+        df, _ = create_empty_df()
+        df.insert(0, "Quelle", pd.Series(dtype = object))
+        return df
+
+    df = pd.concat(list_df, ignore_index = True)
+    df = df.sort_values(by = "Alarmierungszeit", ascending = False, kind = "stable").reset_index(drop = True)
+
+    return df
+
+
+if __name__ == "__main__":
     
-    
\ No newline at end of file
+    # General webpage: https://www.kfv-schweinfurt.de/index.php/einsaetze
+    # Same as "python main.py scrape all|latest"
+    from main import main
+    sys.exit(main(["scrape"] + sys.argv[1:]))